@@ -2,7 +2,6 @@ import argparse
 import logging
 from pathlib import Path
 import joblib
-import pandas as pd
 from sklearn.metrics import r2_score, mean_absolute_error
 import mlflow
 import json
@@ -12,7 +11,7 @@ load_dotenv()
 
 
 from evaluation.config.configuration import ConfigurationManager
-from evaluation.utils.common import save_json
+from evaluation.utils.common import read_table, save_json
 
 # Logger configuration
 target_log = Path("logs/evaluation.log")
@@ -38,7 +37,10 @@ def run_evaluation(config_path: str, params_path: str):
     if not cfg.processed_data_path.exists():
         logger.error(f"Processed data not found: {cfg.processed_data_path}")
         return 1
-    df = pd.read_csv(cfg.processed_data_path)
+    # SKU et Timestamp ne sont pas des features : non chargés
+    df = read_table(
+        cfg.processed_data_path, keep=lambda c: c not in ("SKU", "Timestamp")
+    )
     logger.info(f"Loaded processed data: {cfg.processed_data_path} (shape={df.shape})")
 
     # Load model
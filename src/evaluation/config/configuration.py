@@ -2,7 +2,11 @@ import logging
 from pathlib import Path
 from box import ConfigBox
 
-from evaluation.utils.common import read_yaml, create_directories
+from evaluation.utils.common import (
+    read_yaml,
+    create_directories,
+    with_storage_format,
+)
 from evaluation.entity.config_entity import EvaluationConfig
 
 # Logger
@@ -35,7 +39,10 @@ class ConfigurationManager:
     def get_evaluation_config(self) -> EvaluationConfig:
         cfg = self.config.evaluation
         # Chemins absolus
-        processed_data = self.project_root / Path(cfg.processed_data_path)
+        storage_format = self.config.get("storage", {}).get("format", "csv")
+        processed_data = self.project_root / with_storage_format(
+            Path(cfg.processed_data_path), storage_format
+        )
         model_file = self.project_root / Path(cfg.model_path)
         metrics_output = self.project_root / Path(cfg.metrics_output_path)
 
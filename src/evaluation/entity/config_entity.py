@@ -8,7 +8,7 @@ class EvaluationConfig:
     Configuration pour le module d'évaluation.
 
     Attributes:
-        processed_data_path (Path): Chemin vers le CSV prétraité.
+        processed_data_path (Path): Chemin vers les données prétraitées (CSV ou Parquet).
         model_path (Path): Chemin vers le modèle entraîné.
         metrics_output_path (Path): Chemin de sortie pour les métriques JSON.
         mlflow_tracking_uri (str): URI du serveur MLflow.
@@ -1,7 +1,9 @@
 import logging
 from pathlib import Path
+from typing import Callable, Optional
 from box import ConfigBox
 import yaml
+import pandas as pd
 import json
 
 # Logger configuration
@@ -83,3 +85,35 @@ def load_json(path: Path) -> dict:
         content = json.load(f)
     logger.info(f"JSON chargé : {path}")
     return content
+
+
+# Formats de stockage des données entre étapes (config.yaml : storage.format)
+STORAGE_FORMATS = ("csv", "parquet")
+
+
+def with_storage_format(path: Path, storage_format: str) -> Path:
+    """
+    Remplace l'extension du fichier par celle du format de stockage configuré
+    (ex: data/raw/ingested_data.csv -> data/raw/ingested_data.parquet).
+    """
+    if storage_format not in STORAGE_FORMATS:
+        raise ValueError(
+            f"Format de stockage inconnu : {storage_format} (attendu : {STORAGE_FORMATS})"
+        )
+    return path.with_suffix(f".{storage_format}")
+
+
+def read_table(
+    path: Path, keep: Optional[Callable[[str], bool]] = None
+) -> pd.DataFrame:
+    """
+    Lit un fichier CSV ou Parquet (selon son extension) en ne chargeant que
+    les colonnes retenues par `keep` (toutes si None).
+    """
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        names = pq.read_schema(path).names
+        columns = [c for c in names if keep(c)] if keep is not None else None
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=keep, encoding="utf-8")
@@ -1,17 +1,44 @@
+import math
+import threading
+from datetime import datetime
+from typing import List, Optional
+
 from fastapi import FastAPI, Depends, HTTPException, status, Request
+from fastapi.concurrency import run_in_threadpool
+from fastapi.exceptions import RequestValidationError
 from fastapi.security import HTTPBasic, HTTPBasicCredentials
-from pydantic import BaseModel
-from starlette.responses import JSONResponse
+from pydantic import BaseModel, ValidationError
+from starlette.responses import JSONResponse, PlainTextResponse, Response
 
 from inference.config.configuration import ConfigurationManager
-from inference.repository.data_repository import CsvDataRepository, DvcDataRepository
-from inference.repository.model_repository import MlflowModelRepository
+from inference.repository.data_repository import (
+    CachingCsvDataRepository,
+    CsvDataRepository,
+    DvcDataRepository,
+)
+from inference.repository.feature_artifact import FeatureArtifactDataRepository
+from inference.repository.shared_feature_store import (
+    SharedFeatureStore,
+    SharedMemoryDataRepository,
+)
+from inference.repository.tailing_repository import TailingCsvDataRepository
+from inference.repository.model_repository import (
+    CompiledModelRepository,
+    MlflowModelRepository,
+)
 from inference.service.prediction_service import (
     PredictionService,
     SkuNotFoundError,
     InsufficientDataError,
 )
-from inference.entity.dto import PredictionResult
+from inference.service.admission import AdmissionController, RequestShed
+from inference.service.micro_batcher import MicroBatcher
+from inference.service.price_table import PriceTable
+from inference.service.model_reloader import ModelReloader
+from inference.service.prediction_cache import PredictionCache
+from inference.entity.dto import PredictionFailure, PredictionResult
+from inference.utils import payloads
+from inference.utils.metrics import ERRORS_TOTAL, REGISTRY, MetricsMiddleware
 
 # --- Security setup ---
 security = HTTPBasic()
@@ -36,26 +63,134 @@ def get_current_admin(
 
 # --- App initialization ---
 app = FastAPI()
+app.add_middleware(MetricsMiddleware)
 
 
 @app.on_event("startup")
 def init_service():
     cm = ConfigurationManager()
     cfg = cm.get_config()
-    # Choose data repository: CSV local first
-    data_repo = CsvDataRepository(cfg.data_csv_path)
-    # Alternative: instantiate DvcDataRepository
-    # data_repo = DvcDataRepository(cfg.dvc_target, cfg.data_csv_path)
-
-    model_repo = MlflowModelRepository(
-        tracking_uri=cfg.mlflow_tracking_uri,
-        model_name=cfg.mlflow_model_name,
-    )
+    # Choose data repository (data_source is validated by the configuration)
+    if cfg.data_source == "artifact":
+        # Per-SKU aggregates from the feature_build stage: no raw CSV parsing
+        data_repo = FeatureArtifactDataRepository(
+            cfg.feature_artifact_path, refresh_interval=cfg.data_refresh_interval
+        )
+    elif cfg.data_source == "tail":
+        # Append-only CSV: only the new rows are parsed on each refresh
+        if cfg.data_csv_path.suffix != ".csv" or cfg.data_csv_path.is_dir():
+            raise ValueError(
+                "data_source 'tail' requires a single CSV file "
+                "(storage.format 'csv', data_ingestion.mode 'full')"
+            )
+        data_repo = TailingCsvDataRepository(
+            cfg.data_csv_path, refresh_interval=cfg.data_refresh_interval
+        )
+    elif cfg.data_source == "dvc":
+        # DVC-tracked CSV: `dvc pull` only when dvc.lock expects another hash
+        data_repo = DvcDataRepository(
+            cfg.dvc_target,
+            cfg.data_csv_path,
+            refresh_interval=cfg.data_refresh_interval,
+        )
+    else:
+        # Local CSV, cached and refreshed in background
+        data_repo = CachingCsvDataRepository(
+            cfg.data_csv_path, refresh_interval=cfg.data_refresh_interval
+        )
+    if cfg.shared_features_dir is not None:
+        # Several workers: the leader publishes the feature table built from
+        # the csv/dvc source above, all workers mmap it
+        data_repo = SharedMemoryDataRepository(
+            SharedFeatureStore(cfg.shared_features_dir),
+            data_repo,
+            refresh_interval=cfg.data_refresh_interval,
+        )
 
-    service = PredictionService(data_repo, model_repo)
+    if (
+        cfg.scoring_engine == "compiled"
+        and cfg.compiled_model_path is not None
+        and cfg.compiled_model_path.exists()
+    ):
+        # Compiled tree ensemble: no mlflow/xgboost import on the serving path
+        model_repo = CompiledModelRepository(cfg.compiled_model_path)
+    else:
+        model_repo = MlflowModelRepository(
+            tracking_uri=cfg.mlflow_tracking_uri,
+            model_name=cfg.mlflow_model_name,
+            cache_dir=cfg.model_cache_dir,
+            fallback_model_path=cfg.fallback_model_path,
+        )
+
+    cache = None
+    if cfg.prediction_cache_enabled:
+        cache = PredictionCache(
+            max_entries=cfg.prediction_cache_max_entries,
+            ttl_seconds=cfg.prediction_cache_ttl_seconds,
+        )
+
+    service = PredictionService(
+        data_repo, model_repo, cache=cache, scoring_engine=cfg.scoring_engine
+    )
+    if cfg.price_table_path is not None and cfg.price_table_path.exists():
+        # Served only while it matches the served model and data
+        service.attach_price_table(PriceTable.load(cfg.price_table_path))
+    # Rebuild the feature index whenever a new data snapshot is published
+    data_repo.add_listener(lambda snapshot: service.refresh_data())
+    data_repo.start()
     # Store in app.state for access in routes
     app.state.service = service
     app.state.cfg = cfg
+    app.state.reloader = ModelReloader(service)
+    # /readyz stays 503 until the initial warm-up is done
+    threading.Thread(
+        target=app.state.reloader.warm_up_initial, name="model-warmup", daemon=True
+    ).start()
+    app.state.admission = None
+    if cfg.admission_enabled:
+        app.state.admission = AdmissionController(
+            max_concurrency=cfg.admission_max_concurrency,
+            max_queue=cfg.admission_max_queue,
+            default_timeout_ms=cfg.admission_timeout_ms,
+            retry_after_seconds=cfg.admission_retry_after_seconds,
+        )
+    app.state.batcher = None
+    if cfg.micro_batching_enabled:
+        app.state.batcher = MicroBatcher(
+            service,
+            max_wait_ms=cfg.micro_batching_max_wait_ms,
+            max_batch_size=cfg.micro_batching_max_batch_size,
+        )
+
+
+@app.on_event("startup")
+async def start_batcher():
+    # The batching loop must run on the server's event loop
+    batcher = getattr(app.state, "batcher", None)
+    if batcher is not None:
+        await batcher.start()
+
+
+@app.on_event("shutdown")
+async def stop_batcher():
+    batcher = getattr(app.state, "batcher", None)
+    if batcher is not None:
+        await batcher.stop()
+
+
+@app.on_event("shutdown")
+def stop_service():
+    service = getattr(app.state, "service", None)
+    if service is not None and isinstance(
+        service.data_repo,
+        (
+            CachingCsvDataRepository,
+            FeatureArtifactDataRepository,
+            SharedMemoryDataRepository,
+            TailingCsvDataRepository,
+        ),
+    ):
+        service.data_repo.stop()
 
 
 # --- Pydantic models ---
@@ -69,45 +204,233 @@ class PredictionResponse(BaseModel):
     predicted_price: float
 
 
+class BatchPredictionRequest(BaseModel):
+    skus: List[str]
+
+
+class BatchPredictionItem(BaseModel):
+    sku: str
+    predicted_price: Optional[float] = None
+    error: Optional[str] = None
+    detail: Optional[str] = None
+
+
+class BatchPredictionResponse(BaseModel):
+    timestamp: str
+    predictions: List[BatchPredictionItem]
+
+
+# --- Admission control ---
+async def admit(request: Request):
+    """Holds an inference slot for the whole request, or sheds it right away."""
+    admission: Optional[AdmissionController] = getattr(
+        request.app.state, "admission", None
+    )
+    if admission is None:
+        yield
+        return
+    endpoint = request.scope["route"].path
+    try:
+        await admission.acquire(endpoint, admission.deadline(request.headers))
+    except RequestShed as e:
+        raise HTTPException(
+            status_code=request.app.state.cfg.admission_shed_status_code,
+            detail=f"Service overloaded ({e.reason}), retry later",
+            headers={"Retry-After": str(math.ceil(e.retry_after))},
+        )
+    try:
+        yield
+    finally:
+        admission.release()
+
+
 # --- Routes ---
+@app.get("/livez")
+def livez() -> JSONResponse:
+    # Constant time: the process answers, nothing else is checked
+    return JSONResponse({"status": "alive"})
+
+
+def _readiness(request: Request):
+    """Readiness from in-memory state only (no CSV parsing, no registry call)."""
+    service: Optional[PredictionService] = getattr(request.app.state, "service", None)
+    reloader: Optional[ModelReloader] = getattr(request.app.state, "reloader", None)
+    if service is None or reloader is None:
+        return False, {"detail": "Service not initialized"}
+    payload = service.status()
+    payload["reload"] = reloader.status()
+    if service.cache is not None:
+        payload["prediction_cache"] = service.cache.stats()
+    admission = getattr(request.app.state, "admission", None)
+    if admission is not None:
+        payload["admission"] = admission.stats()
+    if not reloader.ready.is_set():
+        return False, {"detail": "Warm-up in progress", **payload}
+    return True, payload
+
+
+@app.get("/readyz")
+def readyz(request: Request) -> JSONResponse:
+    ready, payload = _readiness(request)
+    return JSONResponse(
+        {"status": "ready" if ready else "not_ready", **payload},
+        status_code=200 if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
+
+
 @app.get("/health")
 def health(request: Request) -> JSONResponse:
-    try:
-        # attempt load resources
-        _ = request.app.state.service.data_repo.load()
-        _ = request.app.state.service.model_repo.load()
-        return JSONResponse({"status": "OK", "model": "loaded", "data": "loaded"})
-    except Exception as e:
-        return JSONResponse({"status": "ERROR", "detail": str(e)}, status_code=500)
+    # Kept for existing probes; same in-memory checks as /readyz
+    ready, payload = _readiness(request)
+    return JSONResponse(
+        {"status": "OK" if ready else "ERROR", **payload},
+        status_code=200 if ready else status.HTTP_503_SERVICE_UNAVAILABLE,
+    )
 
 
-@app.post("/predict", response_model=PredictionResponse)
-def predict(req: PredictionRequest, request: Request):
+@app.post("/predict", response_model=PredictionResponse, dependencies=[Depends(admit)])
+async def predict(req: PredictionRequest, request: Request):
     service: PredictionService = request.app.state.service
+    batcher: Optional[MicroBatcher] = getattr(request.app.state, "batcher", None)
     try:
-        result: PredictionResult = service.predict(req.sku)
+        if batcher is not None:
+            result: PredictionResult = await batcher.submit(req.sku)
+        else:
+            result = await run_in_threadpool(service.predict, req.sku)
         return PredictionResponse(
             sku=result.sku,
             timestamp=result.timestamp.isoformat(),
             predicted_price=result.predicted_price,
         )
     except SkuNotFoundError as e:
+        ERRORS_TOTAL.inc(("/predict", type(e).__name__))
         raise HTTPException(status_code=404, detail=str(e))
     except InsufficientDataError as e:
+        ERRORS_TOTAL.inc(("/predict", type(e).__name__))
         raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
+        ERRORS_TOTAL.inc(("/predict", type(e).__name__))
         raise HTTPException(status_code=500, detail="Prediction error: " + str(e))
 
 
-@app.post("/reload-model", dependencies=[Depends(get_current_admin)])
-def reload_model(request: Request):
+def _json_batch(service: PredictionService, skus: List[str]):
+    items = service.predict_batch(skus)
+    predictions = []
+    timestamp = None
+    for item in items:
+        if isinstance(item, PredictionFailure):
+            ERRORS_TOTAL.inc(("/predict/batch", item.error))
+            predictions.append(
+                BatchPredictionItem(sku=item.sku, error=item.error, detail=item.detail)
+            )
+        else:
+            timestamp = timestamp or item.timestamp
+            predictions.append(
+                BatchPredictionItem(sku=item.sku, predicted_price=item.predicted_price)
+            )
+    return BatchPredictionResponse(
+        timestamp=(timestamp or datetime.now()).isoformat(), predictions=predictions
+    )
+
+
+def _binary_batch(service: PredictionService, skus: List[str], fmt: str) -> bytes:
+    # Columnar all the way: prices stay in the NumPy array from the model
+    columns = service.predict_columns(skus)
+    for error in columns.errors:
+        if error is not None:
+            ERRORS_TOTAL.inc(("/predict/batch", error))
+    return payloads.encode_columns(columns, fmt)
+
+
+@app.post(
+    "/predict/batch",
+    response_model=BatchPredictionResponse,
+    dependencies=[Depends(admit)],
+    openapi_extra={
+        "requestBody": {
+            "required": True,
+            "content": {
+                # Binary formats only when their optional module is installed
+                fmt: (
+                    {"schema": BatchPredictionRequest.model_json_schema()}
+                    if fmt == payloads.JSON
+                    else {}
+                )
+                for fmt in payloads.supported_types()
+            },
+        }
+    },
+)
+async def predict_batch(request: Request):
+    # JSON, Arrow IPC or MessagePack in, format negotiated from Accept out
+    request_type = payloads.media_type(request.headers.get("content-type"))
+    if request_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_415_UNSUPPORTED_MEDIA_TYPE,
+            detail=f"Unsupported Content-Type: {request.headers['content-type']} "
+            f"(supported: {', '.join(payloads.supported_types())})",
+        )
+    response_type = payloads.negotiate(request.headers.get("accept"), request_type)
+    if response_type is None:
+        raise HTTPException(
+            status_code=status.HTTP_406_NOT_ACCEPTABLE,
+            detail=f"No supported response type in Accept: "
+            f"{request.headers['accept']} "
+            f"(supported: {', '.join(payloads.supported_types())})",
+        )
+    body = await request.body()
+    try:
+        if request_type == payloads.JSON:
+            skus = BatchPredictionRequest.model_validate_json(body).skus
+        else:
+            skus = payloads.decode_skus(body, request_type)
+    except ValidationError as e:
+        raise RequestValidationError(e.errors(), body=body)
+    except payloads.PayloadError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
     service: PredictionService = request.app.state.service
+    max_batch_size = request.app.state.cfg.max_batch_size
+    if len(skus) > max_batch_size:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Batch too large: {len(skus)} SKUs (max {max_batch_size})",
+        )
     try:
-        new_model = service.model_repo.load()
-        service.model = new_model
-        return {"message": "Model reloaded successfully"}
+        if response_type == payloads.JSON:
+            return await run_in_threadpool(_json_batch, service, skus)
+        content = await run_in_threadpool(_binary_batch, service, skus, response_type)
     except Exception as e:
-        raise HTTPException(status_code=500, detail="Reload failed: " + str(e))
+        ERRORS_TOTAL.inc(("/predict/batch", type(e).__name__))
+        raise HTTPException(status_code=500, detail="Prediction error: " + str(e))
+    return Response(content, media_type=response_type)
+
+
+@app.post("/reload-model", dependencies=[Depends(get_current_admin)])
+def reload_model(request: Request):
+    # Load + warm-up run in the background; the current model keeps serving
+    reloader: ModelReloader = request.app.state.reloader
+    if reloader.trigger():
+        message = "Model reload started"
+    else:
+        message = "Model reload already in progress"
+    return JSONResponse(
+        {"message": message, **reloader.status()},
+        status_code=status.HTTP_202_ACCEPTED,
+    )
+
+
+@app.get("/model")
+def model_status(request: Request):
+    reloader: ModelReloader = request.app.state.reloader
+    return reloader.status()
+
+
+@app.get("/metrics")
+def metrics() -> PlainTextResponse:
+    return PlainTextResponse(
+        REGISTRY.render(), media_type="text/plain; version=0.0.4; charset=utf-8"
+    )
 
 
 # --- Application entrypoint ---
@@ -0,0 +1,268 @@
+# src/inference/batch_score.py
+"""
+Scoring de tout le catalogue de SKU, hors API.
+
+Les features sont celles de PredictionService (FeatureIndex + features
+temporelles via build_feature_matrix). Les SKU sont découpés en partitions
+réparties sur un pool de processus ; chaque partition est écrite dans son
+propre fichier (part-00000.parquet, ...) dès qu'elle est calculée, ce qui
+borne la mémoire. Un manifeste permet de reprendre un scoring interrompu
+(--resume) en sautant les partitions déjà écrites.
+
+Usage (depuis src/, comme les étapes DVC) :
+    python -m inference.batch_score --output ../outputs/prices \\
+        --months 1-12 --hours 0-23 --workers 4 --format parquet
+"""
+
+import argparse
+import hashlib
+import json
+import logging
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Sequence, Tuple
+
+import numpy as np
+import pandas as pd
+
+from inference.entity.feature_index import NUMERIC_FEATURES, FeatureIndex
+from inference.repository.data_repository import file_md5, read_observations
+from inference.service.prediction_service import build_feature_matrix
+from inference.service.predictor import SCORING_ENGINES, build_predictor
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_FILE = "_manifest.json"
+
+# Prédicteur chargé une fois par processus du pool (cf. _init_worker)
+_PREDICTOR: Any = None
+
+
+def parse_range(value: str) -> List[int]:
+    """'1-12' -> [1..12], '0,6,12' -> [0, 6, 12]."""
+    values: List[int] = []
+    for part in value.split(","):
+        if "-" in part:
+            low, high = part.split("-")
+            values.extend(range(int(low), int(high) + 1))
+        else:
+            values.append(int(part))
+    return values
+
+
+def load_model(model_path: Path) -> Any:
+    """Ensemble compilé (.npz) ou modèle joblib (xgb_model.pkl)."""
+    if model_path.suffix == ".npz":
+        from inference.service.compiled_ensemble import CompiledEnsemble
+
+        return CompiledEnsemble.load(model_path)
+    import joblib
+
+    from inference.repository.model_repository import FeatureAlignedModel
+
+    return FeatureAlignedModel(joblib.load(model_path))
+
+
+def _init_worker(model_path: str, engine: str) -> None:
+    global _PREDICTOR
+    _PREDICTOR = build_predictor(load_model(Path(model_path)), engine=engine)
+
+
+def score_partition(
+    part_id: int,
+    skus: np.ndarray,
+    features: np.ndarray,
+    grid: Sequence[Tuple[int, int]],
+    output_dir: str,
+    fmt: str,
+) -> Tuple[int, int]:
+    """
+    Prédit toutes les (SKU, mois, heure) d'une partition et écrit le fichier.
+    Retourne (part_id, nombre de lignes écrites).
+    """
+    year = datetime.now().year
+    frames = []
+    for month, hour in grid:
+        matrix = build_feature_matrix(features, datetime(year, month, 1, hour))
+        frames.append(
+            pd.DataFrame(
+                {
+                    "sku": skus,
+                    "month": np.int8(month),
+                    "hour": np.int8(hour),
+                    "predicted_price": np.round(_PREDICTOR.predict(matrix), 2),
+                }
+            )
+        )
+    result = pd.concat(frames, ignore_index=True)
+
+    # Écriture atomique : un fichier final présent = partition terminée
+    final = Path(output_dir) / f"part-{part_id:05d}.{fmt}"
+    tmp = final.with_name(f".{final.name}.tmp")
+    if fmt == "parquet":
+        result.to_parquet(tmp, index=False)
+    else:
+        result.to_csv(tmp, index=False)
+    os.replace(tmp, final)
+    return part_id, len(result)
+
+
+def run_fingerprint(
+    data_hash: str, model_path: Path, grid: Sequence, partition_size: int, fmt: str
+) -> str:
+    """Empreinte des paramètres : une reprise n'est valide qu'à l'identique."""
+    payload = json.dumps(
+        [data_hash, file_md5(model_path), list(grid), partition_size, fmt]
+    )
+    return hashlib.md5(payload.encode("utf-8")).hexdigest()
+
+
+def batch_score(
+    data_path: Path,
+    model_path: Path,
+    output_dir: Path,
+    grid: Sequence[Tuple[int, int]],
+    partition_size: int = 5000,
+    workers: int = os.cpu_count() or 1,
+    fmt: str = "parquet",
+    engine: str = "auto",
+    resume: bool = False,
+) -> Dict[str, Any]:
+    output_dir.mkdir(parents=True, exist_ok=True)
+    data_hash = file_md5(data_path)
+    fingerprint = run_fingerprint(data_hash, model_path, grid, partition_size, fmt)
+    manifest_path = output_dir / MANIFEST_FILE
+
+    if resume and manifest_path.exists():
+        manifest = json.loads(manifest_path.read_text(encoding="utf-8"))
+        if manifest["fingerprint"] != fingerprint:
+            raise ValueError(
+                "Reprise impossible : données, modèle ou paramètres différents "
+                f"de ceux du scoring en cours dans {output_dir}"
+            )
+    else:
+        for stale in output_dir.glob(f"part-*.{fmt}"):
+            stale.unlink()
+        manifest = {
+            "fingerprint": fingerprint,
+            "data_path": str(data_path),
+            "data_hash": data_hash,
+            "model_path": str(model_path),
+            "grid": [list(bucket) for bucket in grid],
+            "partition_size": partition_size,
+            "format": fmt,
+            "started_at": datetime.now().isoformat(),
+        }
+        manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+
+    index = FeatureIndex.from_frame(
+        read_observations(data_path, columns=["SKU", "Timestamp", *NUMERIC_FEATURES])
+    )
+    # Même règle que PredictionService : au moins n_last observations
+    eligible = np.flatnonzero(index.counts >= index.n_last)
+    skus = np.asarray(index.skus, dtype=str)
+    partitions = [
+        eligible[start : start + partition_size]
+        for start in range(0, len(eligible), partition_size)
+    ]
+    done = (
+        {int(p.name[5:10]) for p in output_dir.glob(f"part-*.{fmt}")}
+        if resume
+        else set()
+    )
+    todo = [i for i in range(len(partitions)) if i not in done]
+    logger.info(
+        f"{len(eligible)} SKU éligibles ({len(index) - len(eligible)} ignorés), "
+        f"{len(grid)} créneaux, {len(partitions)} partitions "
+        f"({len(done)} déjà écrites)"
+    )
+
+    start = time.perf_counter()
+    rows = 0
+    with ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(str(model_path), engine),
+    ) as pool:
+        futures = [
+            pool.submit(
+                score_partition,
+                i,
+                skus[partitions[i]],
+                np.ascontiguousarray(index.features[partitions[i]]),
+                grid,
+                str(output_dir),
+                fmt,
+            )
+            for i in todo
+        ]
+        for completed, future in enumerate(as_completed(futures), start=1):
+            part_id, n_rows = future.result()
+            rows += n_rows
+            elapsed = time.perf_counter() - start
+            logger.info(
+                f"Partition {part_id} écrite ({completed}/{len(todo)}) - "
+                f"{rows} lignes, {rows / elapsed:,.0f} lignes/s"
+            )
+
+    elapsed = time.perf_counter() - start
+    manifest.update(
+        {
+            "n_partitions": len(partitions),
+            "n_skus": int(len(eligible)),
+            "n_skipped_skus": int(len(index) - len(eligible)),
+            "finished_at": datetime.now().isoformat(),
+        }
+    )
+    manifest_path.write_text(json.dumps(manifest, indent=2), encoding="utf-8")
+    return {"rows": rows, "seconds": elapsed, "partitions_written": len(todo)}
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description="Scoring de tout le catalogue")
+    parser.add_argument(
+        "--data", type=Path, default=Path("../data/raw/ingested_data.csv")
+    )
+    parser.add_argument(
+        "--model",
+        type=Path,
+        default=Path("../models/xgb_model.pkl"),
+        help="Modèle joblib (.pkl) ou ensemble compilé (.npz)",
+    )
+    parser.add_argument("--output", type=Path, required=True)
+    parser.add_argument("--months", help="Mois à scorer (ex. 1-12), défaut : courant")
+    parser.add_argument("--hours", help="Heures à scorer (ex. 0-23), défaut : courante")
+    parser.add_argument("--partition-size", type=int, default=5000)
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--format", choices=("parquet", "csv"), default="parquet")
+    parser.add_argument("--engine", choices=SCORING_ENGINES, default="auto")
+    parser.add_argument(
+        "--resume", action="store_true", help="Reprend après la dernière partition"
+    )
+    args = parser.parse_args()
+
+    now = datetime.now()
+    months = parse_range(args.months) if args.months else [now.month]
+    hours = parse_range(args.hours) if args.hours else [now.hour]
+    summary = batch_score(
+        data_path=args.data,
+        model_path=args.model,
+        output_dir=args.output,
+        grid=[(m, h) for m in months for h in hours],
+        partition_size=args.partition_size,
+        workers=args.workers,
+        fmt=args.format,
+        engine=args.engine,
+        resume=args.resume,
+    )
+    logger.info(
+        f"{summary['rows']} lignes en {summary['seconds']:.1f}s "
+        f"({summary['partitions_written']} partitions écrites)"
+    )
@@ -0,0 +1,163 @@
+# src/inference/benchmarks/batch_payloads.py
+"""
+Benchmark de /predict/batch selon le format des corps : JSON (Pydantic)
+vs Arrow IPC vs MessagePack, pour des lots de 10 000 SKU par défaut.
+
+Chaque mesure couvre l'aller-retour complet vu du client : encodage de la
+requête, traitement par l'application ASGI (décodage, prédiction,
+sérialisation) et décodage de la réponse en colonnes.
+
+Usage (depuis src/) :
+    python -m inference.benchmarks.batch_payloads --batch-size 10000
+"""
+
+import argparse
+import asyncio
+import dataclasses
+import json
+import logging
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+import numpy as np
+
+from inference.benchmarks.load_test import git_commit, in_process_app
+from inference.utils import payloads
+
+logger = logging.getLogger(__name__)
+
+
+def json_codec(skus: List[str]) -> Tuple[Dict[str, Any], Callable[[bytes], Any]]:
+    def decode(content: bytes) -> np.ndarray:
+        predictions = json.loads(content)["predictions"]
+        return np.array([p["predicted_price"] for p in predictions], dtype=np.float64)
+
+    return {"json": {"skus": skus}}, decode
+
+
+def arrow_codec(skus: List[str]) -> Tuple[Dict[str, Any], Callable[[bytes], Any]]:
+    import pyarrow as pa
+
+    table = pa.table({"sku": pa.array(skus, type=pa.string())})
+    sink = pa.BufferOutputStream()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+
+    def decode(content: bytes) -> np.ndarray:
+        column = pa.ipc.open_stream(content).read_all().column("predicted_price")
+        return column.to_numpy(zero_copy_only=False)
+
+    request = {
+        "content": sink.getvalue().to_pybytes(),
+        "headers": {"Content-Type": payloads.ARROW, "Accept": payloads.ARROW},
+    }
+    return request, decode
+
+
+def msgpack_codec(skus: List[str]) -> Tuple[Dict[str, Any], Callable[[bytes], Any]]:
+    import msgpack
+
+    def decode(content: bytes) -> np.ndarray:
+        columns = msgpack.unpackb(content, raw=False)
+        return np.asarray(columns["predicted_price"], dtype=np.float64)
+
+    request = {
+        "content": msgpack.packb({"skus": skus}, use_bin_type=True),
+        "headers": {"Content-Type": payloads.MSGPACK, "Accept": payloads.MSGPACK},
+    }
+    return request, decode
+
+
+CODECS = {"json": json_codec, "arrow": arrow_codec, "msgpack": msgpack_codec}
+
+
+async def measure(
+    client: Any, codec: Callable, skus: List[str], iterations: int, warmup: int
+) -> Dict[str, Any]:
+    latencies = np.empty(iterations)
+    for i in range(warmup + iterations):
+        start = time.perf_counter()
+        # L'encodage de la requête fait partie du coût mesuré
+        request, decode = codec(skus)
+        response = await client.post("/predict/batch", **request)
+        response.raise_for_status()
+        prices = decode(response.content)
+        if i >= warmup:
+            latencies[i - warmup] = time.perf_counter() - start
+    ms = latencies * 1000.0
+    return {
+        "latency_ms": {
+            "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)),
+            "mean": float(ms.mean()),
+        },
+        "request_bytes": len(request.get("content") or json.dumps(request["json"])),
+        "response_bytes": len(response.content),
+        "n_prices": int(np.count_nonzero(~np.isnan(prices))),
+    }
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    results: Dict[str, Any] = {}
+    with tempfile.TemporaryDirectory() as tmp:
+        app = in_process_app(args.batch_size, Path(tmp))
+        app.state.cfg = dataclasses.replace(
+            app.state.cfg, max_batch_size=args.batch_size
+        )
+        skus = app.state.service.index.skus.tolist()[: args.batch_size]
+        async with httpx.AsyncClient(
+            transport=httpx.ASGITransport(app=app),
+            base_url="http://bench",
+            timeout=args.timeout,
+        ) as client:
+            for name in args.formats:
+                results[name] = await measure(
+                    client, CODECS[name], skus, args.iterations, args.warmup
+                )
+
+    return {
+        "batch_size": args.batch_size,
+        "iterations": args.iterations,
+        "formats": results,
+        "commit": git_commit(),
+        "timestamp": datetime.now().isoformat(),
+    }
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(
+        description="Formats de /predict/batch : JSON vs Arrow vs MessagePack"
+    )
+    parser.add_argument("--batch-size", type=int, default=10_000)
+    parser.add_argument("--iterations", type=int, default=20)
+    parser.add_argument("--warmup", type=int, default=3)
+    parser.add_argument(
+        "--formats", nargs="+", choices=sorted(CODECS), default=list(CODECS)
+    )
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    reference = results["formats"].get("json", {}).get("latency_ms", {}).get("p50")
+    print(f"Lots de {results['batch_size']} SKU, {args.iterations} itérations")
+    for name, result in results["formats"].items():
+        latency = result["latency_ms"]
+        speedup = f"  x{reference / latency['p50']:.1f}" if reference else ""
+        print(
+            f"{name:8s} p50={latency['p50']:8.2f} ms  p95={latency['p95']:8.2f} ms  "
+            f"requête={result['request_bytes']:>9d} o  "
+            f"réponse={result['response_bytes']:>9d} o{speedup}"
+        )
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
@@ -0,0 +1,251 @@
+# src/inference/benchmarks/load_test.py
+"""
+Test de charge de l'API d'inférence : débit, latences (p50/p95/p99/max) et
+taux d'erreur de /predict sous une concurrence donnée.
+
+Cibles :
+  - application ASGI en processus (par défaut) : CSV synthétique et modèle
+    de substitution, aucun accès réseau ni MLflow ;
+  - serveur déjà lancé : --url http://localhost:8080
+
+Requêtes : rejeu d'un corpus JSONL ({"sku": "..."} par ligne, --corpus) ou
+mélange de SKU tiré selon une loi de Zipf (--zipf-s).
+
+Usage (depuis src/) :
+    python -m inference.benchmarks.load_test --requests 5000 --concurrency 32 \\
+        --output ../benchmarks/load_test.json
+"""
+
+import argparse
+import asyncio
+import json
+import logging
+import subprocess
+import tempfile
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from inference.entity.feature_index import NUMERIC_FEATURES
+from inference.repository.model_repository import ModelRepository
+
+logger = logging.getLogger(__name__)
+
+
+class InMemoryModelRepository(ModelRepository):
+    """Repository renvoyant un modèle déjà construit (benchmarks hors ligne)."""
+
+    version = "stand-in"
+
+    def __init__(self, model: Any):
+        self.model = model
+
+    def load(self) -> Any:
+        return self.model
+
+
+def synthetic_sales(
+    n_skus: int = 1000, obs_per_sku: int = 5, seed: int = 7
+) -> pd.DataFrame:
+    """Observations de ventes synthétiques au format de ingested_data.csv."""
+    rng = np.random.default_rng(seed)
+    n_rows = n_skus * obs_per_sku
+    frame = pd.DataFrame(
+        {
+            "SKU": np.repeat([f"SKU{i:05d}" for i in range(n_skus)], obs_per_sku),
+            "Prix": rng.uniform(10, 200, n_rows),
+            "Timestamp": (
+                pd.Timestamp("2024-01-01")
+                + pd.to_timedelta(rng.integers(0, 365 * 24 * 3600, n_rows), unit="s")
+            ).strftime("%Y-%m-%d %H:%M:%S"),
+        }
+    )
+    for name in NUMERIC_FEATURES:
+        frame[name] = rng.random(n_rows)
+    return frame
+
+
+def load_corpus(path: Path) -> List[str]:
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line)["sku"] for line in f if line.strip()]
+
+
+def zipf_mix(skus: List[str], n: int, s: float = 1.1, seed: int = 0) -> List[str]:
+    """n SKU tirés selon une loi de Zipf de paramètre s (rang 1 = plus demandé)."""
+    rng = np.random.default_rng(seed)
+    weights = 1.0 / np.arange(1, len(skus) + 1) ** s
+    order = rng.permutation(len(skus))
+    picks = rng.choice(len(skus), size=n, p=weights / weights.sum())
+    return [skus[order[i]] for i in picks]
+
+
+def in_process_app(n_skus: int, workdir: Path) -> Any:
+    """Application FastAPI branchée sur un CSV synthétique et un modèle local."""
+    from inference.api import app
+    from inference.benchmarks.predictor_latency import stand_in_model
+    from inference.entity.config_entity import InferenceConfig
+    from inference.repository.data_repository import CachingCsvDataRepository
+    from inference.service.model_reloader import ModelReloader
+    from inference.service.prediction_service import PredictionService
+
+    csv_path = workdir / "ingested_data.csv"
+    synthetic_sales(n_skus).to_csv(csv_path, index=False)
+    service = PredictionService(
+        CachingCsvDataRepository(csv_path),
+        InMemoryModelRepository(stand_in_model()),
+    )
+    reloader = ModelReloader(service)
+    reloader.warm_up_initial()
+    app.state.service = service
+    app.state.reloader = reloader
+    app.state.batcher = None
+    app.state.cfg = InferenceConfig(
+        data_csv_path=csv_path,
+        dvc_target="",
+        mlflow_tracking_uri="",
+        mlflow_model_name="",
+        host="127.0.0.1",
+        port=0,
+        log_level="WARNING",
+        admin_user="bench",
+        admin_password="bench",
+    )
+    return app
+
+
+async def drive(client: Any, skus: List[str], concurrency: int) -> Dict[str, Any]:
+    """Envoie les requêtes avec `concurrency` clients simultanés."""
+    latencies = np.empty(len(skus))
+    statuses: List[Optional[int]] = [None] * len(skus)
+    cursor = iter(range(len(skus)))
+
+    async def worker() -> None:
+        for i in cursor:
+            start = time.perf_counter()
+            try:
+                response = await client.post("/predict", json={"sku": skus[i]})
+                statuses[i] = response.status_code
+            except Exception:
+                statuses[i] = None
+            latencies[i] = time.perf_counter() - start
+
+    start = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    elapsed = time.perf_counter() - start
+    return summarize(latencies, statuses, elapsed)
+
+
+def summarize(
+    latencies: np.ndarray, statuses: List[Optional[int]], elapsed: float
+) -> Dict[str, Any]:
+    ms = latencies * 1000.0
+    codes: Dict[str, int] = {}
+    for code in statuses:
+        key = str(code) if code is not None else "transport_error"
+        codes[key] = codes.get(key, 0) + 1
+    n_errors = sum(n for key, n in codes.items() if not key.startswith("2"))
+    return {
+        "requests": len(latencies),
+        "duration_s": elapsed,
+        "throughput_rps": len(latencies) / elapsed if elapsed else None,
+        "latency_ms": {
+            "p50": float(np.percentile(ms, 50)),
+            "p95": float(np.percentile(ms, 95)),
+            "p99": float(np.percentile(ms, 99)),
+            "max": float(ms.max()),
+            "mean": float(ms.mean()),
+        },
+        "status_codes": codes,
+        "error_rate": n_errors / len(latencies),
+    }
+
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        ).stdout.strip()
+    except Exception:
+        return None
+
+
+async def run(args: argparse.Namespace) -> Dict[str, Any]:
+    import httpx
+
+    with tempfile.TemporaryDirectory() as tmp:
+        if args.url:
+            client = httpx.AsyncClient(base_url=args.url, timeout=args.timeout)
+            catalogue = [f"SKU{i:05d}" for i in range(args.n_skus)]
+        else:
+            app = in_process_app(args.n_skus, Path(tmp))
+            client = httpx.AsyncClient(
+                transport=httpx.ASGITransport(app=app),
+                base_url="http://load-test",
+                timeout=args.timeout,
+            )
+            catalogue = app.state.service.index.skus.tolist()
+
+        if args.corpus:
+            corpus = load_corpus(args.corpus)
+            skus = (corpus * (args.requests // len(corpus) + 1))[: args.requests]
+        else:
+            skus = zipf_mix(catalogue, args.requests, s=args.zipf_s, seed=args.seed)
+
+        async with client:
+            # Quelques requêtes de chauffe, non comptées
+            await drive(client, skus[: min(len(skus), args.concurrency * 2)], 4)
+            results = await drive(client, skus, args.concurrency)
+
+    results.update(
+        {
+            "target": args.url or "in-process",
+            "endpoint": "/predict",
+            "concurrency": args.concurrency,
+            "workload": str(args.corpus) if args.corpus else f"zipf(s={args.zipf_s})",
+            "commit": git_commit(),
+            "timestamp": datetime.now().isoformat(),
+        }
+    )
+    return results
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.WARNING,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description="Test de charge de /predict")
+    parser.add_argument(
+        "--url", help="Serveur cible (défaut : application ASGI locale)"
+    )
+    parser.add_argument("--corpus", type=Path, help="Corpus JSONL de SKU à rejouer")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--zipf-s", type=float, default=1.1)
+    parser.add_argument("--n-skus", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--timeout", type=float, default=30.0)
+    parser.add_argument("--output", type=Path, help="Fichier JSON de résultats")
+    args = parser.parse_args()
+
+    results = asyncio.run(run(args))
+    latency = results["latency_ms"]
+    print(
+        f"{results['requests']} requêtes en {results['duration_s']:.2f}s "
+        f"({results['throughput_rps']:.0f} req/s), concurrence={args.concurrency}"
+    )
+    print(
+        f"latence ms : p50={latency['p50']:.2f} p95={latency['p95']:.2f} "
+        f"p99={latency['p99']:.2f} max={latency['max']:.2f}"
+    )
+    print(f"codes : {results['status_codes']}  erreurs : {results['error_rate']:.2%}")
+    if args.output:
+        args.output.parent.mkdir(parents=True, exist_ok=True)
+        args.output.write_text(json.dumps(results, indent=2), encoding="utf-8")
@@ -0,0 +1,122 @@
+# src/inference/benchmarks/predictor_latency.py
+"""
+Micro-benchmark de latence d'une prédiction unitaire :
+chemin générique (DataFrame -> model.predict) vs chemin XGBoost natif
+vs ensemble compilé en tableaux NumPy.
+
+Usage (depuis src/) :
+    python -m inference.benchmarks.predictor_latency --model ../models/xgb_model.pkl
+    python -m inference.benchmarks.predictor_latency --model-uri models:/PriceFixerModel/1
+Sans modèle, un XGBRegressor de substitution est entraîné sur des données
+synthétiques.
+"""
+
+import argparse
+import logging
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict
+
+import numpy as np
+
+from inference.entity.feature_index import FEATURE_ORDER
+from inference.service.predictor import (
+    CompiledPredictor,
+    FramePredictor,
+    build_native_predictor,
+    build_predictor,
+)
+
+logger = logging.getLogger(__name__)
+
+
+def stand_in_model(n_estimators: int = 150, max_depth: int = 6, seed: int = 17) -> Any:
+    """XGBRegressor entraîné sur des données synthétiques (mêmes colonnes)."""
+    import pandas as pd
+    from xgboost import XGBRegressor
+
+    from inference.repository.model_repository import FeatureAlignedModel
+
+    rng = np.random.default_rng(seed)
+    X = pd.DataFrame(rng.random((2000, len(FEATURE_ORDER))), columns=FEATURE_ORDER)
+    y = X.to_numpy() @ rng.random(len(FEATURE_ORDER)) + rng.normal(0, 0.1, len(X))
+    model = XGBRegressor(
+        n_estimators=n_estimators, max_depth=max_depth, random_state=seed
+    )
+    return FeatureAlignedModel(model.fit(X, y))
+
+
+def time_calls(fn: Callable[[], Any], iterations: int, warmup: int = 50) -> Dict:
+    """Latences (µs) d'appels successifs à fn."""
+    for _ in range(warmup):
+        fn()
+    timings = np.empty(iterations)
+    for i in range(iterations):
+        start = time.perf_counter()
+        fn()
+        timings[i] = time.perf_counter() - start
+    timings *= 1e6
+    return {
+        "mean_us": float(timings.mean()),
+        "p50_us": float(np.percentile(timings, 50)),
+        "p99_us": float(np.percentile(timings, 99)),
+    }
+
+
+def run_benchmark(model: Any, iterations: int = 2000) -> Dict[str, Dict]:
+    row = np.random.default_rng(0).random((1, len(FEATURE_ORDER)))
+    generic = FramePredictor(model)
+    results = {"generic": time_calls(lambda: generic.predict(row), iterations)}
+
+    native = build_native_predictor(model)
+    if native is None:
+        logger.warning("Aucun Booster XGBoost détecté : chemin natif non mesuré")
+        return results
+
+    if not np.allclose(generic.predict(row), native.predict(row), rtol=1e-6):
+        raise AssertionError("Les chemins générique et natif divergent")
+    results["xgboost-native"] = time_calls(lambda: native.predict(row), iterations)
+
+    compiled = build_predictor(model, engine="compiled")
+    if isinstance(compiled, CompiledPredictor):
+        if not np.array_equal(native.predict(row), compiled.predict(row)):
+            raise AssertionError("Les chemins natif et compilé divergent")
+        results["compiled"] = time_calls(lambda: compiled.predict(row), iterations)
+    return results
+
+
+def load_model(args: argparse.Namespace) -> Any:
+    if args.model_uri:
+        import mlflow.pyfunc
+
+        return mlflow.pyfunc.load_model(args.model_uri)
+    if args.model:
+        import joblib
+
+        from inference.repository.model_repository import FeatureAlignedModel
+
+        return FeatureAlignedModel(joblib.load(str(args.model)))
+    return stand_in_model()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description="Latence predict : générique vs natif")
+    parser.add_argument("--model", type=Path, help="Modèle joblib (xgb_model.pkl)")
+    parser.add_argument("--model-uri", help="URI MLflow (chargé via pyfunc)")
+    parser.add_argument("--iterations", type=int, default=2000)
+    args = parser.parse_args()
+
+    results = run_benchmark(load_model(args), args.iterations)
+    for name, stats in results.items():
+        print(
+            f"{name:>15}: mean={stats['mean_us']:8.1f}µs  "
+            f"p50={stats['p50_us']:8.1f}µs  p99={stats['p99_us']:8.1f}µs"
+        )
+    for name in ("xgboost-native", "compiled"):
+        if name in results:
+            speedup = results["generic"]["p50_us"] / results[name]["p50_us"]
+            print(f"Accélération {name} (p50) : x{speedup:.1f}")
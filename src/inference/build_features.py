@@ -0,0 +1,67 @@
+# src/inference/build_features.py
+"""
+Étape DVC `feature_build` : agrège les N dernières observations de chaque
+SKU (groupby vectorisé de FeatureIndex.from_frame) et écrit l'artefact
+servi par l'API (cf. repository.feature_artifact).
+
+Usage (depuis src/, comme les autres étapes) :
+    python -m inference.build_features --config ../config/config.yaml
+"""
+
+import argparse
+import logging
+from pathlib import Path
+
+import pandas as pd
+
+from inference.entity.feature_index import (
+    N_LAST_OBSERVATIONS,
+    NUMERIC_FEATURES,
+    FeatureIndex,
+)
+from inference.repository.data_repository import file_md5, read_observations
+from inference.repository.feature_artifact import save_feature_artifact
+from inference.utils.common import read_yaml, with_storage_format
+
+logger = logging.getLogger(__name__)
+
+
+def build_features(source_path: Path, output_path: Path, n_last: int) -> FeatureIndex:
+    # Seules les colonnes utiles sont lues, avec des types explicites (portés
+    # par le schéma en Parquet ; jeu partitionné lu partition par partition)
+    columns = ["SKU", "Timestamp", *NUMERIC_FEATURES]
+    if source_path.suffix == ".parquet" or source_path.is_dir():
+        frame = read_observations(source_path, columns=columns)
+    else:
+        frame = pd.read_csv(
+            source_path,
+            usecols=columns,
+            dtype={
+                "SKU": str,
+                "Timestamp": str,
+                **dict.fromkeys(NUMERIC_FEATURES, float),
+            },
+            encoding="utf-8",
+        )
+    logger.info(f"Observations lues : {source_path} (shape={frame.shape})")
+    index = FeatureIndex.from_frame(frame, n_last=n_last)
+    save_feature_artifact(index, output_path, source_hash=file_md5(source_path))
+    return index
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Construit l'artefact de features")
+    parser.add_argument("--config", required=True, help="Path to config.yaml")
+    args = parser.parse_args()
+
+    config_path = Path(args.config).resolve()
+    project_root = config_path.parent.parent
+    config = read_yaml(config_path)
+    cfg = config.feature_build
+    storage_format = config.get("storage", {}).get("format", "csv")
+    build_features(
+        source_path=project_root
+        / with_storage_format(Path(cfg.source_path), storage_format),
+        output_path=project_root / cfg.output_path,
+        n_last=int(cfg.get("n_last", N_LAST_OBSERVATIONS)),
+    )
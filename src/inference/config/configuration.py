@@ -4,11 +4,20 @@ from box import ConfigBox
 from dotenv import load_dotenv
 
 from inference.entity.config_entity import InferenceConfig
-from inference.utils.common import read_yaml, create_directories
+from inference.utils.common import (
+    read_yaml,
+    create_directories,
+    with_storage_format,
+)
 
 # Charger automatiquement les variables d'environnement depuis .env à la racine du projet
 load_dotenv()
 
+# Sources de features servies (inference.data_source)
+DATA_SOURCES = ("csv", "dvc", "tail", "artifact")
+# Sources dont la table partagée entre workers peut être construite
+SHARED_FEATURES_SOURCES = ("csv", "dvc")
+
 
 class ConfigurationManager:
     """
@@ -26,14 +35,51 @@ class ConfigurationManager:
         self.params: ConfigBox = read_yaml(Path(params_path))
 
         # Préparation du répertoire de données
-        data_csv = Path(self.config.inference.data_csv_path)
+        # Données ingérées au format de stockage configuré (csv ou parquet)
+        storage_format = self.config.get("storage", {}).get("format", "csv")
+        data_csv = with_storage_format(
+            Path(self.config.inference.data_csv_path), storage_format
+        )
         raw_dir = data_csv.parent
         create_directories([raw_dir])
 
+        # Regroupement des requêtes (section optionnelle)
+        micro_batching = self.config.inference.get("micro_batching", None) or {}
+        # Cache des prédictions (section optionnelle)
+        prediction_cache = self.config.inference.get("prediction_cache", None) or {}
+        # Contrôle d'admission (section optionnelle)
+        admission = self.config.inference.get("admission_control", None) or {}
+
+        # Cache local du modèle et modèle de secours (optionnels)
+        model_cache_dir = self.config.inference.get("model_cache_dir", None)
+        fallback_model_path = self.config.inference.get("fallback_model_path", None)
+        compiled_model_path = self.config.inference.get("compiled_model_path", None)
+        # Artefact de features par SKU (optionnel, cf. data_source)
+        feature_artifact_path = self.config.inference.get("feature_artifact_path", None)
+        # Table de prix pré-calculée (optionnelle)
+        price_table_path = self.config.inference.get("price_table_path", None)
+        # Table de features partagée entre workers (optionnelle)
+        shared_features_dir = self.config.inference.get("shared_features_dir", None)
+
+        # Source des features et table partagée : la table est construite à
+        # partir des observations brutes (sources csv et dvc uniquement)
+        data_source = self.config.inference.get("data_source", "csv")
+        if data_source not in DATA_SOURCES:
+            raise ValueError(
+                f"data_source inconnue : {data_source} (attendu : {DATA_SOURCES})"
+            )
+        if shared_features_dir and data_source not in SHARED_FEATURES_SOURCES:
+            raise ValueError(
+                f"shared_features_dir n'est pas compatible avec data_source "
+                f"'{data_source}' (sources possibles : {SHARED_FEATURES_SOURCES})"
+            )
+
         # Construction de la configuration d'inférence
         self._inference_config = InferenceConfig(
             data_csv_path=data_csv,
-            dvc_target=self.config.inference.dvc_target,
+            dvc_target=with_storage_format(
+                Path(self.config.inference.dvc_target), storage_format
+            ).as_posix(),
             mlflow_tracking_uri=self.config.inference.mlflow_tracking_uri,
             mlflow_model_name=self.config.inference.mlflow_model_name,
             host=self.config.inference.host,
@@ -45,6 +91,44 @@ class ConfigurationManager:
             admin_password=os.getenv(
                 "ADMIN_PASSWORD", self.config.inference.get("admin_password", None)
             ),
+            max_batch_size=int(self.config.inference.get("max_batch_size", 1000)),
+            data_refresh_interval=float(
+                self.config.inference.get("data_refresh_interval", 30.0)
+            ),
+            micro_batching_enabled=bool(micro_batching.get("enabled", False)),
+            micro_batching_max_wait_ms=float(micro_batching.get("max_wait_ms", 2.0)),
+            micro_batching_max_batch_size=int(micro_batching.get("max_batch_size", 64)),
+            prediction_cache_enabled=bool(prediction_cache.get("enabled", False)),
+            prediction_cache_max_entries=int(
+                prediction_cache.get("max_entries", 100_000)
+            ),
+            prediction_cache_ttl_seconds=float(
+                prediction_cache.get("ttl_seconds", 3600.0)
+            ),
+            admission_enabled=bool(admission.get("enabled", False)),
+            admission_max_concurrency=int(admission.get("max_concurrency", 32)),
+            admission_max_queue=int(admission.get("max_queue", 64)),
+            admission_timeout_ms=float(admission.get("request_timeout_ms", 1000.0)),
+            admission_retry_after_seconds=float(
+                admission.get("retry_after_seconds", 1.0)
+            ),
+            admission_shed_status_code=int(admission.get("shed_status_code", 503)),
+            model_cache_dir=Path(model_cache_dir) if model_cache_dir else None,
+            fallback_model_path=(
+                Path(fallback_model_path) if fallback_model_path else None
+            ),
+            scoring_engine=self.config.inference.get("scoring_engine", "auto"),
+            compiled_model_path=(
+                Path(compiled_model_path) if compiled_model_path else None
+            ),
+            shared_features_dir=(
+                Path(shared_features_dir) if shared_features_dir else None
+            ),
+            price_table_path=Path(price_table_path) if price_table_path else None,
+            data_source=data_source,
+            feature_artifact_path=(
+                Path(feature_artifact_path) if feature_artifact_path else None
+            ),
         )
 
     def get_config(self) -> InferenceConfig:
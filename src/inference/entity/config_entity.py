@@ -1,5 +1,6 @@
 from dataclasses import dataclass
 from pathlib import Path
+from typing import Optional
 
 
 @dataclass(frozen=True)
@@ -9,14 +10,36 @@ class InferenceConfig:
 
     Attributes:
         data_csv_path: Path          # Chemin local vers le CSV de données
+        data_source: str             # Source des features : csv, dvc, tail (CSV en ajout seul) ou artifact
+        feature_artifact_path: Path  # Artefact de features par SKU (étape DVC feature_build)
         dvc_target: str              # Cible DVC (ex: "data/raw/ingested_data.csv")
         mlflow_tracking_uri: str     # URI du serveur MLflow (ex: DagsHub)
         mlflow_model_name: str       # Nom du modèle dans le registry MLflow
+        model_cache_dir: Path        # Cache local des versions téléchargées (None = désactivé)
+        fallback_model_path: Path    # Modèle local (DVC) si registry et cache indisponibles
+        scoring_engine: str          # Moteur de scoring : auto, generic, native, compiled
+        compiled_model_path: Path    # Ensemble compilé (.npz) servi par le moteur compiled
+        price_table_path: Path       # Table (SKU, mois, heure) -> prix pré-calculée (None = désactivée)
         host: str                    # Adresse d'écoute de FastAPI (ex: "0.0.0.0")
         port: int                    # Port d'écoute (ex: 8080)
         log_level: str               # Niveau de log (ex: "INFO")
         admin_user: str              # Utilisateur HTTP Basic pour endpoints admin
         admin_password: str          # Mot de passe HTTP Basic pour endpoints admin
+        max_batch_size: int          # Nombre maximal de SKU par appel /predict/batch
+        data_refresh_interval: float # Période (s) de vérification du CSV en arrière-plan
+        shared_features_dir: Path    # Table de features mappée par tous les workers (None = désactivé)
+        micro_batching_enabled: bool        # Regroupe les /predict concurrents
+        micro_batching_max_wait_ms: float   # Fenêtre de regroupement (ms)
+        micro_batching_max_batch_size: int  # Nombre maximal de SKU par lot
+        prediction_cache_enabled: bool      # Cache des prix par (SKU, mois, heure, versions)
+        prediction_cache_max_entries: int   # Taille maximale du cache (LRU)
+        prediction_cache_ttl_seconds: float # Durée de vie d'une entrée (s)
+        admission_enabled: bool             # Limite de concurrence sur /predict et /predict/batch
+        admission_max_concurrency: int      # Requêtes d'inférence traitées simultanément
+        admission_max_queue: int            # Requêtes en attente au-delà (puis rejet immédiat)
+        admission_timeout_ms: float         # Échéance par défaut (plafond de X-Request-Timeout-Ms)
+        admission_retry_after_seconds: float  # Valeur de l'en-tête Retry-After
+        admission_shed_status_code: int     # Code des requêtes rejetées (503 ou 429)
     """
 
     data_csv_path: Path
@@ -28,3 +51,25 @@ class InferenceConfig:
     log_level: str
     admin_user: str
     admin_password: str
+    max_batch_size: int = 1000
+    data_refresh_interval: float = 30.0
+    micro_batching_enabled: bool = False
+    micro_batching_max_wait_ms: float = 2.0
+    micro_batching_max_batch_size: int = 64
+    prediction_cache_enabled: bool = False
+    prediction_cache_max_entries: int = 100_000
+    prediction_cache_ttl_seconds: float = 3600.0
+    admission_enabled: bool = False
+    admission_max_concurrency: int = 32
+    admission_max_queue: int = 64
+    admission_timeout_ms: float = 1000.0
+    admission_retry_after_seconds: float = 1.0
+    admission_shed_status_code: int = 503
+    model_cache_dir: Optional[Path] = None
+    fallback_model_path: Optional[Path] = None
+    scoring_engine: str = "auto"
+    compiled_model_path: Optional[Path] = None
+    shared_features_dir: Optional[Path] = None
+    price_table_path: Optional[Path] = None
+    data_source: str = "csv"
+    feature_artifact_path: Optional[Path] = None
@@ -1,5 +1,8 @@
 from dataclasses import dataclass
 from datetime import datetime
+from typing import List, Optional
+
+import numpy as np
 
 
 @dataclass(frozen=True)
@@ -16,3 +19,40 @@ class PredictionResult:
     sku: str
     timestamp: datetime
     predicted_price: float
+
+
+@dataclass(frozen=True)
+class PredictionFailure:
+    """
+    Échec de prédiction pour un SKU d'un lot, sans faire échouer le lot entier.
+
+    Attributes:
+        sku: str               # Identifiant du produit demandé
+        error: str             # Type d'erreur (ex: "SkuNotFoundError")
+        detail: str            # Message d'erreur
+    """
+
+    sku: str
+    error: str
+    detail: str
+
+
+@dataclass(frozen=True)
+class BatchPredictionColumns:
+    """
+    Résultat d'un lot sous forme de colonnes (une position par SKU demandé),
+    sans objet Python par ligne : sérialisé tel quel en Arrow / MessagePack.
+
+    Attributes:
+        timestamp: datetime         # Horodatage commun du lot
+        skus: List[str]             # SKU demandés, dans l'ordre de la requête
+        prices: np.ndarray          # Prix prédits (float64, NaN = échec)
+        errors: List[Optional[str]] # Type d'erreur par SKU (None = succès)
+        details: List[Optional[str]]  # Message d'erreur par SKU
+    """
+
+    timestamp: datetime
+    skus: List[str]
+    prices: np.ndarray
+    errors: List[Optional[str]]
+    details: List[Optional[str]]
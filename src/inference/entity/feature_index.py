@@ -0,0 +1,112 @@
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Features numériques moyennées sur les dernières observations de chaque SKU
+NUMERIC_FEATURES: List[str] = [
+    "PrixInitial",
+    "AgeProduitEnJours",
+    "QuantiteVendue",
+    "UtiliteProduit",
+    "ElasticitePrix",
+    "Remise",
+    "Qualite",
+]
+
+# Features temporelles calculées au moment de la prédiction
+TIME_FEATURES: List[str] = ["Mois_sin", "Mois_cos", "Heure_sin", "Heure_cos"]
+
+# Ordre des colonnes attendu par le modèle
+FEATURE_ORDER: List[str] = NUMERIC_FEATURES + TIME_FEATURES
+
+# Nombre d'observations récentes moyennées par SKU
+N_LAST_OBSERVATIONS = 3
+
+
+@dataclass(frozen=True)
+class FeatureIndex:
+    """
+    Index en mémoire des features agrégées par SKU.
+
+    Le SKU est stocké sous forme de code catégoriel (position dans `skus`),
+    les features moyennées dans une matrice contiguë (n_skus x 7).
+
+    Attributes:
+        skus: np.ndarray        # Catégories de SKU, triées (code -> SKU)
+        features: np.ndarray    # Moyenne des N dernières observations (float64)
+        counts: np.ndarray      # Nombre d'observations retenues par SKU (<= n_last)
+        n_last: int             # Nombre d'observations moyennées
+    """
+
+    skus: np.ndarray
+    features: np.ndarray
+    counts: np.ndarray
+    n_last: int = N_LAST_OBSERVATIONS
+    positions: Dict[str, int] = field(default=None, repr=False, compare=False)
+
+    def __post_init__(self):
+        if self.positions is None:
+            object.__setattr__(
+                self,
+                "positions",
+                {sku: code for code, sku in enumerate(self.skus.tolist())},
+            )
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    def lookup(self, sku: str) -> Optional[int]:
+        """Retourne le code catégoriel du SKU, ou None s'il est absent."""
+        return self.positions.get(sku)
+
+    @classmethod
+    def from_frame(
+        cls, df: pd.DataFrame, n_last: int = N_LAST_OBSERVATIONS
+    ) -> "FeatureIndex":
+        """
+        Construit l'index en une passe vectorisée : tri par (SKU, Timestamp
+        décroissant), rang dans chaque groupe, puis moyenne des `n_last`
+        premières lignes via np.bincount.
+        """
+        codes, skus = pd.factorize(df["SKU"].astype(str), sort=True)
+        n_skus = len(skus)
+        if n_skus == 0:
+            return cls(
+                skus=np.asarray(skus, dtype=object),
+                features=np.empty((0, len(NUMERIC_FEATURES)), dtype=np.float64),
+                counts=np.empty(0, dtype=np.int32),
+                n_last=n_last,
+            )
+
+        # Timestamp comparé tel quel (comme le tri d'origine), NaN en dernier
+        ts_codes, _ = pd.factorize(df["Timestamp"], sort=True)
+        order = np.lexsort((-ts_codes, codes))
+        sorted_codes = codes[order]
+
+        # Rang de chaque ligne dans son groupe de SKU
+        group_sizes = np.bincount(sorted_codes, minlength=n_skus)
+        group_starts = np.concatenate(([0], np.cumsum(group_sizes)[:-1]))
+        ranks = np.arange(len(sorted_codes)) - group_starts[sorted_codes]
+        keep = order[ranks < n_last]
+        kept_codes = codes[keep]
+
+        values = df[NUMERIC_FEATURES].to_numpy(dtype=np.float64)[keep]
+        features = np.empty((n_skus, len(NUMERIC_FEATURES)), dtype=np.float64)
+        for j in range(len(NUMERIC_FEATURES)):
+            col = values[:, j]
+            valid = ~np.isnan(col)
+            sums = np.bincount(
+                kept_codes, weights=np.where(valid, col, 0.0), minlength=n_skus
+            )
+            n_valid = np.bincount(kept_codes, weights=valid, minlength=n_skus)
+            with np.errstate(invalid="ignore", divide="ignore"):
+                features[:, j] = sums / n_valid
+
+        return cls(
+            skus=np.asarray(skus, dtype=object),
+            features=np.ascontiguousarray(features),
+            counts=np.minimum(group_sizes, n_last).astype(np.int32),
+            n_last=n_last,
+        )
@@ -1,7 +1,25 @@
 from abc import ABC, abstractmethod
+from dataclasses import dataclass
+from datetime import datetime
 from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+import hashlib
+import json
+import logging
+import os
 import subprocess
+import threading
+import time
 import pandas as pd
+import yaml
+
+from inference.entity.feature_index import FeatureIndex
+from inference.utils.metrics import RELOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Manifeste d'un jeu de données partitionné (ingestion incrémentale)
+MANIFEST_NAME = "_manifest.json"
 
 
 class DataRepository(ABC):
@@ -15,6 +33,17 @@ class DataRepository(ABC):
         """Charge et retourne un DataFrame contenant les données."""
         pass
 
+    def load_index(self) -> Optional[FeatureIndex]:
+        """
+        Index des features par SKU déjà matérialisé par la source, ou None
+        (le service le construit alors à partir de load()).
+        """
+        return None
+
+    def content_hash(self) -> Optional[str]:
+        """Hash MD5 des données servies, ou None s'il n'est pas connu."""
+        return None
+
 
 class CsvDataRepository(DataRepository):
     """
@@ -27,32 +56,362 @@ class CsvDataRepository(DataRepository):
     def load(self) -> pd.DataFrame:
         if not self.csv_path.exists():
             raise FileNotFoundError(f"CSV file not found: {self.csv_path}")
-        df = pd.read_csv(self.csv_path, encoding="utf-8")
+        df = read_observations(self.csv_path)
         return df
 
+    def content_hash(self) -> Optional[str]:
+        return file_md5(self.csv_path) if self.csv_path.exists() else None
+
+
+def read_observations(path: Path, columns: Optional[List[str]] = None) -> pd.DataFrame:
+    """
+    Observations au format CSV ou Parquet (selon l'extension, cf.
+    storage.format) ; `columns` limite les colonnes chargées. Un répertoire
+    est un jeu partitionné (ingestion incrémentale) : partitions du
+    manifeste, dans l'ordre.
+    """
+    path = Path(path)
+    if path.is_dir():
+        with open(path / MANIFEST_NAME, encoding="utf-8") as f:
+            partitions = json.load(f)["partitions"]
+        if not partitions:
+            raise ValueError(f"Jeu de données partitionné vide : {path}")
+        frames = [read_observations(path / p["path"], columns) for p in partitions]
+        return pd.concat(frames, ignore_index=True)
+    if path.suffix == ".parquet":
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=columns, encoding="utf-8")
+
+
+def file_md5(path: Path) -> str:
+    """
+    Hash MD5 du contenu, lu par blocs pour gérer les gros fichiers. Pour un
+    jeu partitionné : MD5 du manifeste, qui liste le MD5 de chaque partition.
+    """
+    if Path(path).is_dir():
+        path = Path(path) / MANIFEST_NAME
+    hasher = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def dvc_dir_md5(path: Path) -> str:
+    """
+    Hash d'un répertoire tel que DVC 3 l'écrit dans dvc.lock (`<md5>.dir`) :
+    MD5 de la liste JSON de ses fichiers ({"md5", "relpath"}), triée par
+    chemin relatif.
+    """
+    path = Path(path)
+    entries = sorted(
+        (
+            {"md5": file_md5(f), "relpath": f.relative_to(path).as_posix()}
+            for f in path.rglob("*")
+            if f.is_file()
+        ),
+        key=lambda entry: entry["relpath"],
+    )
+    listing = json.dumps(entries, sort_keys=True).encode("utf-8")
+    return f"{hashlib.md5(listing).hexdigest()}.dir"
+
+
+@dataclass(frozen=True)
+class DataSnapshot:
+    """
+    Version immuable des données chargées.
+
+    Attributes:
+        frame: pd.DataFrame              # Données parsées
+        signature: Tuple[int, int]       # (mtime_ns, taille) du fichier source
+        content_hash: str                # MD5 du contenu
+        version: int                     # Numéro de version croissant
+        loaded_at: datetime              # Date de chargement
+    """
+
+    frame: pd.DataFrame
+    signature: Tuple[int, int]
+    content_hash: str
+    version: int
+    loaded_at: datetime
+
+
+class CachingCsvDataRepository(DataRepository):
+    """
+    Chargement CSV avec cache en mémoire.
+
+    Le fichier n'est re-parsé que si sa signature (mtime, taille) change ET
+    que son hash de contenu diffère. Le rechargement se fait dans un thread
+    d'arrière-plan ; le nouveau snapshot est publié par simple réaffectation
+    de référence, les requêtes en cours continuent sur l'ancien.
+    """
+
+    def __init__(self, csv_path: Path, refresh_interval: float = 30.0):
+        self.csv_path = csv_path
+        self.refresh_interval = refresh_interval
+        self._snapshot: Optional[DataSnapshot] = None
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[DataSnapshot], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Statistiques
+        self.load_count = 0
+        self.cache_hits = 0
+        self.last_reload_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def snapshot(self) -> DataSnapshot:
+        """Snapshot courant (chargé de façon synchrone au premier accès)."""
+        snapshot = self._snapshot
+        if snapshot is None:
+            self.refresh()
+            snapshot = self._snapshot
+        return snapshot
+
+    def load(self) -> pd.DataFrame:
+        if self._snapshot is not None:
+            self.cache_hits += 1
+        return self.snapshot.frame
+
+    def content_hash(self) -> Optional[str]:
+        return self.snapshot.content_hash
+
+    def add_listener(self, callback: Callable[[DataSnapshot], None]) -> None:
+        """Enregistre un callback appelé après chaque publication de snapshot."""
+        self._listeners.append(callback)
+
+    def refresh(self) -> bool:
+        """
+        Vérifie le fichier et le recharge s'il a changé.
+        Retourne True si un nouveau snapshot a été publié.
+        """
+        with self._reload_lock:
+            if not self.csv_path.exists():
+                raise FileNotFoundError(f"CSV file not found: {self.csv_path}")
+            stat = self.csv_path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+            current = self._snapshot
+            if current is not None and current.signature == signature:
+                return False
+
+            content_hash = file_md5(self.csv_path)
+            if current is not None and current.content_hash == content_hash:
+                # Fichier touché mais contenu identique : pas de re-parsing
+                self._snapshot = DataSnapshot(
+                    frame=current.frame,
+                    signature=signature,
+                    content_hash=content_hash,
+                    version=current.version,
+                    loaded_at=current.loaded_at,
+                )
+                return False
+
+            start = time.perf_counter()
+            frame = read_observations(self.csv_path)
+            snapshot = DataSnapshot(
+                frame=frame,
+                signature=signature,
+                content_hash=content_hash,
+                version=(current.version + 1) if current is not None else 1,
+                loaded_at=datetime.now(),
+            )
+            self.last_reload_duration = time.perf_counter() - start
+            RELOAD_SECONDS.observe(self.last_reload_duration, ("data",))
+            self.load_count += 1
+            # Publication atomique du nouveau snapshot
+            self._snapshot = snapshot
+            logger.info(
+                f"Données rechargées : {self.csv_path} (version={snapshot.version}, "
+                f"{len(frame)} lignes, {self.last_reload_duration:.3f}s)"
+            )
+
+        for callback in self._listeners:
+            callback(snapshot)
+        return True
+
+    def start(self) -> None:
+        """Démarre le thread de surveillance du fichier."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="csv-data-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_interval)
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # On continue à servir le snapshot précédent
+                self.last_error = str(e)
+                logger.error(f"Échec du rafraîchissement des données : {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        snapshot = self._snapshot
+        return {
+            "load_count": self.load_count,
+            "cache_hits": self.cache_hits,
+            "last_reload_duration": self.last_reload_duration,
+            "version": snapshot.version if snapshot else None,
+            "content_hash": snapshot.content_hash if snapshot else None,
+            "last_error": self.last_error,
+        }
 
-class DvcDataRepository(DataRepository):
+
+class DvcDataRepository(CachingCsvDataRepository):
     """
     Chargement des données versionnées via DVC.
 
-    This implementation pulls the latest data from DVC remote before loading locally.
+    Le hash attendu de la cible est lu dans `<cible>.dvc` ou, à défaut, dans
+    dvc.lock (chemins résolus avec le `wdir` des étapes de dvc.yaml), puis
+    comparé au hash du fichier local (mis en cache par signature ; pour un
+    jeu partitionné, hash de répertoire `<md5>.dir` calculé comme DVC, le
+    MD5 du manifeste n'étant pas comparable). `dvc pull`
+    n'est lancé que s'ils diffèrent, et uniquement depuis le thread de
+    surveillance : les requêtes continuent sur le snapshot précédent pendant
+    le téléchargement. Seul le tout premier chargement, si le fichier local
+    est absent, tire les données de façon synchrone.
     """
 
-    def __init__(self, dvc_target: str, csv_path: Path):
+    def __init__(
+        self,
+        dvc_target: str,
+        csv_path: Path,
+        refresh_interval: float = 30.0,
+        repo_root: Path = Path("."),
+        pull_timeout: float = 600.0,
+    ):
         # dvc_target: the path in DVC (e.g. "data/raw/ingested_data.csv")
+        super().__init__(csv_path, refresh_interval=refresh_interval)
         self.dvc_target = dvc_target
-        self.csv_path = csv_path
+        self.repo_root = Path(repo_root)
+        self.pull_timeout = pull_timeout
+        self._local_hash: Optional[Tuple[Tuple[int, int], str]] = None
+        # Statistiques
+        self.pull_count = 0
+        self.last_pull_duration: Optional[float] = None
+        self.expected_hash: Optional[str] = None
 
-    def load(self) -> pd.DataFrame:
-        # Ensure latest from DVC
-        try:
-            subprocess.run(["dvc", "pull", self.dvc_target], check=True)
-        except subprocess.CalledProcessError as e:
-            raise RuntimeError(f"DVC pull failed for {self.dvc_target}: {e}")
+    def _read_yaml(self, name: str) -> Optional[dict]:
+        path = self.repo_root / name
+        if not path.exists():
+            return None
+        with open(path, "r", encoding="utf-8") as f:
+            return yaml.safe_load(f) or {}
+
+    def read_expected_hash(self) -> Optional[str]:
+        """MD5 attendu de la cible d'après `<cible>.dvc` ou dvc.lock, sinon None."""
+        target = os.path.normpath(self.dvc_target)
+        dvc_file = self._read_yaml(f"{self.dvc_target}.dvc")
+        if dvc_file is not None:
+            for out in dvc_file.get("outs", []):
+                path = os.path.join(os.path.dirname(target), out["path"])
+                if os.path.normpath(path) == target:
+                    return out.get("md5")
 
+        lock = self._read_yaml("dvc.lock")
+        if lock is None:
+            return None
+        stages = (self._read_yaml("dvc.yaml") or {}).get("stages", {})
+        for name, stage in lock.get("stages", {}).items():
+            wdir = (stages.get(name) or {}).get("wdir", ".")
+            for out in stage.get("outs", []):
+                if os.path.normpath(os.path.join(wdir, out["path"])) == target:
+                    return out.get("md5")
+        return None
+
+    def local_hash(self) -> Optional[str]:
+        """
+        Hash local au format de dvc.lock, recalculé seulement si la signature
+        change : MD5 du fichier, ou hash `<md5>.dir` d'un jeu partitionné.
+        """
         if not self.csv_path.exists():
-            raise FileNotFoundError(
-                f"CSV file not found after DVC pull: {self.csv_path}"
+            return None
+        stat = self.csv_path.stat()
+        signature = (stat.st_mtime_ns, stat.st_size)
+        cached = self._local_hash
+        if cached is not None and cached[0] == signature:
+            return cached[1]
+        snapshot = self._snapshot
+        if self.csv_path.is_dir():
+            # Le répertoire change de signature à chaque réécriture du manifeste
+            content_hash = dvc_dir_md5(self.csv_path)
+        elif snapshot is not None and snapshot.signature == signature:
+            content_hash = snapshot.content_hash
+        else:
+            content_hash = file_md5(self.csv_path)
+        self._local_hash = (signature, content_hash)
+        return content_hash
+
+    def pull(self) -> None:
+        start = time.perf_counter()
+        try:
+            subprocess.run(
+                ["dvc", "pull", self.dvc_target],
+                check=True,
+                cwd=self.repo_root,
+                timeout=self.pull_timeout,
             )
-        df = pd.read_csv(self.csv_path, encoding="utf-8")
-        return df
+        except (subprocess.CalledProcessError, subprocess.TimeoutExpired) as e:
+            raise RuntimeError(f"DVC pull failed for {self.dvc_target}: {e}")
+        self.last_pull_duration = time.perf_counter() - start
+        self.pull_count += 1
+        logger.info(
+            f"dvc pull {self.dvc_target} terminé ({self.last_pull_duration:.1f}s)"
+        )
+
+    def sync(self) -> bool:
+        """Tire la cible si le hash attendu diffère du hash local."""
+        self.expected_hash = self.read_expected_hash()
+        local = self.local_hash()
+        if local is not None and (self.expected_hash in (None, local)):
+            return False
+        logger.info(
+            f"Données DVC à mettre à jour : {self.dvc_target} "
+            f"(attendu={self.expected_hash}, local={local})"
+        )
+        self.pull()
+        return True
+
+    @property
+    def snapshot(self) -> DataSnapshot:
+        if self._snapshot is None and not self.csv_path.exists():
+            self.sync()
+            if not self.csv_path.exists():
+                raise FileNotFoundError(
+                    f"CSV file not found after DVC pull: {self.csv_path}"
+                )
+        return super().snapshot
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.sync()
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # On continue à servir le snapshot précédent
+                self.last_error = str(e)
+                logger.error(f"Échec de la synchronisation DVC : {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        stats = super().stats()
+        stats.update(
+            {
+                "dvc_target": self.dvc_target,
+                "expected_hash": self.expected_hash,
+                "pull_count": self.pull_count,
+                "last_pull_duration": self.last_pull_duration,
+            }
+        )
+        return stats
@@ -0,0 +1,196 @@
+# src/inference/repository/feature_artifact.py
+"""
+Artefact des features agrégées par SKU, produit par l'étape DVC
+`feature_build` (python -m inference.build_features).
+
+Un seul fichier .npz typé : SKU, moyennes des N dernières observations
+(float64), nombre d'observations (int32), N, noms des features et hash MD5
+du CSV source. Sa taille dépend du nombre de SKU, pas du nombre
+d'observations.
+"""
+
+import logging
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from inference.entity.feature_index import (
+    N_LAST_OBSERVATIONS,
+    NUMERIC_FEATURES,
+    FeatureIndex,
+)
+from inference.repository.data_repository import DataRepository
+from inference.utils.metrics import RELOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Version du format, incrémentée à chaque changement incompatible
+ARTIFACT_FORMAT = 1
+
+
+def save_feature_artifact(index: FeatureIndex, path: Path, source_hash: str) -> None:
+    """Écrit l'artefact (fichier temporaire puis os.replace)."""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.stem}.tmp.npz")
+    np.savez(
+        tmp,
+        format=np.int32(ARTIFACT_FORMAT),
+        skus=np.asarray(index.skus, dtype=str),
+        features=np.ascontiguousarray(index.features, dtype=np.float64),
+        counts=np.asarray(index.counts, dtype=np.int32),
+        n_last=np.int32(index.n_last),
+        feature_names=np.asarray(NUMERIC_FEATURES, dtype=str),
+        source_hash=np.str_(source_hash),
+    )
+    os.replace(tmp, path)
+    logger.info(f"Artefact de features écrit → {path} ({len(index)} SKU)")
+
+
+def load_feature_artifact(path: Path) -> Tuple[FeatureIndex, str]:
+    """Retourne (index, hash MD5 du CSV source)."""
+    with np.load(Path(path), allow_pickle=False) as data:
+        if int(data["format"]) != ARTIFACT_FORMAT:
+            raise ValueError(
+                f"Format d'artefact {int(data['format'])} non supporté "
+                f"(attendu {ARTIFACT_FORMAT}) : {path}"
+            )
+        feature_names = data["feature_names"].tolist()
+        if feature_names != NUMERIC_FEATURES:
+            raise ValueError(
+                f"Features de l'artefact {feature_names} != {NUMERIC_FEATURES}"
+            )
+        index = FeatureIndex(
+            skus=data["skus"],
+            features=data["features"],
+            counts=data["counts"],
+            n_last=int(data["n_last"]),
+        )
+        return index, str(data["source_hash"])
+
+
+class FeatureArtifactDataRepository(DataRepository):
+    """
+    Source de données de l'API à partir de l'artefact de features : le
+    démarrage et la mémoire dépendent du nombre de SKU, pas du nombre
+    d'observations. L'artefact est re-lu en arrière-plan quand il change
+    (même fonctionnement que CachingCsvDataRepository) ; chaque nouvel index
+    installé est notifié aux listeners, même construit sur le même CSV.
+
+    L'artefact ne contient pas les observations : seul load_index() est
+    servi, load() lève NotImplementedError.
+    """
+
+    def __init__(self, artifact_path: Path, refresh_interval: float = 30.0):
+        self.artifact_path = artifact_path
+        self.refresh_interval = refresh_interval
+        self._index: Optional[FeatureIndex] = None
+        self._source_hash: Optional[str] = None
+        self._signature: Optional[Tuple[int, int]] = None
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[FeatureIndex], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Statistiques
+        self.load_count = 0
+        self.loaded_at: Optional[datetime] = None
+        self.last_reload_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    def load_index(self) -> FeatureIndex:
+        if self._index is None:
+            self.refresh()
+        return self._index
+
+    def load(self) -> pd.DataFrame:
+        raise NotImplementedError(
+            f"{self.artifact_path} ne contient que les agrégats par SKU, "
+            "pas les observations : utiliser load_index()"
+        )
+
+    def content_hash(self) -> Optional[str]:
+        # Hash du CSV source : comparable aux tables de prix construites sur
+        # le CSV, qui moyennent N_LAST_OBSERVATIONS observations ; un autre
+        # n_last donne d'autres features, donc un autre hash
+        index = self._index
+        if index is None or index.n_last == N_LAST_OBSERVATIONS:
+            return self._source_hash
+        return f"{self._source_hash}:n_last={index.n_last}"
+
+    def add_listener(self, callback: Callable[[FeatureIndex], None]) -> None:
+        self._listeners.append(callback)
+
+    def refresh(self) -> bool:
+        """
+        Re-lit l'artefact si sa signature (mtime, taille) a changé.
+        Retourne True si un nouvel index a été installé.
+        """
+        with self._reload_lock:
+            if not self.artifact_path.exists():
+                raise FileNotFoundError(
+                    f"Feature artifact not found: {self.artifact_path}"
+                )
+            stat = self.artifact_path.stat()
+            signature = (stat.st_mtime_ns, stat.st_size)
+            if signature == self._signature:
+                return False
+
+            start = time.perf_counter()
+            index, source_hash = load_feature_artifact(self.artifact_path)
+            self.last_reload_duration = time.perf_counter() - start
+            RELOAD_SECONDS.observe(self.last_reload_duration, ("data",))
+            self._index = index
+            self._source_hash = source_hash
+            self._signature = signature
+            self.load_count += 1
+            self.loaded_at = datetime.now()
+            logger.info(
+                f"Artefact de features chargé : {self.artifact_path} "
+                f"({len(index)} SKU, {self.last_reload_duration:.3f}s)"
+            )
+
+        # Même CSV source ne veut pas dire même index (autre n_last, artefact
+        # réécrit) : le service, son cache et sa table suivent chaque index
+        for callback in self._listeners:
+            callback(index)
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="feature-artifact-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_interval)
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # On continue à servir l'index précédent
+                self.last_error = str(e)
+                logger.error(f"Échec du rafraîchissement de l'artefact : {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "load_count": self.load_count,
+            "loaded_at": self.loaded_at.isoformat() if self.loaded_at else None,
+            "last_reload_duration": self.last_reload_duration,
+            "content_hash": self.content_hash(),
+            "last_error": self.last_error,
+        }
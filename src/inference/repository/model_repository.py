@@ -1,6 +1,47 @@
 from abc import ABC, abstractmethod
-import mlflow.pyfunc
-from typing import Any
+from datetime import datetime
+from pathlib import Path
+import json
+import logging
+import os
+import shutil
+import tempfile
+from typing import Any, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# Codes d'erreur MLflow signalant un registry momentanément indisponible
+_UNAVAILABLE_ERROR_CODES = ("TEMPORARILY_UNAVAILABLE", "REQUEST_LIMIT_EXCEEDED")
+
+
+def registry_unavailable(error: BaseException) -> bool:
+    """
+    Vrai si l'erreur (ou l'une de ses causes) traduit un registry
+    injoignable : réseau, délai dépassé, service indisponible. Un nom de
+    modèle inconnu ou un artefact illisible n'en font pas partie.
+    """
+    import requests
+    from mlflow.exceptions import MlflowException
+
+    transient = (
+        requests.ConnectionError,
+        requests.Timeout,
+        requests.exceptions.RetryError,
+        ConnectionError,
+        TimeoutError,
+    )
+    seen = set()
+    while error is not None and id(error) not in seen:
+        seen.add(id(error))
+        if isinstance(error, transient):
+            return True
+        if (
+            isinstance(error, MlflowException)
+            and error.error_code in _UNAVAILABLE_ERROR_CODES
+        ):
+            return True
+        error = error.__cause__ or error.__context__
+    return False
 
 
 class ModelRepository(ABC):
@@ -9,47 +50,233 @@ class ModelRepository(ABC):
     Implementations must return a model with a predict() method.
     """
 
+    # Version concrète du dernier modèle chargé (None si inconnue)
+    version: Optional[str] = None
+
     @abstractmethod
     def load(self) -> Any:
         """Charge et retourne une instance de modèle prête à l'inférence."""
         pass
 
 
+class FeatureAlignedModel:
+    """
+    Adapte un estimateur brut (joblib) à l'entrée du service : ne garde que
+    les colonnes vues à l'entraînement, comme le fait la signature MLflow.
+    """
+
+    def __init__(self, model: Any):
+        self.model = model
+        self.feature_names = list(getattr(model, "feature_names_in_", []))
+
+    def predict(self, X):
+        if self.feature_names:
+            X = X[self.feature_names]
+        return self.model.predict(X)
+
+
 class MlflowModelRepository(ModelRepository):
     """
     Chargement du modèle depuis le MLflow Model Registry.
+
+    La stage demandée ("Production", sinon "latest") est toujours résolue en
+    version concrète : c'est elle qu'expose `version`, et que comparent les
+    tables de prix pré-calculées pour détecter une nouvelle promotion. Si
+    `cache_dir` est fourni, chaque version téléchargée est conservée sous
+    `<cache_dir>/<model_name>/v<version>-<run_id>/` et le téléchargement n'a
+    lieu que si cette version n'est pas déjà en cache. Si le registry est
+    injoignable, on charge la version la plus récente du cache, puis à
+    défaut le modèle local versionné par DVC (`fallback_model_path`). Toute autre erreur
+    (modèle inconnu, artefact illisible) est levée : servir un modèle
+    périmé masquerait une erreur de configuration.
     """
 
     def __init__(
-        self, tracking_uri: str, model_name: str, model_stage: str = "Production"
+        self,
+        tracking_uri: str,
+        model_name: str,
+        model_stage: str = "Production",
+        cache_dir: Optional[Path] = None,
+        fallback_model_path: Optional[Path] = None,
     ):
         self.tracking_uri = tracking_uri
         self.model_name = model_name
         self.model_stage = model_stage
-
-        #     def load(self) -> Any:
-        #         """
-        #         Charge la dernière version du modèle dans la stage spécifiée (default: Production).
-        #         """
-        #         # Construction de l'URI MLflow
-        #         model_uri = f"models:/{self.model_name}/{self.model_stage}"
-        #         # Configuration de l'URI de tracking
-        #         mlflow.pyfunc.tracking_uri = self.tracking_uri
-        #         # Chargement du modèle PyFunc
-        #         model = mlflow.pyfunc.load_model(model_uri)
-        #         return model
-
-        #         --- a/src/inference/repository/model_repository.py
-        # +++ b/src/inference/repository/model_repository.py
+        self.cache_dir = Path(cache_dir) if cache_dir else None
+        self.fallback_model_path = (
+            Path(fallback_model_path) if fallback_model_path else None
+        )
+        self.version: Optional[str] = None
 
     def load(self) -> Any:
         #  model_uri = f"models:/{self.model_name}/Production"
         #  return mlflow.pyfunc.load_model(model_uri)
+        # mlflow importé à la demande : inutile pour les moteurs compilés
+        import mlflow.pyfunc
+
+        try:
+            version, run_id = self._resolve_version()
+            if self.cache_dir is None:
+                model_uri = f"models:/{self.model_name}/{version}"
+            else:
+                model_uri = str(self._download(version, run_id))
+        except Exception as e:
+            if not registry_unavailable(e):
+                raise
+            logger.warning(f"Registry MLflow indisponible ({e}), bascule sur le cache")
+            return self._load_fallback(e)
+        model = mlflow.pyfunc.load_model(model_uri)
+        self.version = version
+        logger.info(f"Modèle {self.model_name} v{version} chargé ({model_uri})")
+        return model
+
+    # --- Registry -------------------------------------------------------------
+
+    def _client(self):
+        import mlflow
+        from mlflow.tracking import MlflowClient
+
+        mlflow.set_tracking_uri(self.tracking_uri)
+        mlflow.set_registry_uri(self.tracking_uri)
+        return MlflowClient(
+            tracking_uri=self.tracking_uri, registry_uri=self.tracking_uri
+        )
+
+    def _resolve_version(self) -> Tuple[str, str]:
+        """
+        Résout `model_stage` en (version, run_id) : d'abord comme alias
+        (« Production » -> @production), puis parmi les versions encore
+        rangées dans cette stage (registres antérieurs aux alias), à défaut
+        la version la plus récente.
+        """
         from mlflow.exceptions import MlflowException
 
-        # Essayer d’abord la version « Production »
+        client = self._client()
         try:
-            return mlflow.pyfunc.load_model(f"models:/{self.model_name}/Production")
-        except MlflowException:
-            # Si elle n’existe pas, basculez sur la dernière dispo
-            return mlflow.pyfunc.load_model(f"models:/{self.model_name}/latest")
+            mv = client.get_model_version_by_alias(
+                self.model_name, self.model_stage.lower()
+            )
+            return str(mv.version), mv.run_id or ""
+        except MlflowException as e:
+            if e.error_code not in (
+                "RESOURCE_DOES_NOT_EXIST",
+                "INVALID_PARAMETER_VALUE",
+            ):
+                raise
+
+        versions = client.search_model_versions(f"name='{self.model_name}'")
+        if not versions:
+            raise LookupError(f"Aucune version enregistrée pour {self.model_name}")
+        staged = [mv for mv in versions if mv.current_stage == self.model_stage]
+        latest = max(staged or versions, key=lambda mv: int(mv.version))
+        return str(latest.version), latest.run_id or ""
+
+    # --- Cache local ----------------------------------------------------------
+
+    def _model_cache_dir(self) -> Path:
+        return self.cache_dir / self.model_name
+
+    def _download(self, version: str, run_id: str) -> Path:
+        import mlflow.artifacts
+
+        target = self._model_cache_dir() / f"v{version}-{run_id}"
+        if (target / "MLmodel").exists():
+            return target
+
+        target.parent.mkdir(parents=True, exist_ok=True)
+        # Téléchargement dans un dossier temporaire puis renommage atomique,
+        # pour qu'une interruption ne laisse jamais une entrée incomplète.
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".download-", dir=target.parent))
+        try:
+            downloaded = Path(
+                mlflow.artifacts.download_artifacts(
+                    artifact_uri=f"models:/{self.model_name}/{version}",
+                    dst_path=str(tmp_dir),
+                    tracking_uri=self.tracking_uri,
+                )
+            )
+            with open(downloaded / "cache_meta.json", "w", encoding="utf-8") as f:
+                json.dump(
+                    {
+                        "model_name": self.model_name,
+                        "version": version,
+                        "run_id": run_id,
+                        "downloaded_at": datetime.now().isoformat(),
+                    },
+                    f,
+                )
+            try:
+                os.replace(downloaded, target)
+            except OSError:
+                # Téléchargé entre-temps par un autre processus
+                if not (target / "MLmodel").exists():
+                    raise
+        finally:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+        logger.info(f"Modèle {self.model_name} v{version} mis en cache → {target}")
+        return target
+
+    def _newest_cached(self) -> Optional[Tuple[str, Path]]:
+        if self.cache_dir is None:
+            return None
+        model_dir = self._model_cache_dir()
+        if not model_dir.exists():
+            return None
+        entries = []
+        for path in model_dir.glob("v*-*"):
+            if not (path / "MLmodel").exists():
+                continue
+            version = path.name[1:].split("-", 1)[0]
+            if version.isdigit():
+                entries.append((int(version), path))
+        if not entries:
+            return None
+        version, path = max(entries)
+        return str(version), path
+
+    def _load_fallback(self, cause: Exception) -> Any:
+        cached = self._newest_cached()
+        if cached is not None:
+            import mlflow.pyfunc
+
+            version, path = cached
+            model = mlflow.pyfunc.load_model(str(path))
+            self.version = version
+            logger.info(f"Modèle {self.model_name} v{version} chargé depuis le cache")
+            return model
+
+        if self.fallback_model_path is not None and self.fallback_model_path.exists():
+            import joblib
+
+            model = FeatureAlignedModel(joblib.load(str(self.fallback_model_path)))
+            self.version = f"local:{self.fallback_model_path.name}"
+            logger.info(f"Modèle local chargé → {self.fallback_model_path}")
+            return model
+
+        raise RuntimeError(
+            f"Impossible de charger le modèle {self.model_name} : "
+            f"registry injoignable et aucun modèle en cache ({cause})"
+        )
+
+
+class CompiledModelRepository(ModelRepository):
+    """
+    Chargement d'un ensemble d'arbres compilé (.npz, cf. compiled_ensemble).
+    N'importe ni mlflow ni xgboost : seul NumPy est nécessaire au service.
+    """
+
+    def __init__(self, compiled_path: Path):
+        self.compiled_path = Path(compiled_path)
+        self.version: Optional[str] = None
+
+    def load(self) -> Any:
+        from inference.service.compiled_ensemble import CompiledEnsemble
+
+        if not self.compiled_path.exists():
+            raise FileNotFoundError(
+                f"Modèle compilé introuvable : {self.compiled_path}"
+            )
+        model = CompiledEnsemble.load(self.compiled_path)
+        self.version = f"compiled:{self.compiled_path.name}"
+        logger.info(f"Modèle compilé chargé → {self.compiled_path}")
+        return model
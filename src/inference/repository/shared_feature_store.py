@@ -0,0 +1,274 @@
+# src/inference/repository/shared_feature_store.py
+"""
+Table des features par SKU partagée entre workers uvicorn.
+
+L'index (FeatureIndex) est matérialisé une seule fois sur disque sous forme
+de fichiers .npy ; chaque worker les mappe en lecture seule (np.load avec
+mmap_mode="r") et partage ainsi le page cache de l'OS au lieu de garder sa
+propre copie du CSV.
+
+Arborescence :
+    <root>/
+        CURRENT               # nom de la version servie (remplacé atomiquement)
+        .leader.lock          # verrou du worker qui construit les versions
+        v000003-<md5>/        # une version = un répertoire immuable
+            skus.npy  features.npy  counts.npy  meta.json
+"""
+
+import fcntl
+import json
+import logging
+import os
+import shutil
+import tempfile
+import threading
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from inference.entity.feature_index import FeatureIndex
+from inference.repository.data_repository import (
+    CachingCsvDataRepository,
+    DataRepository,
+    DataSnapshot,
+)
+
+logger = logging.getLogger(__name__)
+
+CURRENT_FILE = "CURRENT"
+LOCK_FILE = ".leader.lock"
+
+
+class SharedFeatureStore:
+    """Écriture et lecture des versions de la table partagée."""
+
+    def __init__(self, root: Path, keep_versions: int = 2):
+        self.root = Path(root)
+        self.keep_versions = keep_versions
+
+    def current(self) -> Optional[str]:
+        """Nom de la version servie, ou None si rien n'est encore publié."""
+        try:
+            return (self.root / CURRENT_FILE).read_text(encoding="utf-8").strip()
+        except FileNotFoundError:
+            return None
+
+    def publish(self, index: FeatureIndex, content_hash: str) -> str:
+        """
+        Écrit une nouvelle version puis bascule CURRENT dessus (os.replace).
+        Les workers qui mappent encore l'ancienne version la gardent valide
+        (le fichier supprimé reste accessible tant qu'il est mappé).
+        """
+        self.root.mkdir(parents=True, exist_ok=True)
+        name = f"v{self._next_number():06d}-{content_hash[:12]}"
+        tmp_dir = Path(tempfile.mkdtemp(prefix=".tmp-", dir=self.root))
+        try:
+            np.save(tmp_dir / "skus.npy", np.asarray(index.skus, dtype=str))
+            np.save(tmp_dir / "features.npy", np.ascontiguousarray(index.features))
+            np.save(tmp_dir / "counts.npy", np.asarray(index.counts, dtype=np.int32))
+            meta = {
+                "n_last": index.n_last,
+                "n_skus": len(index),
+                "content_hash": content_hash,
+                "created_at": datetime.now().isoformat(),
+            }
+            (tmp_dir / "meta.json").write_text(json.dumps(meta), encoding="utf-8")
+            os.replace(tmp_dir, self.root / name)
+        except Exception:
+            shutil.rmtree(tmp_dir, ignore_errors=True)
+            raise
+
+        pointer = self.root / f".{CURRENT_FILE}.tmp"
+        pointer.write_text(name, encoding="utf-8")
+        os.replace(pointer, self.root / CURRENT_FILE)
+        self._prune(keep=name)
+        logger.info(f"Table de features publiée : {name} ({len(index)} SKU)")
+        return name
+
+    def open(self, name: str) -> FeatureIndex:
+        """Mappe une version en lecture seule."""
+        path = self.root / name
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        return FeatureIndex(
+            skus=np.load(path / "skus.npy", mmap_mode="r"),
+            features=np.load(path / "features.npy", mmap_mode="r"),
+            counts=np.load(path / "counts.npy", mmap_mode="r"),
+            n_last=int(meta["n_last"]),
+        )
+
+    def meta(self, name: str) -> Dict[str, Any]:
+        return json.loads((self.root / name / "meta.json").read_text("utf-8"))
+
+    def _versions(self) -> List[str]:
+        if not self.root.exists():
+            return []
+        return sorted(p.name for p in self.root.glob("v*") if p.is_dir())
+
+    def _next_number(self) -> int:
+        versions = self._versions()
+        return int(versions[-1][1:7]) + 1 if versions else 1
+
+    def _prune(self, keep: str) -> None:
+        for name in self._versions()[: -self.keep_versions]:
+            if name != keep:
+                shutil.rmtree(self.root / name, ignore_errors=True)
+
+
+class SharedMemoryDataRepository(DataRepository):
+    """
+    Source de données partagée entre workers.
+
+    Un seul worker (« leader », détenteur du verrou fcntl) lit le CSV via
+    CachingCsvDataRepository et publie une nouvelle version de la table à
+    chaque changement ; les autres surveillent CURRENT et remappent la
+    nouvelle version. Si le leader s'arrête, le verrou est libéré et un
+    autre worker prend le relais au tour de surveillance suivant.
+    """
+
+    def __init__(
+        self,
+        store: SharedFeatureStore,
+        source: CachingCsvDataRepository,
+        refresh_interval: float = 30.0,
+        startup_timeout: float = 120.0,
+    ):
+        self.store = store
+        self.source = source
+        self.refresh_interval = refresh_interval
+        self.startup_timeout = startup_timeout
+        self._lock_fd: Optional[int] = None
+        self._mapped: Optional[str] = None
+        self._mapped_hash: Optional[str] = None
+        self._announced: Optional[str] = None
+        self._listeners: List[Callable[[str], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self.last_error: Optional[str] = None
+        self.source.add_listener(self._publish)
+
+    @property
+    def is_leader(self) -> bool:
+        return self._lock_fd is not None
+
+    def _try_lead(self) -> bool:
+        """Tente (sans bloquer) de devenir le worker qui publie la table."""
+        if self._lock_fd is not None:
+            return True
+        self.store.root.mkdir(parents=True, exist_ok=True)
+        fd = os.open(self.store.root / LOCK_FILE, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            os.close(fd)
+            return False
+        self._lock_fd = fd
+        logger.info(f"Worker {os.getpid()} : publication de la table partagée")
+        return True
+
+    def _publish(self, snapshot: DataSnapshot) -> None:
+        if not self.is_leader:
+            return
+        current = self.store.current()
+        if (
+            current is not None
+            and self.store.meta(current)["content_hash"] == snapshot.content_hash
+        ):
+            # Table déjà à jour (ex. redémarrage sans changement du CSV)
+            return
+        index = FeatureIndex.from_frame(snapshot.frame)
+        self.store.publish(index, snapshot.content_hash)
+
+    def load(self) -> pd.DataFrame:
+        """Données brutes (lecture du CSV à la demande, hors chemin de prédiction)."""
+        return self.source.load()
+
+    def load_index(self) -> FeatureIndex:
+        if self._try_lead():
+            self.source.refresh()
+        name = self.store.current()
+        if name is None:
+            name = self._wait_for_first_version()
+        index = self.store.open(name)
+        self._mapped_hash = self.store.meta(name)["content_hash"]
+        self._mapped = name
+        return index
+
+    def content_hash(self) -> Optional[str]:
+        return self._mapped_hash
+
+    def _wait_for_first_version(self) -> str:
+        """Followers : attend que le leader ait publié une première version."""
+        waited = 0.0
+        while True:
+            if self._try_lead():
+                # Le listener publie la version au premier chargement
+                self.source.refresh()
+            name = self.store.current()
+            if name is not None:
+                return name
+            if waited >= self.startup_timeout:
+                raise TimeoutError(
+                    f"Aucune table de features publiée dans {self.store.root}"
+                )
+            self._stop.wait(0.2)
+            waited += 0.2
+
+    def add_listener(self, callback: Callable[[str], None]) -> None:
+        """Callback appelé (avec le nom de version) quand CURRENT change."""
+        self._listeners.append(callback)
+
+    def refresh(self) -> bool:
+        """
+        Leader : recharge le CSV s'il a changé (et publie).
+        Tous : retourne True si CURRENT pointe sur une nouvelle version,
+        après avoir notifié les listeners (une fois par version).
+        """
+        if self._try_lead():
+            self.source.refresh()
+        name = self.store.current()
+        if name is None or name in (self._mapped, self._announced):
+            return False
+        self._announced = name
+        for callback in self._listeners:
+            callback(name)
+        return True
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="shared-features-refresh", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_interval)
+            self._thread = None
+        if self._lock_fd is not None:
+            os.close(self._lock_fd)
+            self._lock_fd = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # On continue à servir la version mappée
+                self.last_error = str(e)
+                logger.error(f"Échec du rafraîchissement de la table partagée : {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        mapped = self._mapped
+        return {
+            "leader": self.is_leader,
+            "version": mapped,
+            "last_error": self.last_error,
+            "source": self.source.stats() if self.is_leader else None,
+        }
@@ -0,0 +1,334 @@
+# src/inference/repository/tailing_repository.py
+"""
+Suivi incrémental d'un CSV auquel de nouvelles observations sont ajoutées
+en fin de fichier.
+
+Le repository mémorise l'offset (en octets) déjà consommé et ne parse que
+les lignes ajoutées depuis. Chaque SKU garde dans un petit buffer ses
+`n_last` observations les plus récentes (par Timestamp) ; seuls les SKU
+touchés par le delta voient leur moyenne recalculée. Le coût d'un
+rafraîchissement est donc proportionnel au delta, pas à la taille du
+fichier. Une rotation ou une troncature (inode différent, fichier plus
+court, début du fichier modifié) déclenche une reconstruction complète.
+"""
+
+import hashlib
+import io
+import logging
+import threading
+import time
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+from inference.entity.feature_index import (
+    N_LAST_OBSERVATIONS,
+    NUMERIC_FEATURES,
+    FeatureIndex,
+)
+from inference.repository.data_repository import DataRepository
+from inference.utils.metrics import RELOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+# Taille du début de fichier comparé pour détecter une réécriture
+PREFIX_BYTES = 64 * 1024
+
+# Colonnes lues et types (identiques pour la lecture complète et les deltas)
+_COLUMNS = ["SKU", "Timestamp", *NUMERIC_FEATURES]
+_DTYPES = {"SKU": str, "Timestamp": str, **dict.fromkeys(NUMERIC_FEATURES, float)}
+
+# Observation d'un buffer : (Timestamp ou None, valeurs des features)
+Observation = Tuple[Optional[str], Tuple[float, ...]]
+
+
+def _ranks_before(candidate: Optional[str], existing: Optional[str]) -> bool:
+    """
+    True si `candidate` passe avant `existing` : Timestamp plus récent, NaN en
+    dernier, et à égalité l'observation la plus ancienne du fichier garde sa
+    place (comme le tri stable de FeatureIndex.from_frame).
+    """
+    if candidate is None:
+        return False
+    return existing is None or candidate > existing
+
+
+def _mean(buffer: List[Observation]) -> List[float]:
+    """Moyenne par feature en ignorant les NaN (même ordre d'addition que from_frame)."""
+    means = []
+    for j in range(len(NUMERIC_FEATURES)):
+        total, n_valid = 0.0, 0
+        for _, values in buffer:
+            value = values[j]
+            if value == value:
+                total += value
+                n_valid += 1
+        means.append(total / n_valid if n_valid else float("nan"))
+    return means
+
+
+class TailingCsvDataRepository(DataRepository):
+    """
+    Index des features maintenu incrémentalement à partir d'un CSV en ajout
+    seul. Même interface que CachingCsvDataRepository (listeners, thread de
+    surveillance, stats).
+    """
+
+    def __init__(
+        self,
+        csv_path: Path,
+        n_last: int = N_LAST_OBSERVATIONS,
+        refresh_interval: float = 5.0,
+    ):
+        self.csv_path = csv_path
+        self.n_last = n_last
+        self.refresh_interval = refresh_interval
+        self._index: Optional[FeatureIndex] = None
+        self._buffers: Dict[str, List[Observation]] = {}
+        self._header = b""
+        self._offset = 0
+        self._inode: Optional[Tuple[int, int]] = None
+        self._prefix_md5: Optional[str] = None
+        self._hasher = hashlib.md5()
+        self._reload_lock = threading.Lock()
+        self._listeners: List[Callable[[FeatureIndex], None]] = []
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        # Statistiques
+        self.version = 0
+        self.full_rebuilds = 0
+        self.incremental_updates = 0
+        self.rows_consumed = 0
+        self.last_delta_rows = 0
+        self.last_reload_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    # --- Interface DataRepository ---------------------------------------------
+
+    def load(self) -> pd.DataFrame:
+        """Observations brutes (relecture complète, hors chemin de prédiction)."""
+        return pd.read_csv(self.csv_path, encoding="utf-8")
+
+    def load_index(self) -> FeatureIndex:
+        if self._index is None:
+            self.refresh()
+        return self._index
+
+    def content_hash(self) -> Optional[str]:
+        # MD5 des octets consommés, mis à jour à chaque delta
+        return self._hasher.hexdigest() if self._index is not None else None
+
+    def add_listener(self, callback: Callable[[FeatureIndex], None]) -> None:
+        self._listeners.append(callback)
+
+    # --- Rafraîchissement -----------------------------------------------------
+
+    def refresh(self) -> bool:
+        """
+        Consomme les lignes ajoutées (ou reconstruit tout si le fichier a été
+        remplacé). Retourne True si un nouvel index a été publié.
+        """
+        with self._reload_lock:
+            if not self.csv_path.exists():
+                raise FileNotFoundError(f"CSV file not found: {self.csv_path}")
+            start = time.perf_counter()
+            with open(self.csv_path, "rb") as f:
+                if self._needs_rebuild(f):
+                    index = self._rebuild(f)
+                    kind = "full"
+                else:
+                    index = self._consume_delta(f)
+                    kind = "delta"
+            if index is None:
+                return False
+            self.last_reload_duration = time.perf_counter() - start
+            RELOAD_SECONDS.observe(self.last_reload_duration, ("data",))
+            self._index = index
+            self.version += 1
+            logger.info(
+                f"Index mis à jour ({kind}) : {self.last_delta_rows} lignes, "
+                f"{len(index)} SKU, {self.last_reload_duration:.3f}s"
+            )
+
+        for callback in self._listeners:
+            callback(index)
+        return True
+
+    def _needs_rebuild(self, f: io.BufferedReader) -> bool:
+        if self._index is None:
+            return True
+        stat = self.csv_path.stat()
+        if (stat.st_dev, stat.st_ino) != self._inode or stat.st_size < self._offset:
+            logger.info(f"Rotation/troncature détectée : {self.csv_path}")
+            return True
+        prefix = f.read(min(PREFIX_BYTES, self._offset))
+        if hashlib.md5(prefix).hexdigest() != self._prefix_md5:
+            logger.info(f"Début du fichier modifié : {self.csv_path}")
+            return True
+        return False
+
+    def _read_complete_lines(self, f: io.BufferedReader) -> bytes:
+        """Octets depuis l'offset jusqu'au dernier saut de ligne (ligne partielle exclue)."""
+        f.seek(self._offset)
+        data = f.read()
+        end = data.rfind(b"\n") + 1
+        return data[:end]
+
+    def _rebuild(self, f: io.BufferedReader) -> FeatureIndex:
+        stat = self.csv_path.stat()
+        self._offset = 0
+        self._hasher = hashlib.md5()
+        data = self._read_complete_lines(f)
+        self._header = data[: data.find(b"\n") + 1]
+        frame = self._parse(data)
+
+        # Même sélection que from_frame : tri (SKU, Timestamp décroissant) stable
+        index = FeatureIndex.from_frame(frame, n_last=self.n_last)
+        codes = pd.Categorical(frame["SKU"], categories=index.skus).codes
+        ts_codes, _ = pd.factorize(frame["Timestamp"], sort=True)
+        order = np.lexsort((-ts_codes, codes))
+        buffers: Dict[str, List[Observation]] = {}
+        values = frame[NUMERIC_FEATURES].to_numpy(dtype=np.float64)
+        timestamps = frame["Timestamp"].tolist()
+        skus = frame["SKU"].tolist()
+        for row in order.tolist():
+            buffer = buffers.setdefault(skus[row], [])
+            if len(buffer) < self.n_last:
+                ts = timestamps[row]
+                buffer.append((ts if ts == ts else None, tuple(values[row].tolist())))
+        self._buffers = buffers
+
+        self._advance(data)
+        self._inode = (stat.st_dev, stat.st_ino)
+        f.seek(0)
+        self._prefix_md5 = hashlib.md5(
+            f.read(min(PREFIX_BYTES, self._offset))
+        ).hexdigest()
+        self.full_rebuilds += 1
+        self.rows_consumed = len(frame)
+        self.last_delta_rows = len(frame)
+        return index
+
+    def _consume_delta(self, f: io.BufferedReader) -> Optional[FeatureIndex]:
+        data = self._read_complete_lines(f)
+        if not data:
+            return None
+        frame = self._parse(self._header + data)
+        self._advance(data)
+        if self._offset <= PREFIX_BYTES:
+            # Le préfixe de référence grandit tant qu'il fait moins de PREFIX_BYTES
+            f.seek(0)
+            self._prefix_md5 = hashlib.md5(f.read(self._offset)).hexdigest()
+
+        changed = set()
+        values = frame[NUMERIC_FEATURES].to_numpy(dtype=np.float64).tolist()
+        for sku, ts, row in zip(
+            frame["SKU"].tolist(), frame["Timestamp"].tolist(), values
+        ):
+            ts = ts if ts == ts else None
+            buffer = self._buffers.setdefault(sku, [])
+            position = len(buffer)
+            for i, (existing, _) in enumerate(buffer):
+                if _ranks_before(ts, existing):
+                    position = i
+                    break
+            if position < self.n_last:
+                buffer.insert(position, (ts, tuple(row)))
+                del buffer[self.n_last :]
+                changed.add(sku)
+
+        self.incremental_updates += 1
+        self.rows_consumed += len(frame)
+        self.last_delta_rows = len(frame)
+        return self._updated_index(changed)
+
+    def _updated_index(self, changed: set) -> FeatureIndex:
+        """
+        Nouvel index : copie des tableaux, lignes des SKU touchés recalculées.
+        Les nouveaux SKU sont insérés à leur rang : `skus` reste trié, comme
+        après une reconstruction complète.
+        """
+        current = self._index
+        new_skus = sorted(sku for sku in changed if sku not in current.positions)
+        if new_skus:
+            at = np.searchsorted(current.skus, np.asarray(new_skus, dtype=object))
+            skus = np.insert(
+                np.asarray(current.skus, dtype=object),
+                at,
+                np.asarray(new_skus, dtype=object),
+            )
+            features = np.insert(current.features, at, np.nan, axis=0)
+            counts = np.insert(current.counts, at, 0)
+            # Codes décalés : positions reconstruites par FeatureIndex
+            positions = None
+        else:
+            skus = current.skus
+            features = current.features.copy()
+            counts = current.counts.copy()
+            positions = current.positions
+        index = FeatureIndex(
+            skus=skus,
+            features=features,
+            counts=counts,
+            n_last=self.n_last,
+            positions=positions,
+        )
+        for sku in changed:
+            code = index.positions[sku]
+            buffer = self._buffers[sku]
+            features[code] = _mean(buffer)
+            counts[code] = len(buffer)
+        return index
+
+    def _parse(self, data: bytes) -> pd.DataFrame:
+        frame = pd.read_csv(
+            io.BytesIO(data), usecols=_COLUMNS, dtype=_DTYPES, encoding="utf-8"
+        )
+        frame["SKU"] = frame["SKU"].astype(str)
+        return frame
+
+    def _advance(self, data: bytes) -> None:
+        self._hasher.update(data)
+        self._offset += len(data)
+
+    # --- Thread de surveillance -----------------------------------------------
+
+    def start(self) -> None:
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(
+            target=self._watch, name="csv-tail", daemon=True
+        )
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.refresh_interval)
+            self._thread = None
+
+    def _watch(self) -> None:
+        while not self._stop.wait(self.refresh_interval):
+            try:
+                self.refresh()
+                self.last_error = None
+            except Exception as e:
+                # On continue à servir l'index précédent
+                self.last_error = str(e)
+                logger.error(f"Échec du suivi du CSV : {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "offset": self._offset,
+            "rows_consumed": self.rows_consumed,
+            "full_rebuilds": self.full_rebuilds,
+            "incremental_updates": self.incremental_updates,
+            "last_delta_rows": self.last_delta_rows,
+            "last_reload_duration": self.last_reload_duration,
+            "content_hash": self.content_hash(),
+            "last_error": self.last_error,
+        }
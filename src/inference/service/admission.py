@@ -0,0 +1,138 @@
+# src/inference/service/admission.py
+"""
+Contrôle d'admission des routes d'inférence.
+
+Au plus `max_concurrency` requêtes sont traitées simultanément ; au-delà,
+jusqu'à `max_queue` requêtes attendent dans une file FIFO. Quand la file
+est pleine, la requête est rejetée immédiatement (503 + Retry-After) ; une
+requête dont l'échéance (X-Request-Timeout-Ms ou délai par défaut) expire
+pendant l'attente est abandonnée sans être traitée : son client a déjà
+abandonné. Les requêtes acceptées gardent ainsi une latence bornée au lieu
+de dégrader tout le monde.
+"""
+
+import asyncio
+from collections import deque
+from time import perf_counter
+from typing import Deque, Dict
+
+from inference.utils.metrics import (
+    ADMISSION_QUEUE_WAIT_SECONDS,
+    ADMISSION_SHED_TOTAL,
+    REGISTRY,
+)
+
+# En-tête par lequel le client annonce son propre timeout (ms)
+DEADLINE_HEADER = "x-request-timeout-ms"
+
+
+class RequestShed(Exception):
+    """Requête rejetée par le contrôle d'admission."""
+
+    def __init__(self, reason: str, retry_after: float):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class AdmissionController:
+    """
+    Limite de concurrence + file d'attente bornée, pour la boucle asyncio
+    du serveur (toutes les méthodes s'exécutent dans la boucle : pas de verrou).
+    """
+
+    def __init__(
+        self,
+        max_concurrency: int = 32,
+        max_queue: int = 64,
+        default_timeout_ms: float = 1000.0,
+        retry_after_seconds: float = 1.0,
+    ):
+        self.max_concurrency = max_concurrency
+        self.max_queue = max_queue
+        self.default_timeout_ms = default_timeout_ms
+        self.retry_after_seconds = retry_after_seconds
+        self.in_flight = 0
+        self._waiters: Deque[asyncio.Future] = deque()
+        # Lues au moment du scrape /metrics
+        REGISTRY.gauge(
+            "inference_admission_queue_depth",
+            "Requêtes en attente d'admission.",
+            lambda: len(self._waiters),
+        )
+        REGISTRY.gauge(
+            "inference_admission_in_flight",
+            "Requêtes d'inférence en cours de traitement.",
+            lambda: self.in_flight,
+        )
+
+    @property
+    def queue_depth(self) -> int:
+        return len(self._waiters)
+
+    def deadline(self, headers: Dict[str, str]) -> float:
+        """Échéance absolue (horloge perf_counter) de la requête."""
+        timeout_ms = self.default_timeout_ms
+        raw = headers.get(DEADLINE_HEADER)
+        if raw:
+            try:
+                timeout_ms = min(float(raw), timeout_ms)
+            except ValueError:
+                pass
+        return perf_counter() + timeout_ms / 1000.0
+
+    async def acquire(self, endpoint: str, deadline: float) -> None:
+        """Attend une place ; lève RequestShed si la requête doit être rejetée."""
+        if self.in_flight < self.max_concurrency and not self._waiters:
+            self.in_flight += 1
+            return
+        if len(self._waiters) >= self.max_queue:
+            self._shed(endpoint, "queue_full")
+
+        start = perf_counter()
+        waiter = asyncio.get_running_loop().create_future()
+        self._waiters.append(waiter)
+        try:
+            await asyncio.wait_for(asyncio.shield(waiter), deadline - start)
+        except asyncio.TimeoutError:
+            if not waiter.done():
+                # Expirée dans la file : retirée sans avoir été traitée
+                waiter.cancel()
+                self._waiters.remove(waiter)
+                ADMISSION_QUEUE_WAIT_SECONDS.observe(perf_counter() - start)
+                self._shed(endpoint, "deadline")
+            # Place attribuée au même moment que l'expiration : rendue ci-dessous
+        except BaseException:
+            # Annulée dans la file (ex. client déconnecté) : retirée, et la
+            # place rendue si elle venait de lui être attribuée
+            if waiter.done() and not waiter.cancelled():
+                self.release()
+            else:
+                waiter.cancel()
+                self._waiters.remove(waiter)
+            raise
+        ADMISSION_QUEUE_WAIT_SECONDS.observe(perf_counter() - start)
+        if perf_counter() >= deadline:
+            self.release()
+            self._shed(endpoint, "deadline")
+
+    def release(self) -> None:
+        """Libère une place, transmise directement au premier en attente."""
+        while self._waiters:
+            waiter = self._waiters.popleft()
+            if not waiter.done():
+                waiter.set_result(None)
+                return
+        self.in_flight -= 1
+
+    def _shed(self, endpoint: str, reason: str) -> None:
+        ADMISSION_SHED_TOTAL.inc((endpoint, reason))
+        raise RequestShed(reason, self.retry_after_seconds)
+
+    def stats(self) -> Dict[str, int]:
+        return {
+            "in_flight": self.in_flight,
+            "queue_depth": self.queue_depth,
+            "max_concurrency": self.max_concurrency,
+            "max_queue": self.max_queue,
+        }
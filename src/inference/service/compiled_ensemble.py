@@ -0,0 +1,287 @@
+# src/inference/service/compiled_ensemble.py
+"""
+Évaluateur d'ensemble d'arbres compilé en tableaux NumPy plats.
+
+Le modèle XGBoost est compilé hors ligne (xgboost requis) en un fichier
+.npz ; le service le recharge et l'évalue avec NumPy seulement, sans
+importer xgboost, sklearn ni mlflow.
+
+Usage (depuis src/) :
+    python -m inference.service.compiled_ensemble \\
+        --model ../models/xgb_model.pkl --output ../models/xgb_model.npz \\
+        --verify-data ../data/processed/clean_data.csv
+"""
+
+import argparse
+import json
+import logging
+from pathlib import Path
+from typing import Any, List, Optional
+
+import numpy as np
+
+logger = logging.getLogger(__name__)
+
+# Objectifs dont la sortie est la marge brute (pas de transformation)
+IDENTITY_OBJECTIVES = {
+    "reg:squarederror",
+    "reg:squaredlogerror",
+    "reg:pseudohubererror",
+    "reg:absoluteerror",
+    "reg:quantileerror",
+}
+
+
+class CompiledEnsemble:
+    """
+    Forêt de régression XGBoost sous forme de tableaux plats (un nœud par case).
+
+    Attributes:
+        feature: np.ndarray       # Index de la feature testée (int32, 0 pour une feuille)
+        threshold: np.ndarray     # Seuil de split (float32) : gauche si x < seuil
+        left, right: np.ndarray   # Enfants (int32, la feuille pointe sur elle-même)
+        default_left: np.ndarray  # Direction des valeurs manquantes (bool)
+        value: np.ndarray         # Valeur de feuille (float32)
+        roots: np.ndarray         # Nœud racine de chaque arbre (int32)
+        base_score: float         # Marge initiale
+        max_depth: int            # Profondeur maximale (nombre d'itérations de descente)
+        feature_names: List[str]  # Ordre des colonnes attendu en entrée
+    """
+
+    def __init__(
+        self,
+        feature: np.ndarray,
+        threshold: np.ndarray,
+        left: np.ndarray,
+        right: np.ndarray,
+        default_left: np.ndarray,
+        value: np.ndarray,
+        roots: np.ndarray,
+        base_score: float,
+        max_depth: int,
+        feature_names: List[str],
+    ):
+        self.feature = feature
+        self.threshold = threshold
+        self.left = left
+        self.right = right
+        self.default_left = default_left
+        self.value = value
+        self.roots = roots
+        self.base_score = np.float32(base_score)
+        self.max_depth = int(max_depth)
+        self.feature_names = list(feature_names)
+        # children[2n + 1] = enfant gauche, children[2n] = enfant droit
+        self._children = np.stack([right, left], axis=1).astype(np.intp).ravel()
+
+    @property
+    def n_trees(self) -> int:
+        return len(self.roots)
+
+    def predict_array(self, X: np.ndarray) -> np.ndarray:
+        """
+        Évalue toutes les lignes et tous les arbres simultanément : à chaque
+        niveau, les nœuds courants (n_lignes x n_arbres) descendent d'un cran.
+        """
+        X = np.asarray(X, dtype=np.float32)
+        if X.ndim == 1:
+            X = X.reshape(1, -1)
+        n_rows = len(X)
+        has_missing = bool(np.isnan(X).any())
+        if n_rows == 1:
+            # Ligne unique : indexation 1-D, moins coûteuse
+            x_row = X[0]
+            nodes = self.roots.astype(np.intp)
+            for _ in range(self.max_depth):
+                x = x_row[self.feature[nodes]]
+                go_left = x < self.threshold[nodes]
+                if has_missing:
+                    go_left = np.where(np.isnan(x), self.default_left[nodes], go_left)
+                nodes = self._children[(nodes << 1) | go_left]
+        else:
+            rows = np.arange(n_rows)[:, None]
+            nodes = np.broadcast_to(self.roots.astype(np.intp), (n_rows, self.n_trees))
+            for _ in range(self.max_depth):
+                x = X[rows, self.feature[nodes]]
+                go_left = x < self.threshold[nodes]
+                if has_missing:
+                    go_left = np.where(np.isnan(x), self.default_left[nodes], go_left)
+                nodes = self._children[(nodes << 1) | go_left]
+
+        # Accumulation séquentielle en float32, dans l'ordre des arbres,
+        # comme le prédicteur XGBoost (résultat identique bit à bit).
+        leaves = np.empty((n_rows, self.n_trees + 1), dtype=np.float32)
+        leaves[:, 0] = self.base_score
+        leaves[:, 1:] = self.value[nodes]
+        return np.cumsum(leaves, axis=1, dtype=np.float32)[:, -1]
+
+    def predict(self, X: Any) -> np.ndarray:
+        """Accepte un DataFrame (colonnes sélectionnées par nom) ou une matrice."""
+        if hasattr(X, "columns"):
+            X = X[self.feature_names].to_numpy(dtype=np.float32)
+        return self.predict_array(X)
+
+    # --- Persistance ----------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            feature=self.feature,
+            threshold=self.threshold,
+            left=self.left,
+            right=self.right,
+            default_left=self.default_left,
+            value=self.value,
+            roots=self.roots,
+            base_score=np.float32(self.base_score),
+            max_depth=np.int32(self.max_depth),
+            feature_names=np.asarray(self.feature_names, dtype=str),
+        )
+        logger.info(f"Ensemble compilé sauvegardé → {path} ({self.n_trees} arbres)")
+
+    @classmethod
+    def load(cls, path: Path) -> "CompiledEnsemble":
+        with np.load(Path(path), allow_pickle=False) as data:
+            return cls(
+                feature=data["feature"],
+                threshold=data["threshold"],
+                left=data["left"],
+                right=data["right"],
+                default_left=data["default_left"],
+                value=data["value"],
+                roots=data["roots"],
+                base_score=float(data["base_score"]),
+                max_depth=int(data["max_depth"]),
+                feature_names=data["feature_names"].tolist(),
+            )
+
+    # --- Compilation ----------------------------------------------------------
+
+    @classmethod
+    def from_booster(
+        cls, booster: Any, n_trees: Optional[int] = None
+    ) -> "CompiledEnsemble":
+        """Compile un xgboost.Booster (gbtree, régression à une sortie)."""
+        model = json.loads(booster.save_raw("json"))["learner"]
+        objective = model["objective"]["name"]
+        if objective not in IDENTITY_OBJECTIVES:
+            raise ValueError(f"Objectif non supporté : {objective}")
+        gbm = model["gradient_booster"]
+        if gbm["name"] != "gbtree":
+            raise ValueError(f"Booster non supporté : {gbm['name']}")
+        params = model["learner_model_param"]
+        if int(params.get("num_target", 1)) != 1 or int(params["num_class"]) > 0:
+            raise ValueError(
+                "Seuls les modèles de régression à une sortie sont supportés"
+            )
+
+        base_score = float(params["base_score"].strip("[]"))
+        trees = gbm["model"]["trees"][:n_trees] if n_trees else gbm["model"]["trees"]
+
+        features, thresholds, lefts, rights, defaults, values, roots = (
+            [] for _ in range(7)
+        )
+        max_depth = 0
+        offset = 0
+        for tree in trees:
+            left = np.asarray(tree["left_children"], dtype=np.int32)
+            right = np.asarray(tree["right_children"], dtype=np.int32)
+            split = np.asarray(tree["split_conditions"], dtype=np.float32)
+            is_leaf = left == -1
+            node_ids = np.arange(len(left), dtype=np.int32)
+
+            features.append(
+                np.where(is_leaf, 0, tree["split_indices"]).astype(np.int32)
+            )
+            thresholds.append(np.where(is_leaf, np.float32(0), split))
+            # Une feuille pointe sur elle-même : la descente y reste stable
+            lefts.append(np.where(is_leaf, node_ids, left) + offset)
+            rights.append(np.where(is_leaf, node_ids, right) + offset)
+            defaults.append(np.asarray(tree["default_left"], dtype=bool))
+            values.append(np.where(is_leaf, split, np.float32(0)))
+            roots.append(offset)
+            max_depth = max(max_depth, _tree_depth(left, right))
+            offset += len(left)
+
+        feature_names = booster.feature_names or [
+            f"f{i}" for i in range(int(params["num_feature"]))
+        ]
+        return cls(
+            feature=np.concatenate(features),
+            threshold=np.concatenate(thresholds).astype(np.float32),
+            left=np.concatenate(lefts).astype(np.int32),
+            right=np.concatenate(rights).astype(np.int32),
+            default_left=np.concatenate(defaults),
+            value=np.concatenate(values).astype(np.float32),
+            roots=np.asarray(roots, dtype=np.int32),
+            base_score=base_score,
+            max_depth=max_depth,
+            feature_names=feature_names,
+        )
+
+    @classmethod
+    def from_model(cls, model: Any) -> "CompiledEnsemble":
+        """Compile un XGBRegressor (ou FeatureAlignedModel) ou un Booster."""
+        if not hasattr(model, "get_booster") and hasattr(model, "model"):
+            model = model.model
+        if hasattr(model, "get_booster"):
+            try:
+                n_trees = model.best_iteration + 1
+            except AttributeError:
+                n_trees = None
+            return cls.from_booster(model.get_booster(), n_trees=n_trees)
+        return cls.from_booster(model)
+
+
+def _tree_depth(left: np.ndarray, right: np.ndarray) -> int:
+    depth = np.zeros(len(left), dtype=np.int32)
+    # Les enfants ont toujours un id supérieur au parent dans XGBoost
+    for node in range(len(left)):
+        if left[node] != -1:
+            depth[left[node]] = depth[node] + 1
+            depth[right[node]] = depth[node] + 1
+    return int(depth.max())
+
+
+def verify_equivalence(model: Any, compiled: CompiledEnsemble, X: Any) -> int:
+    """
+    Compare les prédictions compilées à model.predict sur X.
+    Retourne le nombre de lignes différentes (0 attendu : égalité exacte).
+    """
+    expected = np.asarray(model.predict(X[compiled.feature_names]), dtype=np.float32)
+    actual = compiled.predict(X)
+    mismatches = int(np.count_nonzero(expected != actual))
+    if mismatches:
+        max_diff = float(np.max(np.abs(expected - actual)))
+        logger.error(f"{mismatches}/{len(X)} prédictions différentes (max={max_diff})")
+    else:
+        logger.info(f"Équivalence exacte vérifiée sur {len(X)} lignes")
+    return mismatches
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description="Compile un modèle XGBoost en .npz")
+    parser.add_argument("--model", required=True, help="Modèle joblib (xgb_model.pkl)")
+    parser.add_argument("--output", required=True, help="Fichier .npz de sortie")
+    parser.add_argument(
+        "--verify-data", help="CSV prétraité pour vérifier l'équivalence exacte"
+    )
+    args = parser.parse_args()
+
+    import joblib
+
+    estimator = joblib.load(args.model)
+    compiled = CompiledEnsemble.from_model(estimator)
+    if args.verify_data:
+        import pandas as pd
+
+        frame = pd.read_csv(args.verify_data)
+        if verify_equivalence(estimator, compiled, frame):
+            raise SystemExit(1)
+    compiled.save(Path(args.output))
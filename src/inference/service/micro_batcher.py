@@ -0,0 +1,97 @@
+# src/inference/service/micro_batcher.py
+
+import asyncio
+import logging
+from typing import List, Optional, Tuple
+
+from inference.entity.dto import PredictionResult
+from inference.service.prediction_service import PredictionService
+
+logger = logging.getLogger(__name__)
+
+
+class MicroBatcher:
+    """
+    Regroupe les requêtes /predict concurrentes en un seul appel au modèle.
+
+    La première requête d'un lot ouvre une fenêtre de `max_wait_ms` ; toutes
+    les requêtes arrivées pendant cette fenêtre (jusqu'à `max_batch_size`)
+    sont prédites ensemble via PredictionService.predict_many, puis chaque
+    résultat est renvoyé à la requête qui l'attend.
+    """
+
+    def __init__(
+        self,
+        service: PredictionService,
+        max_wait_ms: float = 2.0,
+        max_batch_size: int = 64,
+    ):
+        self.service = service
+        self.max_wait = max_wait_ms / 1000.0
+        self.max_batch_size = max_batch_size
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        """Démarre la boucle de regroupement sur la boucle asyncio courante."""
+        if self._task is not None:
+            return
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def submit(self, sku: str) -> PredictionResult:
+        """
+        Met le SKU en file et attend sa prédiction.
+        Lève SkuNotFoundError / InsufficientDataError comme PredictionService.predict.
+        """
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((sku, future))
+        return await future
+
+    def _drain(self, batch: List[Tuple[str, asyncio.Future]]) -> None:
+        while len(batch) < self.max_batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                return
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            self._drain(batch)
+            if len(batch) < self.max_batch_size and self.max_wait > 0:
+                # Fenêtre de regroupement ouverte par la première requête
+                await asyncio.sleep(self.max_wait)
+                self._drain(batch)
+
+            skus = [sku for sku, _ in batch]
+            try:
+                results = await loop.run_in_executor(
+                    None, self.service.predict_many, skus
+                )
+            except Exception as e:
+                logger.error(f"Échec de la prédiction groupée ({len(skus)} SKU) : {e}")
+                for _, future in batch:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+
+            for (_, future), result in zip(batch, results):
+                if future.done():
+                    # Requête annulée (client déconnecté)
+                    continue
+                if isinstance(result, Exception):
+                    future.set_exception(result)
+                else:
+                    future.set_result(result)
@@ -0,0 +1,143 @@
+# src/inference/service/model_reloader.py
+
+import logging
+import threading
+import time
+from datetime import datetime
+from typing import Any, Dict, Optional
+
+from inference.service.prediction_service import (
+    PredictionService,
+    build_feature_matrix,
+)
+from inference.utils.metrics import RELOAD_SECONDS
+
+logger = logging.getLogger(__name__)
+
+
+class ModelReloader:
+    """
+    Rechargement du modèle en arrière-plan, sans interruption de service.
+
+    Le nouveau modèle est chargé puis « chauffé » par quelques prédictions
+    synthétiques avant d'être échangé atomiquement avec l'ancien, qui continue
+    de servir jusque-là. Les demandes concurrentes sont dédupliquées : tant
+    qu'un rechargement est en cours, trigger() n'en lance pas d'autre.
+    """
+
+    def __init__(self, service: PredictionService, warmup_rounds: int = 3):
+        self.service = service
+        self.warmup_rounds = warmup_rounds
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+        # Levé une fois le warm-up du modèle initial terminé (readiness)
+        self.ready = threading.Event()
+        # Statut du dernier rechargement
+        self.reload_count = 0
+        self.last_started_at: Optional[datetime] = None
+        self.last_finished_at: Optional[datetime] = None
+        self.last_load_duration: Optional[float] = None
+        self.last_warmup_duration: Optional[float] = None
+        self.last_error: Optional[str] = None
+
+    @property
+    def in_progress(self) -> bool:
+        thread = self._thread
+        return thread is not None and thread.is_alive()
+
+    def trigger(self) -> bool:
+        """
+        Lance un rechargement en arrière-plan.
+        Retourne False si un rechargement est déjà en cours.
+        """
+        with self._lock:
+            if self.in_progress:
+                return False
+            self.last_started_at = datetime.now()
+            self._thread = threading.Thread(
+                target=self._reload, name="model-reload", daemon=True
+            )
+            self._thread.start()
+            return True
+
+    def wait(self, timeout: Optional[float] = None) -> None:
+        thread = self._thread
+        if thread is not None:
+            thread.join(timeout)
+
+    def warm_up(self, predictor: Any) -> None:
+        """
+        Quelques prédictions (une ligne, puis un petit lot) sur des features
+        réelles de l'index courant, pour payer l'initialisation paresseuse.
+        """
+        index = self.service.index
+        now = datetime.now()
+        for n_rows in (1, 8):
+            rows = index.features[: min(n_rows, len(index))]
+            if len(rows) == 0:
+                return
+            for _ in range(self.warmup_rounds):
+                predictor.predict(build_feature_matrix(rows, now))
+
+    def warm_up_initial(self) -> None:
+        """
+        Warm-up du modèle chargé au démarrage, puis passage à l'état prêt.
+        Un échec est consigné dans last_error sans bloquer la readiness.
+        """
+        try:
+            start = time.perf_counter()
+            self.warm_up(self.service.predictor)
+            self.last_warmup_duration = time.perf_counter() - start
+            RELOAD_SECONDS.observe(self.last_warmup_duration, ("model_warmup",))
+        except Exception as e:
+            self.last_error = str(e)
+            logger.error(f"Échec du warm-up initial : {e}")
+        finally:
+            self.ready.set()
+
+    def _reload(self) -> None:
+        try:
+            start = time.perf_counter()
+            model = self.service.model_repo.load()
+            version = self.service.model_repo.version
+            loaded = time.perf_counter()
+            predictor = self.service.make_predictor(model)
+            self.warm_up(predictor)
+            warmed = time.perf_counter()
+
+            self.service.swap_model(
+                model, registry_version=version, predictor=predictor
+            )
+            self.last_load_duration = loaded - start
+            self.last_warmup_duration = warmed - loaded
+            RELOAD_SECONDS.observe(self.last_load_duration, ("model_load",))
+            RELOAD_SECONDS.observe(self.last_warmup_duration, ("model_warmup",))
+            self.last_error = None
+            self.reload_count += 1
+            logger.info(
+                f"Modèle rechargé (version={version}, chargement="
+                f"{self.last_load_duration:.3f}s, warm-up={self.last_warmup_duration:.3f}s)"
+            )
+        except Exception as e:
+            # L'ancien modèle reste en service
+            self.last_error = str(e)
+            logger.error(f"Échec du rechargement du modèle : {e}")
+        finally:
+            self.last_finished_at = datetime.now()
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "model_version": self.service.registry_version,
+            "generation": self.service.model_version,
+            "reload_in_progress": self.in_progress,
+            "reload_count": self.reload_count,
+            "last_started_at": _isoformat(self.last_started_at),
+            "last_finished_at": _isoformat(self.last_finished_at),
+            "last_load_duration": self.last_load_duration,
+            "last_warmup_duration": self.last_warmup_duration,
+            "last_error": self.last_error,
+        }
+
+
+def _isoformat(value: Optional[datetime]) -> Optional[str]:
+    return value.isoformat() if value is not None else None
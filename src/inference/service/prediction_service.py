@@ -1,14 +1,41 @@
 # src/inference/service/prediction_service.py
 
-from typing import Any, List
-from pathlib import Path
-import pandas as pd
+from typing import TYPE_CHECKING, Any, Dict, Hashable, List, Optional, Union
+import logging
 import numpy as np
 from datetime import datetime
+from time import perf_counter
 
 from inference.repository.data_repository import DataRepository
 from inference.repository.model_repository import ModelRepository
-from inference.entity.dto import PredictionResult
+from inference.entity.dto import (
+    BatchPredictionColumns,
+    PredictionFailure,
+    PredictionResult,
+)
+from inference.entity.feature_index import FEATURE_ORDER, FeatureIndex
+from inference.service.prediction_cache import PredictionCache
+from inference.service.predictor import build_predictor
+from inference.utils.metrics import (
+    PREDICT_STAGE_SECONDS,
+    PRICE_TABLE_LOOKUPS,
+    RELOAD_SECONDS,
+)
+
+if TYPE_CHECKING:
+    from inference.service.price_table import PriceTable
+
+logger = logging.getLogger(__name__)
+
+# Labels des étapes mesurées (tuples pré-construits : pas d'allocation par appel)
+_STAGE_DATA_LOAD = ("data_load",)
+_STAGE_AGGREGATION = ("aggregation",)
+_STAGE_CACHE = ("cache_lookup",)
+_STAGE_LOOKUP = ("sku_lookup",)
+_STAGE_FEATURES = ("feature_build",)
+_STAGE_PREDICT = ("model_predict",)
+_TABLE_HIT = ("hit",)
+_TABLE_MISS = ("miss",)
 
 
 class SkuNotFoundError(Exception):
@@ -23,67 +50,372 @@ class InsufficientDataError(Exception):
     pass
 
 
+def time_features(now: datetime) -> np.ndarray:
+    """Encodage cyclique du mois et de l'heure, dans l'ordre de TIME_FEATURES."""
+    return np.array(
+        [
+            np.sin(2 * np.pi * now.month / 12),
+            np.cos(2 * np.pi * now.month / 12),
+            np.sin(2 * np.pi * now.hour / 24),
+            np.cos(2 * np.pi * now.hour / 24),
+        ]
+    )
+
+
+def build_feature_matrix(numeric: np.ndarray, now: datetime) -> np.ndarray:
+    """
+    Assemble les features moyennées (une ligne par SKU) et les features
+    temporelles communes dans une matrice ordonnée selon FEATURE_ORDER.
+    """
+    matrix = np.empty((len(numeric), len(FEATURE_ORDER)), dtype=np.float64)
+    matrix[:, : numeric.shape[1]] = numeric
+    matrix[:, numeric.shape[1] :] = time_features(now)
+    return matrix
+
+
+def _failure(sku: str, error: Exception) -> PredictionFailure:
+    return PredictionFailure(sku=sku, error=type(error).__name__, detail=str(error))
+
+
 class PredictionService:
     """
     Service métier pour réaliser l'inférence de prix.
     """
 
-    def __init__(self, data_repo: DataRepository, model_repo: ModelRepository):
+    def __init__(
+        self,
+        data_repo: DataRepository,
+        model_repo: ModelRepository,
+        cache: Optional[PredictionCache] = None,
+        scoring_engine: str = "auto",
+    ):
         # Injection des repositories
         self.data_repo = data_repo
         self.model_repo = model_repo  # <-- On garde la référence au repository
+        # Cache optionnel des prix prédits
+        self.cache = cache
         # Chargement initial du modèle
         self.model = model_repo.load()
+        self.model_loaded_at = datetime.now()
+        # Chemin de prédiction (cf. predictor.build_predictor)
+        self.scoring_engine = scoring_engine
+        self.predictor = self.make_predictor(self.model)
+        # Génération locale (clé de cache) et version issue du registry
+        self.model_version = 1
+        self.registry_version = model_repo.version
+        # Construction initiale de l'index des features par SKU
+        self.index: FeatureIndex = self._build_index()
+        self.index_built_at = datetime.now()
+        self.data_version = 1
+        # Table de prix pré-calculée (cf. attach_price_table)
+        self._offered_price_table: Optional["PriceTable"] = None
+        self.price_table: Optional["PriceTable"] = None
 
-    def predict(self, sku: str) -> PredictionResult:
-        # 1. Charger le DataFrame complet
+    def _build_index(self) -> FeatureIndex:
+        t0 = perf_counter()
+        index = self.data_repo.load_index()
+        if index is not None:
+            # Index matérialisé par la source (ex. table partagée en mmap)
+            PREDICT_STAGE_SECONDS.observe(perf_counter() - t0, _STAGE_DATA_LOAD)
+            return index
         df = self.data_repo.load()
+        t1 = perf_counter()
+        index = FeatureIndex.from_frame(df)
+        t2 = perf_counter()
+        PREDICT_STAGE_SECONDS.observe(t1 - t0, _STAGE_DATA_LOAD)
+        PREDICT_STAGE_SECONDS.observe(t2 - t1, _STAGE_AGGREGATION)
+        return index
 
-        # 2. Filtrer pour le SKU
-        sku_df = df[df["SKU"] == sku]
-        if sku_df.empty:
-            raise SkuNotFoundError(f"SKU '{sku}' non trouvé dans les données.")
+    def refresh_data(self) -> None:
+        """
+        Recharge les données et reconstruit l'index.
+        Le nouvel index remplace l'ancien par simple réaffectation de référence.
+        """
+        # Index publié avant la version : une clé de cache portant la
+        # nouvelle version ne peut pas être calculée sur l'ancien index.
+        start = perf_counter()
+        index = self._build_index()
+        # Table invalidée avant la publication des nouvelles données
+        self._check_price_table(self.registry_version)
+        self.index = index
+        RELOAD_SECONDS.observe(perf_counter() - start, ("index",))
+        self.index_built_at = datetime.now()
+        self.data_version += 1
+        if self.cache is not None:
+            self.cache.clear()
+
+    def make_predictor(self, model: Any) -> Any:
+        return build_predictor(model, engine=self.scoring_engine)
+
+    def swap_model(
+        self,
+        model: Any,
+        registry_version: Optional[str] = None,
+        predictor: Any = None,
+    ) -> None:
+        """Remplace le modèle servi et invalide le cache des prédictions."""
+        self._check_price_table(registry_version)
+        self.predictor = (
+            predictor if predictor is not None else self.make_predictor(model)
+        )
+        self.model = model
+        self.model_loaded_at = datetime.now()
+        self.model_version += 1
+        self.registry_version = registry_version
+        if self.cache is not None:
+            self.cache.clear()
+
+    def attach_price_table(self, table: "PriceTable") -> bool:
+        """
+        Propose une table de prix pré-calculée. Elle n'est servie que si sa
+        version de modèle et son hash de données correspondent à ceux servis ;
+        elle est re-vérifiée à chaque changement de modèle ou de données.
+        """
+        self._offered_price_table = table
+        reason = self._check_price_table(self.registry_version)
+        if reason is not None:
+            logger.warning(f"Table de prix pré-calculée refusée : {reason}")
+        return reason is None
+
+    def _check_price_table(self, registry_version: Optional[str]) -> Optional[str]:
+        """Active ou désactive la table proposée ; retourne la raison du refus."""
+        table = self._offered_price_table
+        if table is None:
+            return "aucune table"
+        reason = table.mismatch(registry_version, self.data_repo.content_hash())
+        if reason is not None:
+            if self.price_table is not None:
+                logger.warning(f"Table de prix pré-calculée désactivée : {reason}")
+            self.price_table = None
+            return reason
+        if self.price_table is None:
+            logger.info(f"Table de prix pré-calculée active ({len(table)} SKU)")
+        self.price_table = table
+        return None
+
+    def status(self) -> Dict[str, Any]:
+        """État du modèle et des données déjà chargés (aucune I/O)."""
+        index = self.index
+        stats = getattr(self.data_repo, "stats", None)
+        return {
+            "model": {
+                "version": self.registry_version,
+                "generation": self.model_version,
+                "engine": getattr(self.predictor, "name", None),
+                "loaded_at": self.model_loaded_at.isoformat(),
+            },
+            "data": {
+                "version": self.data_version,
+                "built_at": self.index_built_at.isoformat(),
+                "n_skus": len(index),
+                "last_refresh_error": getattr(self.data_repo, "last_error", None),
+                "repository": stats() if callable(stats) else None,
+            },
+            "price_table": (
+                self.price_table.stats() if self.price_table is not None else None
+            ),
+        }
 
-        # 3. Prendre les 3 dernières observations
-        last_obs = sku_df.sort_values(by="Timestamp", ascending=False).head(3)
-        if len(last_obs) < 3:
+    def _cache_key(self, sku: str, now: datetime) -> Hashable:
+        return (sku, now.month, now.hour, self.model_version, self.data_version)
+
+    @staticmethod
+    def _resolve(index: FeatureIndex, sku: str) -> int:
+        """Retourne le code du SKU dans l'index, ou lève l'erreur métier adaptée."""
+        code = index.lookup(sku)
+        if code is None:
+            raise SkuNotFoundError(f"SKU '{sku}' non trouvé dans les données.")
+        n_obs = int(index.counts[code])
+        if n_obs < index.n_last:
             raise InsufficientDataError(
-                f"Données insuffisantes pour le SKU '{sku}': {len(last_obs)} enregistrements."
+                f"Données insuffisantes pour le SKU '{sku}': {n_obs} enregistrements."
             )
+        return code
 
-        # 4. Moyenne des features numériques
-        numeric_features: List[str] = [
-            "PrixInitial",
-            "AgeProduitEnJours",
-            "QuantiteVendue",
-            "UtiliteProduit",
-            "ElasticitePrix",
-            "Remise",
-            "Qualite",
-        ]
-        mean_vals = last_obs[numeric_features].mean().to_dict()
+    def predict(self, sku: str) -> PredictionResult:
+        # 0. Table pré-calculée, puis cache (clé lue avant le modèle et
+        #    l'index, cf. refresh_data)
+        now = datetime.now()
+        table = self.price_table
+        if table is not None:
+            price = table.lookup(sku, now.month, now.hour)
+            if price is not None:
+                PRICE_TABLE_LOOKUPS.inc(_TABLE_HIT)
+                return PredictionResult(sku=sku, timestamp=now, predicted_price=price)
+            PRICE_TABLE_LOOKUPS.inc(_TABLE_MISS)
+        key = self._cache_key(sku, now) if self.cache is not None else None
+        if key is not None:
+            t0 = perf_counter()
+            cached = self.cache.get(key)
+            PREDICT_STAGE_SECONDS.observe(perf_counter() - t0, _STAGE_CACHE)
+            if cached is not None:
+                return PredictionResult(sku=sku, timestamp=now, predicted_price=cached)
 
-        # 5. Ajout des features temporelles
+        # 1. Lookup O(1) du SKU dans l'index (référence locale : snapshot cohérent)
+        #    et vérification du nombre d'observations
+        predictor = self.predictor
+        index = self.index
+        t0 = perf_counter()
+        code = self._resolve(index, sku)
+        t1 = perf_counter()
+
+        # 2. Features moyennées (pré-calculées) + features temporelles
+        feature_row = build_feature_matrix(index.features[code : code + 1], now)
+        t2 = perf_counter()
+
+        # 3. Prédiction
+        predicted_array = predictor.predict(feature_row)
+        predicted_price = round(float(predicted_array[0]), 2)
+        t3 = perf_counter()
+        PREDICT_STAGE_SECONDS.observe(t1 - t0, _STAGE_LOOKUP)
+        PREDICT_STAGE_SECONDS.observe(t2 - t1, _STAGE_FEATURES)
+        PREDICT_STAGE_SECONDS.observe(t3 - t2, _STAGE_PREDICT)
+        if key is not None:
+            self.cache.put(key, predicted_price)
+
+        # 4. Retourner le DTO
+        return PredictionResult(sku=sku, timestamp=now, predicted_price=predicted_price)
+
+    def predict_many(self, skus: List[str]) -> List[Union[PredictionResult, Exception]]:
+        """
+        Prédit un lot de SKU avec un seul appel au modèle.
+        Chaque élément est soit un PredictionResult, soit l'exception métier
+        (SkuNotFoundError / InsufficientDataError) propre à ce SKU.
+        """
         now = datetime.now()
-        mean_vals["Mois_sin"] = np.sin(2 * np.pi * now.month / 12)
-        mean_vals["Mois_cos"] = np.cos(2 * np.pi * now.month / 12)
-        mean_vals["Heure_sin"] = np.sin(2 * np.pi * now.hour / 24)
-        mean_vals["Heure_cos"] = np.cos(2 * np.pi * now.hour / 24)
-
-        # 6. Construire le DataFrame d'une ligne
-        feature_order = numeric_features + [
-            "Mois_sin",
-            "Mois_cos",
-            "Heure_sin",
-            "Heure_cos",
+        keys = (
+            [self._cache_key(sku, now) for sku in skus]
+            if self.cache is not None
+            else None
+        )
+        table = self.price_table
+        predictor = self.predictor
+        index = self.index
+        items: List[Union[PredictionResult, Exception, None]] = []
+        valid_positions: List[int] = []
+        valid_codes: List[int] = []
+
+        # 1. Table pré-calculée, cache, résolution des SKU et contrôle du
+        #    nombre d'observations
+        t0 = perf_counter()
+        for i, sku in enumerate(skus):
+            if table is not None:
+                price = table.lookup(sku, now.month, now.hour)
+                if price is not None:
+                    PRICE_TABLE_LOOKUPS.inc(_TABLE_HIT)
+                    items.append(
+                        PredictionResult(sku=sku, timestamp=now, predicted_price=price)
+                    )
+                    continue
+                PRICE_TABLE_LOOKUPS.inc(_TABLE_MISS)
+            if keys is not None:
+                cached = self.cache.get(keys[i])
+                if cached is not None:
+                    items.append(
+                        PredictionResult(sku=sku, timestamp=now, predicted_price=cached)
+                    )
+                    continue
+            try:
+                code = self._resolve(index, sku)
+            except (SkuNotFoundError, InsufficientDataError) as e:
+                items.append(e)
+                continue
+            valid_positions.append(len(items))
+            valid_codes.append(code)
+            items.append(None)
+
+        t1 = perf_counter()
+        PREDICT_STAGE_SECONDS.observe(t1 - t0, _STAGE_LOOKUP)
+
+        # 2. Matrice de features construite en une passe + un seul predict
+        if valid_codes:
+            feature_rows = build_feature_matrix(index.features[valid_codes], now)
+            t2 = perf_counter()
+            predicted = predictor.predict(feature_rows)
+            PREDICT_STAGE_SECONDS.observe(t2 - t1, _STAGE_FEATURES)
+            PREDICT_STAGE_SECONDS.observe(perf_counter() - t2, _STAGE_PREDICT)
+            for pos, price in zip(valid_positions, predicted.tolist()):
+                price = round(price, 2)
+                if keys is not None:
+                    self.cache.put(keys[pos], price)
+                items[pos] = PredictionResult(
+                    sku=skus[pos], timestamp=now, predicted_price=price
+                )
+
+        return items
+
+    def predict_batch(
+        self, skus: List[str]
+    ) -> List[Union[PredictionResult, PredictionFailure]]:
+        """
+        Comme predict_many, mais les erreurs par SKU sont rapportées sous
+        forme de PredictionFailure sans faire échouer le lot.
+        """
+        return [
+            _failure(sku, item) if isinstance(item, Exception) else item
+            for sku, item in zip(skus, self.predict_many(skus))
         ]
-        feature_row = pd.DataFrame([mean_vals])[feature_order]
 
-        # 7. Prédiction
-        predicted_array = self.model.predict(feature_row)
-        predicted_price = float(predicted_array[0])
+    def predict_columns(self, skus: List[str]) -> BatchPredictionColumns:
+        """
+        Comme predict_batch, mais le résultat reste en colonnes : les prix
+        sont écrits directement dans un tableau NumPy (NaN pour les SKU en
+        échec), sans PredictionResult par SKU. Utilisé par les formats
+        binaires de /predict/batch.
+        """
+        now = datetime.now()
+        table = self.price_table
+        predictor = self.predictor
+        index = self.index
+        prices = np.full(len(skus), np.nan, dtype=np.float64)
+        errors: List[Optional[str]] = [None] * len(skus)
+        details: List[Optional[str]] = [None] * len(skus)
+        valid_positions: List[int] = []
+        valid_codes: List[int] = []
+        valid_keys: List[Hashable] = []
+
+        # 1. Table pré-calculée, cache, résolution des SKU
+        t0 = perf_counter()
+        for i, sku in enumerate(skus):
+            if table is not None:
+                price = table.lookup(sku, now.month, now.hour)
+                if price is not None:
+                    PRICE_TABLE_LOOKUPS.inc(_TABLE_HIT)
+                    prices[i] = price
+                    continue
+                PRICE_TABLE_LOOKUPS.inc(_TABLE_MISS)
+            key = None
+            if self.cache is not None:
+                key = self._cache_key(sku, now)
+                cached = self.cache.get(key)
+                if cached is not None:
+                    prices[i] = cached
+                    continue
+            try:
+                code = self._resolve(index, sku)
+            except (SkuNotFoundError, InsufficientDataError) as e:
+                errors[i] = type(e).__name__
+                details[i] = str(e)
+                continue
+            valid_positions.append(i)
+            valid_codes.append(code)
+            valid_keys.append(key)
+
+        t1 = perf_counter()
+        PREDICT_STAGE_SECONDS.observe(t1 - t0, _STAGE_LOOKUP)
+
+        # 2. Un seul predict, résultat écrit par indexation vectorisée
+        if valid_codes:
+            feature_rows = build_feature_matrix(index.features[valid_codes], now)
+            t2 = perf_counter()
+            predicted = np.round(predictor.predict(feature_rows), 2)
+            PREDICT_STAGE_SECONDS.observe(t2 - t1, _STAGE_FEATURES)
+            PREDICT_STAGE_SECONDS.observe(perf_counter() - t2, _STAGE_PREDICT)
+            prices[valid_positions] = predicted
+            if self.cache is not None:
+                for key, price in zip(valid_keys, predicted.tolist()):
+                    self.cache.put(key, price)
 
-        # 8. Retourner le DTO
-        return PredictionResult(
-            sku=sku, timestamp=now, predicted_price=round(predicted_price, 2)
+        return BatchPredictionColumns(
+            timestamp=now, skus=skus, prices=prices, errors=errors, details=details
         )
@@ -0,0 +1,171 @@
+# src/inference/service/predictor.py
+
+import logging
+import threading
+from typing import Any, List, Optional
+
+import numpy as np
+import pandas as pd
+
+from inference.entity.feature_index import FEATURE_ORDER
+from inference.repository.model_repository import FeatureAlignedModel
+from inference.service.compiled_ensemble import CompiledEnsemble
+
+# Moteurs de scoring disponibles (clé `scoring_engine` de config.yaml)
+SCORING_ENGINES = ("auto", "generic", "native", "compiled")
+
+logger = logging.getLogger(__name__)
+
+
+class FramePredictor:
+    """
+    Chemin générique : matrice NumPy -> DataFrame ordonné -> model.predict.
+    Convient à tout modèle (pyfunc MLflow, sklearn, ...).
+    """
+
+    name = "generic"
+
+    def __init__(self, model: Any):
+        self.model = model
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        frame = pd.DataFrame(features, columns=FEATURE_ORDER)
+        return np.asarray(self.model.predict(frame), dtype=float)
+
+
+class BoosterPredictor:
+    """
+    Chemin rapide XGBoost : prédiction « in-place » du Booster sur un buffer
+    NumPy float32, sans pyfunc ni DataFrame.
+
+    Les colonnes sont réordonnées selon `booster.feature_names` (le modèle
+    entraîné n'utilise pas forcément toutes les colonnes de FEATURE_ORDER).
+    Un buffer d'une ligne est préalloué par thread pour les prédictions
+    unitaires.
+    """
+
+    name = "xgboost-native"
+
+    def __init__(self, booster: Any, columns: List[int], n_trees: Optional[int] = None):
+        self.booster = booster
+        self.columns = np.asarray(columns, dtype=np.intp)
+        self.iteration_range = (0, n_trees) if n_trees else (0, 0)
+        self._local = threading.local()
+
+    def _row_buffer(self) -> np.ndarray:
+        buffer = getattr(self._local, "buffer", None)
+        if buffer is None:
+            buffer = np.empty((1, len(self.columns)), dtype=np.float32)
+            self._local.buffer = buffer
+        return buffer
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        if len(features) == 1:
+            data = self._row_buffer()
+            np.take(features[0], self.columns, out=data[0])
+        else:
+            data = np.ascontiguousarray(features[:, self.columns], dtype=np.float32)
+        predicted = self.booster.inplace_predict(
+            data, iteration_range=self.iteration_range, validate_features=False
+        )
+        return np.asarray(predicted, dtype=float).reshape(-1)
+
+
+class CompiledPredictor:
+    """
+    Ensemble d'arbres compilé en tableaux NumPy (cf. compiled_ensemble) :
+    aucune dépendance à xgboost au moment de la prédiction.
+    """
+
+    name = "compiled"
+
+    def __init__(self, ensemble: CompiledEnsemble):
+        self.ensemble = ensemble
+        self.columns = np.asarray(
+            [FEATURE_ORDER.index(name) for name in ensemble.feature_names],
+            dtype=np.intp,
+        )
+
+    def predict(self, features: np.ndarray) -> np.ndarray:
+        data = features[:, self.columns]
+        return self.ensemble.predict_array(data).astype(float)
+
+
+def _unwrap(model: Any) -> Any:
+    """Descend dans les enveloppes connues (pyfunc MLflow, FeatureAlignedModel)."""
+    get_raw_model = getattr(model, "get_raw_model", None)
+    if callable(get_raw_model):
+        try:
+            return _unwrap(get_raw_model())
+        except Exception:
+            pass
+    impl = getattr(model, "_model_impl", None)
+    if impl is not None:
+        return _unwrap(getattr(impl, "sklearn_model", impl))
+    if isinstance(model, FeatureAlignedModel):
+        return _unwrap(model.model)
+    return model
+
+
+def build_native_predictor(model: Any) -> Optional[BoosterPredictor]:
+    """
+    Construit un BoosterPredictor si le modèle repose sur un Booster XGBoost
+    dont les features sont toutes présentes dans FEATURE_ORDER, sinon None.
+    """
+    raw = _unwrap(model)
+    n_trees = None
+    if hasattr(raw, "get_booster"):
+        try:
+            n_trees = raw.best_iteration + 1
+        except AttributeError:
+            n_trees = None
+        raw = raw.get_booster()
+    if not hasattr(raw, "inplace_predict"):
+        return None
+
+    feature_names = raw.feature_names
+    if feature_names is None:
+        if raw.num_features() != len(FEATURE_ORDER):
+            return None
+        feature_names = FEATURE_ORDER
+    if any(name not in FEATURE_ORDER for name in feature_names):
+        return None
+    columns = [FEATURE_ORDER.index(name) for name in feature_names]
+    return BoosterPredictor(raw, columns, n_trees=n_trees)
+
+
+def build_predictor(model: Any, engine: str = "auto"):
+    """
+    Retourne le prédicteur correspondant au moteur demandé :
+      - auto     : Booster XGBoost natif si détecté, chemin générique sinon
+      - generic  : DataFrame -> model.predict
+      - native   : Booster XGBoost natif (générique si non détecté)
+      - compiled : ensemble compilé (compilé à la volée depuis le Booster
+                   si le modèle chargé n'est pas déjà un CompiledEnsemble)
+    """
+    if engine not in SCORING_ENGINES:
+        raise ValueError(f"Moteur de scoring inconnu : {engine}")
+    if isinstance(model, CompiledEnsemble):
+        return CompiledPredictor(model)
+
+    if engine == "compiled":
+        raw = _unwrap(model)
+        try:
+            ensemble = CompiledEnsemble.from_model(raw)
+        except Exception as e:
+            logger.warning(f"Compilation impossible ({e}), chemin générique utilisé")
+        else:
+            if all(name in FEATURE_ORDER for name in ensemble.feature_names):
+                logger.info(f"Ensemble compilé activé ({ensemble.n_trees} arbres)")
+                return CompiledPredictor(ensemble)
+            logger.warning("Features du modèle inconnues, chemin générique utilisé")
+        return FramePredictor(model)
+
+    if engine in ("auto", "native"):
+        predictor = build_native_predictor(model)
+        if predictor is not None:
+            logger.info("Prédicteur XGBoost natif activé")
+            return predictor
+        if engine == "native":
+            logger.warning("Aucun Booster XGBoost détecté, chemin générique utilisé")
+    return FramePredictor(model)
@@ -0,0 +1,179 @@
+# src/inference/service/price_table.py
+"""
+Table de prix pré-calculée (SKU, mois, heure) -> prix.
+
+Les features temporelles ne prennent que 12 x 24 valeurs : pour un modèle
+et un snapshot de données donnés, tous les prix possibles tiennent dans un
+tableau (n_skus, 12, 24). La table est construite hors ligne et porte la
+version du modèle et le hash des données dont elle est issue ; le service
+la refuse si l'un des deux ne correspond pas à ce qu'il sert.
+
+Usage (depuis src/) :
+    python -m inference.service.price_table \\
+        --data ../data/raw/ingested_data.csv --model ../models/xgb_model.npz \\
+        --output ../models/price_table.npz
+"""
+
+import argparse
+import logging
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+from inference.entity.feature_index import FeatureIndex
+from inference.repository.data_repository import file_md5, read_observations
+from inference.service.prediction_service import build_feature_matrix
+
+logger = logging.getLogger(__name__)
+
+N_MONTHS = 12
+N_HOURS = 24
+
+
+class PriceTable:
+    """
+    Attributes:
+        skus: np.ndarray       # SKU (code -> SKU)
+        prices: np.ndarray     # (n_skus, 12, 24) float32, NaN = non couvert
+        model_version: str     # Version du modèle (ModelRepository.version)
+        data_hash: str         # MD5 des données sources
+        built_at: str          # Date de construction (ISO)
+    """
+
+    def __init__(
+        self,
+        skus: np.ndarray,
+        prices: np.ndarray,
+        model_version: str,
+        data_hash: str,
+        built_at: str,
+    ):
+        self.skus = skus
+        self.prices = prices
+        self.model_version = model_version
+        self.data_hash = data_hash
+        self.built_at = built_at
+        self.positions: Dict[str, int] = {
+            sku: code for code, sku in enumerate(skus.tolist())
+        }
+
+    def __len__(self) -> int:
+        return len(self.skus)
+
+    def lookup(self, sku: str, month: int, hour: int) -> Optional[float]:
+        """Prix arrondi au centime, ou None si le SKU ou le créneau manque."""
+        code = self.positions.get(sku)
+        if code is None:
+            return None
+        price = self.prices[code, month - 1, hour]
+        if price != price:  # NaN
+            return None
+        return round(float(price), 2)
+
+    def mismatch(
+        self, model_version: Optional[str], data_hash: Optional[str]
+    ) -> Optional[str]:
+        """Raison du refus de la table, ou None si elle correspond."""
+        if model_version != self.model_version:
+            return f"modèle {self.model_version!r} != modèle servi {model_version!r}"
+        if data_hash != self.data_hash:
+            return f"données {self.data_hash} != données servies {data_hash}"
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "n_skus": len(self),
+            "model_version": self.model_version,
+            "data_hash": self.data_hash,
+            "built_at": self.built_at,
+        }
+
+    # --- Persistance ----------------------------------------------------------
+
+    def save(self, path: Path) -> None:
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez(
+            path,
+            skus=np.asarray(self.skus, dtype=str),
+            prices=self.prices,
+            model_version=np.str_(self.model_version),
+            data_hash=np.str_(self.data_hash),
+            built_at=np.str_(self.built_at),
+        )
+        logger.info(f"Table de prix sauvegardée → {path} ({len(self)} SKU)")
+
+    @classmethod
+    def load(cls, path: Path) -> "PriceTable":
+        with np.load(Path(path), allow_pickle=False) as data:
+            return cls(
+                skus=data["skus"],
+                prices=data["prices"],
+                model_version=str(data["model_version"]),
+                data_hash=str(data["data_hash"]),
+                built_at=str(data["built_at"]),
+            )
+
+
+def build_price_table(
+    index: FeatureIndex, predictor: Any, model_version: str, data_hash: str
+) -> PriceTable:
+    """
+    Prédit les 12 x 24 créneaux pour tous les SKU ayant assez d'observations
+    (un appel au modèle par créneau). Les autres SKU restent à NaN et sont
+    donc servis par le modèle (qui lève l'erreur métier adaptée).
+    """
+    eligible = np.flatnonzero(index.counts >= index.n_last)
+    prices = np.full((len(index), N_MONTHS, N_HOURS), np.nan, dtype=np.float32)
+    numeric = np.ascontiguousarray(index.features[eligible])
+    for month in range(1, N_MONTHS + 1):
+        for hour in range(N_HOURS):
+            matrix = build_feature_matrix(numeric, datetime(2000, month, 1, hour))
+            prices[eligible, month - 1, hour] = predictor.predict(matrix)
+    return PriceTable(
+        skus=np.asarray(index.skus, dtype=str),
+        prices=prices,
+        model_version=model_version,
+        data_hash=data_hash,
+        built_at=datetime.now().isoformat(),
+    )
+
+
+if __name__ == "__main__":
+    logging.basicConfig(
+        level=logging.INFO,
+        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
+    )
+    parser = argparse.ArgumentParser(description="Construit la table de prix")
+    parser.add_argument(
+        "--data", type=Path, required=True, help="Ventes (CSV ou Parquet)"
+    )
+    parser.add_argument(
+        "--model", type=Path, required=True, help="Modèle .pkl ou ensemble .npz"
+    )
+    parser.add_argument(
+        "--model-version",
+        help="Version servie par l'API (défaut : compiled:<nom> ou local:<nom>, "
+        "comme les repositories ; numéro de version pour le registry MLflow)",
+    )
+    parser.add_argument("--engine", default="auto")
+    parser.add_argument("--output", type=Path, required=True)
+    args = parser.parse_args()
+
+    from inference.batch_score import load_model
+    from inference.service.predictor import build_predictor
+
+    model_version = args.model_version or (
+        f"compiled:{args.model.name}"
+        if args.model.suffix == ".npz"
+        else f"local:{args.model.name}"
+    )
+    table = build_price_table(
+        FeatureIndex.from_frame(read_observations(args.data)),
+        build_predictor(load_model(args.model), engine=args.engine),
+        model_version=model_version,
+        data_hash=file_md5(args.data),
+    )
+    table.save(args.output)
@@ -27,3 +27,19 @@ def create_directories(paths: list[Path]):
     for p in paths:
         p.mkdir(parents=True, exist_ok=True)
         logger.info(f"Répertoire prêt : {p}")
+
+
+# Formats de stockage des données entre étapes (config.yaml : storage.format)
+STORAGE_FORMATS = ("csv", "parquet")
+
+
+def with_storage_format(path: Path, storage_format: str) -> Path:
+    """
+    Remplace l'extension du fichier par celle du format de stockage configuré
+    (ex: data/raw/ingested_data.csv -> data/raw/ingested_data.parquet).
+    """
+    if storage_format not in STORAGE_FORMATS:
+        raise ValueError(
+            f"Format de stockage inconnu : {storage_format} (attendu : {STORAGE_FORMATS})"
+        )
+    return path.with_suffix(f".{storage_format}")
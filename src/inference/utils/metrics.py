@@ -0,0 +1,297 @@
+# src/inference/utils/metrics.py
+"""
+Métriques du service d'inférence au format texte Prometheus.
+
+Les compteurs et histogrammes sont « shardés » par thread : chaque thread
+écrit dans ses propres structures sans verrou, et la lecture (/metrics)
+agrège les shards. Le chemin chaud ne coûte qu'une lecture de
+threading.local et quelques opérations sur un dict.
+"""
+
+import bisect
+import math
+import threading
+from time import perf_counter
+from typing import Callable, Dict, List, Sequence, Tuple
+
+# Bornes (secondes) adaptées à des latences de l'ordre de la µs à la seconde
+DEFAULT_BUCKETS: Tuple[float, ...] = (
+    0.00001,
+    0.000025,
+    0.00005,
+    0.0001,
+    0.00025,
+    0.0005,
+    0.001,
+    0.0025,
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+)
+
+
+class _ThreadShards:
+    """Une structure par thread ; le verrou ne sert qu'à l'enregistrement."""
+
+    def __init__(self, factory: Callable[[], dict]):
+        self._factory = factory
+        self._local = threading.local()
+        self._shards: List[dict] = []
+        self._lock = threading.Lock()
+
+    def get(self) -> dict:
+        shard = getattr(self._local, "shard", None)
+        if shard is None:
+            shard = self._factory()
+            with self._lock:
+                self._shards.append(shard)
+            self._local.shard = shard
+        return shard
+
+    def all(self) -> List[dict]:
+        with self._lock:
+            return list(self._shards)
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+def _format_value(value: float) -> str:
+    """
+    Valeur d'échantillon sans perte de précision : entier tel quel, flottant
+    au format repr (":g" arrondirait à 6 chiffres significatifs).
+    """
+    value = float(value)
+    if math.isnan(value):
+        return "NaN"
+    if math.isinf(value):
+        return "+Inf" if value > 0 else "-Inf"
+    if value.is_integer() and abs(value) < 2**53:
+        return str(int(value))
+    return repr(value)
+
+
+def _escape(value) -> str:
+    return str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+class Counter:
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._shards = _ThreadShards(dict)
+
+    def inc(self, labels: Tuple = (), amount: float = 1.0) -> None:
+        shard = self._shards.get()
+        shard[labels] = shard.get(labels, 0.0) + amount
+
+    def values(self) -> Dict[Tuple, float]:
+        totals: Dict[Tuple, float] = {}
+        for shard in self._shards.all():
+            for labels, value in list(shard.items()):
+                totals[labels] = totals.get(labels, 0.0) + value
+        return totals
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} counter",
+        ]
+        for labels, value in sorted(self.values().items()):
+            lines.append(
+                f"{self.name}{_format_labels(self.labelnames, labels)} {_format_value(value)}"
+            )
+        return lines
+
+
+class Histogram:
+    def __init__(
+        self,
+        name: str,
+        documentation: str,
+        labelnames: Sequence[str] = (),
+        buckets: Sequence[float] = DEFAULT_BUCKETS,
+    ):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self.buckets = tuple(sorted(buckets))
+        self._shards = _ThreadShards(dict)
+
+    def observe(self, value: float, labels: Tuple = ()) -> None:
+        shard = self._shards.get()
+        state = shard.get(labels)
+        if state is None:
+            # [comptes par bucket..., +Inf, somme]
+            state = shard[labels] = [0] * (len(self.buckets) + 1) + [0.0]
+        state[bisect.bisect_left(self.buckets, value)] += 1
+        state[-1] += value
+
+    def snapshot(self) -> Dict[Tuple, List]:
+        totals: Dict[Tuple, List] = {}
+        for shard in self._shards.all():
+            for labels, state in list(shard.items()):
+                total = totals.setdefault(labels, [0] * len(state[:-1]) + [0.0])
+                for i, v in enumerate(list(state)):
+                    total[i] += v
+        return totals
+
+    def render(self) -> List[str]:
+        lines = [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} histogram",
+        ]
+        for labels, state in sorted(self.snapshot().items()):
+            cumulative = 0
+            bounds = [f"{b:g}" for b in self.buckets] + ["+Inf"]
+            for bound, count in zip(bounds, state[:-1]):
+                cumulative += count
+                lbl = _format_labels(self.labelnames, labels, f'le="{bound}"')
+                lines.append(f"{self.name}_bucket{lbl} {cumulative}")
+            lbl = _format_labels(self.labelnames, labels)
+            lines.append(f"{self.name}_sum{lbl} {_format_value(state[-1])}")
+            lines.append(f"{self.name}_count{lbl} {cumulative}")
+        return lines
+
+
+class Gauge:
+    """Valeur lue au moment du scrape via une fonction."""
+
+    def __init__(self, name: str, documentation: str, read: Callable[[], float]):
+        self.name = name
+        self.documentation = documentation
+        self.read = read
+
+    def render(self) -> List[str]:
+        return [
+            f"# HELP {self.name} {self.documentation}",
+            f"# TYPE {self.name} gauge",
+            f"{self.name} {_format_value(self.read())}",
+        ]
+
+
+class MetricsRegistry:
+    def __init__(self):
+        self._metrics: Dict[str, object] = {}
+
+    def _register(self, metric):
+        existing = self._metrics.get(metric.name)
+        if existing is not None:
+            return existing
+        self._metrics[metric.name] = metric
+        return metric
+
+    def counter(self, name: str, documentation: str, labelnames=()) -> Counter:
+        return self._register(Counter(name, documentation, labelnames))
+
+    def histogram(
+        self, name: str, documentation: str, labelnames=(), **kw
+    ) -> Histogram:
+        return self._register(Histogram(name, documentation, labelnames, **kw))
+
+    def gauge(self, name: str, documentation: str, read: Callable[[], float]) -> Gauge:
+        # Remplace une jauge existante (ex. nouvelle instance après redémarrage)
+        gauge = Gauge(name, documentation, read)
+        self._metrics[name] = gauge
+        return gauge
+
+    def render(self) -> str:
+        lines: List[str] = []
+        for metric in list(self._metrics.values()):
+            lines.extend(metric.render())
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = MetricsRegistry()
+
+PREDICT_STAGE_SECONDS = REGISTRY.histogram(
+    "inference_predict_stage_seconds",
+    "Durée de chaque étape de la prédiction.",
+    ["stage"],
+)
+HTTP_REQUESTS_TOTAL = REGISTRY.counter(
+    "inference_http_requests_total",
+    "Requêtes HTTP par endpoint et code de statut.",
+    ["endpoint", "method", "status"],
+)
+HTTP_REQUEST_SECONDS = REGISTRY.histogram(
+    "inference_http_request_seconds",
+    "Latence des requêtes HTTP par endpoint.",
+    ["endpoint"],
+)
+ERRORS_TOTAL = REGISTRY.counter(
+    "inference_errors_total",
+    "Erreurs par endpoint et type d'exception.",
+    ["endpoint", "exception"],
+)
+PRICE_TABLE_LOOKUPS = REGISTRY.counter(
+    "inference_price_table_lookups_total",
+    "Consultations de la table de prix pré-calculée (hit / miss).",
+    ["result"],
+)
+RELOAD_SECONDS = REGISTRY.histogram(
+    "inference_reload_seconds",
+    "Durée des rechargements (modèle, données, index).",
+    ["kind"],
+    buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0),
+)
+ADMISSION_SHED_TOTAL = REGISTRY.counter(
+    "inference_admission_shed_total",
+    "Requêtes rejetées par le contrôle d'admission (file pleine, échéance).",
+    ["endpoint", "reason"],
+)
+ADMISSION_QUEUE_WAIT_SECONDS = REGISTRY.histogram(
+    "inference_admission_queue_wait_seconds",
+    "Temps passé dans la file d'admission avant traitement ou rejet.",
+)
+
+
+class MetricsMiddleware:
+    """
+    Middleware ASGI : compte les requêtes par endpoint (chemin de la route,
+    pas l'URL brute, pour borner la cardinalité) et mesure leur latence.
+    """
+
+    def __init__(self, app):
+        self.app = app
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        start = perf_counter()
+        status = [500]
+
+        async def send_with_status(message):
+            if message["type"] == "http.response.start":
+                status[0] = message["status"]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_status)
+        except Exception as e:
+            ERRORS_TOTAL.inc((_endpoint(scope), type(e).__name__))
+            raise
+        finally:
+            endpoint = _endpoint(scope)
+            HTTP_REQUESTS_TOTAL.inc((endpoint, scope["method"], str(status[0])))
+            HTTP_REQUEST_SECONDS.observe(perf_counter() - start, (endpoint,))
+
+
+def _endpoint(scope) -> str:
+    route = scope.get("route")
+    return getattr(route, "path", "unmatched")
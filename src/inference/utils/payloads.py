@@ -0,0 +1,183 @@
+# src/inference/utils/payloads.py
+"""
+Formats binaires de /predict/batch, négociés par Content-Type / Accept :
+
+- Arrow IPC (application/vnd.apache.arrow.stream) : requête = table à une
+  colonne `sku` ; réponse = table sku / predicted_price / error / detail,
+  l'horodatage du lot dans les métadonnées du schéma. La colonne des prix
+  est construite directement sur le tableau NumPy du service (NaN -> null).
+- MessagePack (application/msgpack) : requête = {"skus": [...]} comme en
+  JSON ; réponse = un dictionnaire de colonnes (NaN pour les SKU en échec).
+
+pyarrow et msgpack ne sont importés qu'à l'usage : un format dont le module
+manque n'est ni accepté (415), ni négocié (406), ni annoncé.
+
+Les messages de PayloadError sont renvoyés tels quels au client (400) : en
+anglais, comme les autres erreurs de l'API.
+"""
+
+import importlib.util
+from functools import lru_cache
+from typing import List, Optional
+
+import numpy as np
+
+from inference.entity.dto import BatchPredictionColumns
+
+JSON = "application/json"
+ARROW = "application/vnd.apache.arrow.stream"
+MSGPACK = "application/msgpack"
+
+# Alias rencontrés chez les clients -> type canonique
+_ALIASES = {
+    JSON: JSON,
+    ARROW: ARROW,
+    "application/vnd.apache.arrow.file": ARROW,
+    MSGPACK: MSGPACK,
+    "application/x-msgpack": MSGPACK,
+    "application/vnd.msgpack": MSGPACK,
+}
+
+
+# Module optionnel requis par chaque format binaire
+_MODULES = {ARROW: "pyarrow", MSGPACK: "msgpack"}
+
+
+@lru_cache(maxsize=None)
+def _installed(module: str) -> bool:
+    return importlib.util.find_spec(module) is not None
+
+
+def supported(fmt: str) -> bool:
+    """Vrai si le format est servi (JSON, ou module optionnel installé)."""
+    module = _MODULES.get(fmt)
+    return module is None or _installed(module)
+
+
+def supported_types() -> List[str]:
+    """Types canoniques servis, JSON en premier."""
+    return [fmt for fmt in (JSON, ARROW, MSGPACK) if supported(fmt)]
+
+
+class PayloadError(ValueError):
+    """Corps de requête illisible dans le format annoncé."""
+
+    pass
+
+
+def media_type(header: Optional[str]) -> Optional[str]:
+    """
+    Type canonique d'un en-tête Content-Type (paramètres ignorés), ou None
+    s'il n'est pas servi (415).
+    """
+    if not header:
+        return JSON
+    fmt = _ALIASES.get(header.split(";", 1)[0].strip().lower())
+    return fmt if fmt is not None and supported(fmt) else None
+
+
+def negotiate(accept: Optional[str], request_type: str) -> Optional[str]:
+    """
+    Format de la réponse : le premier type supporté de Accept (par qualité
+    décroissante) ; sans Accept, ou pour */*, le format de la requête.
+    None si Accept ne liste aucun type servi (406).
+    """
+    if not accept:
+        return request_type
+    candidates = []
+    for position, entry in enumerate(accept.split(",")):
+        mime, _, params = entry.partition(";")
+        quality = 1.0
+        for param in params.split(";"):
+            name, _, value = param.partition("=")
+            if name.strip() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        candidates.append((-quality, position, mime.strip().lower()))
+    for negative_quality, _, mime in sorted(candidates):
+        if negative_quality >= 0:
+            break
+        if mime in ("*/*", "application/*"):
+            return request_type
+        if mime in _ALIASES and supported(_ALIASES[mime]):
+            return _ALIASES[mime]
+    return None
+
+
+def decode_skus(body: bytes, fmt: str) -> List[str]:
+    """Liste des SKU d'un corps Arrow ou MessagePack."""
+    if fmt == ARROW:
+        import pyarrow as pa
+
+        try:
+            table = pa.ipc.open_stream(body).read_all()
+        except pa.ArrowInvalid:
+            try:
+                table = pa.ipc.open_file(pa.BufferReader(body)).read_all()
+            except pa.ArrowInvalid as e:
+                raise PayloadError(f"Invalid Arrow IPC body: {e}")
+        if "sku" not in table.column_names:
+            raise PayloadError("The Arrow table must have a 'sku' column")
+        column = table.column("sku")
+        if column.null_count:
+            raise PayloadError("The 'sku' column contains nulls")
+        return column.cast(pa.string()).to_pylist()
+
+    if fmt == MSGPACK:
+        import msgpack
+
+        try:
+            payload = msgpack.unpackb(body, raw=False)
+        except Exception as e:
+            raise PayloadError(f"Invalid MessagePack body: {e}")
+        skus = payload.get("skus") if isinstance(payload, dict) else None
+        if not isinstance(skus, list) or not all(isinstance(s, str) for s in skus):
+            raise PayloadError("The MessagePack body must be {'skus': [str, ...]}")
+        return skus
+
+    raise PayloadError(f"Unsupported request format: {fmt}")
+
+
+def encode_columns(columns: BatchPredictionColumns, fmt: str) -> bytes:
+    """Sérialise le résultat colonne par colonne (aucun objet par ligne)."""
+    timestamp = columns.timestamp.isoformat()
+
+    if fmt == ARROW:
+        import pyarrow as pa
+
+        failed = np.isnan(columns.prices)
+        if failed.any():
+            errors = pa.array(columns.errors, type=pa.string())
+            details = pa.array(columns.details, type=pa.string())
+        else:
+            errors = details = pa.nulls(len(columns.skus), type=pa.string())
+        table = pa.table(
+            {
+                "sku": pa.array(columns.skus, type=pa.string()),
+                "predicted_price": pa.array(columns.prices, mask=failed),
+                "error": errors,
+                "detail": details,
+            }
+        ).replace_schema_metadata({"timestamp": timestamp})
+        sink = pa.BufferOutputStream()
+        with pa.ipc.new_stream(sink, table.schema) as writer:
+            writer.write_table(table)
+        return sink.getvalue().to_pybytes()
+
+    if fmt == MSGPACK:
+        import msgpack
+
+        return msgpack.packb(
+            {
+                "timestamp": timestamp,
+                "sku": columns.skus,
+                "predicted_price": columns.prices.tolist(),
+                "error": columns.errors,
+                "detail": columns.details,
+            },
+            use_bin_type=True,
+        )
+
+    raise ValueError(f"Format de réponse non supporté : {fmt}")
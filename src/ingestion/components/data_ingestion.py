@@ -1,16 +1,37 @@
 # src/ingestion/components/data_ingestion.py
 
 import argparse
+import glob
 import logging
 import hashlib
+import itertools
+import json
 import pandas as pd
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
+from time import perf_counter
+from typing import (
+    Any,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Tuple,
+    Union,
+)
 
 from ingestion.config.configuration import ConfigurationManager
-from ingestion.repository.repository import CsvIngestionRepository
+from ingestion.repository.partitioned_repository import PartitionedIngestionRepository
+from ingestion.repository.repository import build_ingestion_repository
+from ingestion.utils.download import HttpDownloader
 
 logger = logging.getLogger(__name__)
 
+# Rapport par source des ingestions multi-sources (à côté du fichier ingéré)
+SOURCE_REPORT_NAME = "ingestion_report.json"
+
 
 def calculate_md5(file_path: Path) -> str:
     """
@@ -38,12 +59,433 @@ def validate_schema(df: pd.DataFrame):
         raise ValueError("La colonne 'Prix' doit être numérique.")
 
 
+def validate_chunks(chunks: Iterable[pd.DataFrame]) -> Iterator[pd.DataFrame]:
+    """
+    Valide chaque bloc lu par pd.read_csv(chunksize=...) avant de le transmettre.
+
+    Le type de 'Prix' est inféré bloc par bloc : un bloc d'entiers et un bloc
+    de flottants sont tous deux numériques, mais s'écriraient différemment
+    ("12" / "12.0"). 'Prix' est donc converti en float64 dans chaque bloc
+    pour un fichier de sortie homogène.
+    """
+    start = 0
+    for i, chunk in enumerate(chunks):
+        if chunk.empty:
+            continue
+        try:
+            validate_schema(chunk)
+        except ValueError as e:
+            raise ValueError(
+                f"Bloc {i} (lignes {start}-{start + len(chunk) - 1}) : {e}"
+            ) from e
+        chunk["Prix"] = chunk["Prix"].astype("float64")
+        start += len(chunk)
+        yield chunk
+    if start == 0:
+        raise ValueError("Le DataFrame est vide.")
+    logger.info(f"Validation du schéma réussie ({start} lignes, {i + 1} blocs).")
+
+
+def run_streaming_ingestion(
+    source_url: str,
+    ingested_file: Path,
+    chunk_size: int,
+    downloader: Optional[HttpDownloader] = None,
+):
+    """
+    Lit, valide et écrit la source par blocs de `chunk_size` lignes : la
+    mémoire utilisée dépend de la taille d'un bloc, pas de celle du fichier.
+    Le MD5 est calculé sur les octets écrits, sans relire le fichier.
+    """
+    downloader = downloader or HttpDownloader(ingested_file.parent / ".sources")
+    try:
+        local_source, _ = fetch_source(source_url, downloader)
+        reader = pd.read_csv(
+            local_source,
+            sep=",",
+            encoding="utf-8",
+            chunksize=chunk_size,
+        )
+    except Exception as e:
+        logger.error(f"Erreur de lecture du CSV : {e}")
+        raise
+    logger.info(f"Lecture par blocs de {chunk_size} lignes : {source_url}")
+
+    try:
+        with reader:
+            repo = build_ingestion_repository(ingested_file)
+            md5 = repo.save_chunks(validate_chunks(reader))
+        logger.info(f"Fichier ingéré sauvegardé : {ingested_file} (MD5={md5})")
+    except Exception as e:
+        logger.error(f"Échec de l'ingestion par blocs : {e}")
+        raise
+    return md5
+
+
+def is_remote(source_url: str) -> bool:
+    return source_url.startswith(("http://", "https://"))
+
+
+def expand_sources(source_url: Union[str, Sequence[str]]) -> List[str]:
+    """
+    Liste ordonnée des sources : `source_URL` est un chemin, une URL, un
+    motif glob (fichiers triés par nom) ou une liste de ceux-ci. Cet ordre
+    est celui de la fusion, identique d'un passage à l'autre.
+    """
+    entries = [source_url] if isinstance(source_url, str) else list(source_url)
+    sources: List[str] = []
+    for entry in entries:
+        if is_remote(entry) or not any(c in entry for c in "*?["):
+            sources.append(entry)
+            continue
+        # Fichiers seulement : un jeu partitionné (ingested_data.csv/) ou un
+        # dossier au nom en .csv ne sont pas des sources
+        matches = sorted(
+            Path(m).as_posix()
+            for m in glob.glob(entry, recursive=True)
+            if Path(m).is_file()
+        )
+        if not matches:
+            raise FileNotFoundError(f"Aucun fichier ne correspond au motif : {entry}")
+        sources.extend(matches)
+    # Une source listée deux fois n'est ingérée qu'une fois
+    return list(dict.fromkeys(sources))
+
+
+def fetch_source(
+    source_url: str, downloader: HttpDownloader, with_md5: bool = False
+) -> Tuple[Path, Optional[str]]:
+    """
+    Chemin local de la source : le fichier lui-même, ou sa copie à jour dans
+    le cache du téléchargeur pour une URL. Le MD5 (None sinon) n'est calculé
+    qu'avec `with_md5` : c'est une lecture complète de plus de la source. Il
+    est conservé avec la copie d'une URL, qui n'est pas relue si inchangée.
+    """
+    if not is_remote(source_url):
+        md5 = calculate_md5(Path(source_url)) if with_md5 else None
+        return Path(source_url), md5
+    download = downloader.fetch(source_url, with_md5=with_md5)
+    return download.path, download.md5
+
+
+def select_new_rows(
+    chunks: Iterable[pd.DataFrame],
+    watermark: Optional[pd.Timestamp],
+    stats: Dict[str, Any],
+) -> Iterator[pd.DataFrame]:
+    """
+    Ne garde que les lignes postérieures au watermark (toutes au premier
+    passage). `stats` reçoit le nombre de lignes retenues et leurs bornes.
+    """
+    for chunk in chunks:
+        if "Timestamp" not in chunk.columns:
+            raise ValueError("Colonne 'Timestamp' requise en mode incrémental.")
+        ts = pd.to_datetime(chunk["Timestamp"], errors="coerce")
+        if watermark is not None:
+            # Lignes sans Timestamp valide : non comparables, ignorées
+            mask = ts > watermark
+            chunk, ts = chunk[mask], ts[mask]
+        if chunk.empty:
+            continue
+        stats["rows"] += len(chunk)
+        low, high = ts.min(), ts.max()
+        if pd.notna(low) and (stats["min"] is None or low < stats["min"]):
+            stats["min"] = low
+        if pd.notna(high) and (stats["max"] is None or high > stats["max"]):
+            stats["max"] = high
+        yield chunk
+
+
+def read_source(path: Path, chunk_size: int = 0) -> Iterable[pd.DataFrame]:
+    """Blocs de `chunk_size` lignes, ou le fichier entier en un seul bloc."""
+    if chunk_size:
+        return pd.read_csv(path, sep=",", encoding="utf-8", chunksize=chunk_size)
+    return [pd.read_csv(path, sep=",", encoding="utf-8", low_memory=False)]
+
+
+def prepare_source(
+    source_url: str,
+    downloader: HttpDownloader,
+    chunk_size: int = 0,
+    incremental: bool = False,
+    watermark: Optional[pd.Timestamp] = None,
+    known_md5: Optional[str] = None,
+) -> Dict[str, Any]:
+    """
+    Récupère, hashe (en incrémental) et valide une source sans jamais lever :
+    le résultat porte son statut (ok, unchanged, no_new_rows ou failed) et
+    l'erreur éventuelle. Hors streaming, les blocs validés sont conservés (clé
+    "frames") ; en streaming, la source est relue au moment de la fusion.
+    """
+    result: Dict[str, Any] = {"source": source_url, "status": "failed", "rows": 0}
+    start = perf_counter()
+    try:
+        # MD5 utile au seul mode incrémental (détection des sources inchangées)
+        local_source, result["md5"] = fetch_source(
+            source_url, downloader, with_md5=incremental
+        )
+        result["path"] = local_source.as_posix()
+        if known_md5 is not None and known_md5 == result["md5"]:
+            result["status"] = "unchanged"
+            return result
+
+        chunks = read_source(local_source, chunk_size)
+        if incremental:
+            stats = {"rows": 0, "min": None, "max": None}
+            chunks = select_new_rows(chunks, watermark, stats)
+            first = next(chunks, None)
+            if first is None:
+                result["status"] = "no_new_rows"
+                return result
+            chunks = itertools.chain([first], chunks)
+
+        frames = []
+        for chunk in validate_chunks(chunks):
+            result["rows"] += len(chunk)
+            result.setdefault("columns", list(chunk.columns))
+            if not chunk_size:
+                frames.append(chunk)
+        if not chunk_size:
+            result["frames"] = frames
+        if incremental:
+            result["min_timestamp"], result["max_timestamp"] = (
+                stats["min"],
+                stats["max"],
+            )
+        result["status"] = "ok"
+    except Exception as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    finally:
+        result["seconds"] = round(perf_counter() - start, 3)
+    return result
+
+
+def prepare_sources(
+    sources: Sequence[str],
+    downloader: HttpDownloader,
+    max_workers: int,
+    chunk_size: int = 0,
+    incremental: bool = False,
+    watermark: Optional[pd.Timestamp] = None,
+    known_md5s: Optional[Dict[str, str]] = None,
+) -> List[Dict[str, Any]]:
+    """
+    Prépare les sources dans un pool de threads borné (téléchargement et
+    lecture CSV libèrent le GIL) ; les résultats suivent l'ordre des sources,
+    quel que soit l'ordre de fin des tâches.
+    """
+    known_md5s = known_md5s or {}
+    workers = max(1, min(max_workers, len(sources)))
+    logger.info(f"{len(sources)} source(s) à préparer ({workers} en parallèle)")
+    with ThreadPoolExecutor(max_workers=workers) as pool:
+        return list(
+            pool.map(
+                lambda source: prepare_source(
+                    source,
+                    downloader,
+                    chunk_size,
+                    incremental,
+                    watermark,
+                    known_md5s.get(source),
+                ),
+                sources,
+            )
+        )
+
+
+def check_sources(
+    results: List[Dict[str, Any]], on_source_error: str, report_path: Path
+) -> List[Dict[str, Any]]:
+    """
+    Retourne les sources à fusionner, dans l'ordre. Une source dont les
+    colonnes diffèrent de celles de la première source valide est mise en
+    échec. Le rapport par source est écrit avant toute erreur ; une source en
+    échec fait échouer l'ingestion si on_source_error vaut "fail", ou si
+    aucune source n'est exploitable.
+    """
+    reference = None
+    for result in results:
+        if result["status"] != "ok":
+            continue
+        if reference is None:
+            reference = result["columns"]
+        elif set(result["columns"]) != set(reference):
+            result.pop("frames", None)
+            result["status"] = "failed"
+            result["error"] = (
+                f"Colonnes {result['columns']} différentes de celles de "
+                f"la première source : {reference}"
+            )
+
+    for result in results:
+        message = f"Source {result['source']} : {result['status']}"
+        if result["status"] == "failed":
+            logger.error(f"{message} ({result['error']})")
+        else:
+            logger.info(f"{message} ({result['rows']} lignes, {result['seconds']} s)")
+    write_source_report(results, report_path)
+
+    accepted = [r for r in results if r["status"] == "ok"]
+    failed = [r for r in results if r["status"] == "failed"]
+    if failed and (on_source_error == "fail" or len(failed) == len(results)):
+        raise ValueError(
+            f"{len(failed)} source(s) en échec sur {len(results)} "
+            f"(détail : {report_path}) : "
+            + "; ".join(f"{r['source']} ({r['error']})" for r in failed)
+        )
+    if failed:
+        logger.warning(
+            f"{len(failed)} source(s) en échec ignorée(s) (on_source_error=skip)"
+        )
+    return accepted
+
+
+def write_source_report(results: List[Dict[str, Any]], report_path: Path) -> None:
+    report = [
+        {
+            key: value.isoformat() if isinstance(value, pd.Timestamp) else value
+            for key, value in result.items()
+            if key != "frames"
+        }
+        for result in results
+    ]
+    report_path.parent.mkdir(parents=True, exist_ok=True)
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2, ensure_ascii=False)
+
+
+def merge_sources(
+    accepted: List[Dict[str, Any]],
+    chunk_size: int = 0,
+    incremental: bool = False,
+    watermark: Optional[pd.Timestamp] = None,
+) -> Iterator[pd.DataFrame]:
+    """
+    Blocs validés des sources retenues, source après source dans l'ordre de
+    la liste, colonnes dans l'ordre de la première source.
+    """
+    columns = accepted[0]["columns"]
+    for result in accepted:
+        if "frames" in result:
+            # Libérés au fur et à mesure de l'écriture
+            chunks = result.pop("frames")
+        else:
+            chunks = read_source(Path(result["path"]), chunk_size)
+            if incremental:
+                chunks = select_new_rows(
+                    chunks, watermark, {"rows": 0, "min": None, "max": None}
+                )
+            chunks = validate_chunks(chunks)
+        for chunk in chunks:
+            yield chunk[columns]
+
+
+def run_multi_source_ingestion(
+    sources: Sequence[str],
+    ingested_file: Path,
+    chunk_size: int = 0,
+    max_workers: int = 4,
+    on_source_error: str = "fail",
+    downloader: Optional[HttpDownloader] = None,
+) -> str:
+    """
+    Ingestion complète de plusieurs sources : chacune est récupérée et
+    validée en parallèle, puis les sources retenues sont concaténées dans
+    l'ordre de la liste dans un seul fichier ingéré.
+    """
+    downloader = downloader or HttpDownloader(ingested_file.parent / ".sources")
+    results = prepare_sources(sources, downloader, max_workers, chunk_size)
+    accepted = check_sources(
+        results, on_source_error, ingested_file.parent / SOURCE_REPORT_NAME
+    )
+    try:
+        repo = build_ingestion_repository(ingested_file)
+        md5 = repo.save_chunks(merge_sources(accepted, chunk_size))
+    except Exception as e:
+        logger.error(f"Échec de la fusion des sources : {e}")
+        raise
+    logger.info(
+        f"Fichier ingéré sauvegardé : {ingested_file} "
+        f"({len(accepted)} source(s), MD5={md5})"
+    )
+    return md5
+
+
+def run_incremental_ingestion(
+    source_url: Union[str, Sequence[str]],
+    dataset_dir: Path,
+    storage_format: str,
+    chunk_size: int = 0,
+    max_workers: int = 1,
+    on_source_error: str = "fail",
+    downloader: Optional[HttpDownloader] = None,
+) -> Optional[Dict[str, Any]]:
+    """
+    Ajoute au jeu partitionné les lignes des sources plus récentes que le
+    watermark, dans une nouvelle partition datée. Une source inchangée (même
+    MD5 qu'au dernier passage) n'est pas relue. Retourne la partition
+    écrite, ou None.
+
+    Le watermark est lu une fois pour toutes les sources du passage. Une
+    source en échec ignorée (on_source_error=skip) n'est pas enregistrée et
+    sera retentée, mais ses lignes antérieures au nouveau watermark seront
+    alors écartées.
+    """
+    repo = PartitionedIngestionRepository(dataset_dir, storage_format)
+    watermark = repo.watermark()
+    logger.info(f"Ingestion incrémentale depuis le watermark {watermark}")
+    results = prepare_sources(
+        expand_sources(source_url),
+        downloader or HttpDownloader(dataset_dir.parent / ".sources"),
+        max_workers,
+        chunk_size,
+        incremental=True,
+        watermark=watermark,
+        known_md5s=repo.source_md5s(),
+    )
+    accepted = check_sources(
+        results, on_source_error, dataset_dir.parent / SOURCE_REPORT_NAME
+    )
+    # Sources lues sans échec : leur MD5 est enregistré, même sans ligne nouvelle
+    seen = {
+        r["source"]: r["md5"] for r in results if r["status"] in ("ok", "no_new_rows")
+    }
+    if not accepted:
+        if seen:
+            repo.commit(seen)
+        logger.info("Aucune ligne postérieure au watermark : rien à ingérer.")
+        return None
+
+    try:
+        partition = repo.write_partition(
+            merge_sources(accepted, chunk_size, incremental=True, watermark=watermark)
+        )
+    except Exception as e:
+        logger.error(f"Échec de l'ingestion incrémentale : {e}")
+        raise
+    lows = [r["min_timestamp"] for r in accepted if r["min_timestamp"] is not None]
+    highs = [r["max_timestamp"] for r in accepted if r["max_timestamp"] is not None]
+    partition.update(
+        rows=sum(r["rows"] for r in accepted),
+        min_timestamp=min(lows).isoformat() if lows else None,
+        max_timestamp=max(highs).isoformat() if highs else None,
+        sources={r["source"]: r["md5"] for r in accepted},
+    )
+    repo.commit(seen, partition)
+    logger.info(
+        f"Partition ajoutée : {dataset_dir / partition['path']} "
+        f"({partition['rows']} lignes, MD5={partition['md5']})"
+    )
+    return partition
+
+
 def run_ingestion(config_path: str, params_path: str):
     """
     1. Charge config et params.
-    2. Lit le CSV (URL ou local).
+    2. Lit le CSV (URL ou local), en une fois ou par blocs (chunk_size) ;
+       plusieurs sources (liste ou glob) sont lues en parallèle.
     3. Valide le schéma minimal.
-    4. Persiste via CsvIngestionRepository.
+    4. Persiste via le repository du format configuré (CSV ou Parquet).
     """
     cm = ConfigurationManager(config_path, params_path)
     ingestion_cfg = cm.get_data_ingestion_config()
@@ -52,12 +494,55 @@ def run_ingestion(config_path: str, params_path: str):
     source_url = ingestion_cfg.source_URL
     raw_dir = ingestion_cfg.raw_data_dir
     ingested_file = raw_dir / ingestion_cfg.ingested_file_name
+    # Sources HTTP(S) : copies à jour dans data/raw/.sources
+    download_cfg = ingestion_cfg.download
+    downloader = HttpDownloader(
+        raw_dir / ".sources",
+        part_size=download_cfg.part_size_mb << 20,
+        max_parallel=download_cfg.max_parallel,
+        min_parallel_size=download_cfg.min_parallel_size_mb << 20,
+        retries=download_cfg.retries,
+        timeout=download_cfg.timeout,
+    )
+
+    # Mode incrémental : partitions datées au chemin du fichier ingéré
+    if ingestion_cfg.mode == "incremental":
+        run_incremental_ingestion(
+            source_url,
+            ingested_file,
+            ingestion_cfg.storage_format,
+            ingestion_cfg.chunk_size,
+            ingestion_cfg.max_workers,
+            ingestion_cfg.on_source_error,
+            downloader,
+        )
+        return
+
+    # Liste ou motif glob : sources préparées en parallèle puis fusionnées
+    sources = expand_sources(source_url)
+    if sources != [source_url]:
+        run_multi_source_ingestion(
+            sources,
+            ingested_file,
+            ingestion_cfg.chunk_size,
+            ingestion_cfg.max_workers,
+            ingestion_cfg.on_source_error,
+            downloader,
+        )
+        return
+
+    # Mode streaming : source plus grosse que la mémoire disponible
+    if ingestion_cfg.chunk_size:
+        run_streaming_ingestion(
+            source_url, ingested_file, ingestion_cfg.chunk_size, downloader
+        )
+        return
 
     # Lecture du CSV
     try:
-        if source_url.startswith(("http://", "https://")):
-            df = pd.read_csv(source_url, sep=",", encoding="utf-8", low_memory=False)
-            logger.info(f"CSV téléchargé depuis URL : {source_url}")
+        if is_remote(source_url):
+            local_source, _ = fetch_source(source_url, downloader)
+            df = pd.read_csv(local_source, sep=",", encoding="utf-8", low_memory=False)
         else:
             df = pd.read_csv(source_url, sep=",", encoding="utf-8", low_memory=False)
             logger.info(f"CSV lu localement : {source_url}")
@@ -68,19 +553,22 @@ def run_ingestion(config_path: str, params_path: str):
     # Validation minimale
     try:
         validate_schema(df)
+        # Même type que le mode par blocs (validate_chunks) : fichier ingéré
+        # identique quel que soit chunk_size
+        df["Prix"] = df["Prix"].astype("float64")
         logger.info("Validation du schéma réussie.")
     except Exception as e:
         logger.error(f"Échec de la validation du schéma : {e}")
         raise
 
-    # Persistance via repository CSV
+    # Persistance via le repository du format configuré (CSV ou Parquet)
     try:
-        repo = CsvIngestionRepository(ingested_file)
+        repo = build_ingestion_repository(ingested_file)
         repo.save(df)
         md5 = calculate_md5(ingested_file)
-        logger.info(f"Fichier ingéré (CSV) sauvegardé : {ingested_file} (MD5={md5})")
+        logger.info(f"Fichier ingéré sauvegardé : {ingested_file} (MD5={md5})")
     except Exception as e:
-        logger.error(f"Échec de la persistance CSV : {e}")
+        logger.error(f"Échec de la persistance : {e}")
         raise
 
 
@@ -4,8 +4,12 @@ import logging
 from pathlib import Path
 from box import ConfigBox
 
-from ingestion.utils.common import read_yaml, create_directories
-from ingestion.entity.config_entity import DataIngestionConfig
+from ingestion.utils.common import (
+    read_yaml,
+    create_directories,
+    with_storage_format,
+)
+from ingestion.entity.config_entity import DataIngestionConfig, DownloadConfig
 
 logger = logging.getLogger(__name__)
 
@@ -29,10 +33,37 @@ class ConfigurationManager:
         raw_dir = Path(cfg.raw_data_dir)
         # Veiller à ce que le dossier raw existe
         create_directories([raw_dir])
+        # L'extension du fichier ingéré suit le format de stockage configuré
+        storage_format = self.config.get("storage", {}).get("format", "csv")
+        ingested_file_name = with_storage_format(
+            Path(cfg.ingested_file_name), storage_format
+        ).name
+        # Une ou plusieurs sources (liste YAML)
+        source_url = cfg.source_URL
+        if not isinstance(source_url, str):
+            source_url = tuple(str(source) for source in source_url)
+        on_source_error = cfg.get("on_source_error", "fail")
+        if on_source_error not in ("fail", "skip"):
+            raise ValueError(
+                f"on_source_error inconnu : {on_source_error} (attendu : fail ou skip)"
+            )
+        download = cfg.get("download", {})
         return DataIngestionConfig(
-            source_URL=cfg.source_URL,
+            source_URL=source_url,
             raw_data_dir=raw_dir,
-            ingested_file_name=cfg.ingested_file_name,
+            ingested_file_name=ingested_file_name,
+            chunk_size=int(cfg.get("chunk_size", 0) or 0),
+            mode=cfg.get("mode", "full"),
+            storage_format=storage_format,
+            max_workers=int(cfg.get("max_workers", 4)),
+            on_source_error=on_source_error,
+            download=DownloadConfig(
+                part_size_mb=int(download.get("part_size_mb", 8)),
+                max_parallel=int(download.get("max_parallel", 4)),
+                min_parallel_size_mb=int(download.get("min_parallel_size_mb", 32)),
+                retries=int(download.get("retries", 3)),
+                timeout=float(download.get("timeout", 30.0)),
+            ),
         )
 
     def get_params(self) -> ConfigBox:
@@ -1,18 +1,51 @@
 # src/ingestion/entity/config_entity.py
 
-from dataclasses import dataclass
+from dataclasses import dataclass, field
 from pathlib import Path
+from typing import Tuple, Union
+
+
+@dataclass(frozen=True)
+class DownloadConfig:
+    """
+    Téléchargement des sources HTTP(S) :
+      - part_size_mb : taille des plages d'octets téléchargées en parallèle
+      - max_parallel : plages téléchargées simultanément pour un fichier
+      - min_parallel_size_mb : taille à partir de laquelle un fichier est
+        téléchargé par plages (en dessous : un seul flux)
+      - retries : reprises après une erreur réseau
+      - timeout : délai (s) de connexion et de lecture
+    """
+
+    part_size_mb: int = 8
+    max_parallel: int = 4
+    min_parallel_size_mb: int = 32
+    retries: int = 3
+    timeout: float = 30.0
 
 
 @dataclass(frozen=True)
 class DataIngestionConfig:
     """
     Contient les paramètres d’ingestion lus depuis config.yaml :
-      - source_URL : URL ou chemin local du CSV à ingérer
+      - source_URL : URL, chemin local ou motif glob du CSV à ingérer, ou
+        liste de ceux-ci (sources fusionnées dans l'ordre de la liste)
       - raw_data_dir : dossier où stocker le CSV ingéré
-      - ingested_file_name : nom du fichier ingéré
+      - ingested_file_name : nom du fichier ingéré (extension = format de stockage)
+      - chunk_size : lignes par bloc en lecture streaming (0 = lecture en une fois)
+      - mode : full (fichier réécrit) ou incremental (partitions + watermark)
+      - storage_format : format des fichiers écrits (csv ou parquet)
+      - max_workers : sources préparées en parallèle (multi-sources)
+      - on_source_error : fail (toute source en échec fait échouer) ou skip
+      - download : téléchargement des sources HTTP(S)
     """
 
-    source_URL: str
+    source_URL: Union[str, Tuple[str, ...]]
     raw_data_dir: Path
     ingested_file_name: str
+    chunk_size: int = 0
+    mode: str = "full"
+    storage_format: str = "csv"
+    max_workers: int = 4
+    on_source_error: str = "fail"
+    download: DownloadConfig = field(default_factory=DownloadConfig)
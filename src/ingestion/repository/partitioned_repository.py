@@ -0,0 +1,129 @@
+# src/ingestion/repository/partitioned_repository.py
+"""
+Jeu de données ingéré de façon incrémentale : un répertoire (au chemin du
+fichier ingéré, ex. data/raw/ingested_data.parquet/) contenant des
+partitions datées en ajout seul et un manifeste.
+
+    ingested_data.parquet/
+        _manifest.json
+        date=2025-06-12/part-00000.parquet
+        date=2025-06-13/part-00001.parquet
+
+Le manifeste porte le watermark (Timestamp maximal déjà ingéré), le MD5 de
+chaque source au dernier passage et la liste ordonnée des partitions. Il
+est réécrit atomiquement après l'écriture d'une partition : une partition
+absente du manifeste n'existe pas pour les lecteurs.
+"""
+
+import json
+import logging
+import os
+from datetime import date, datetime
+from pathlib import Path
+from typing import Any, Dict, Iterable, List, Optional
+
+import pandas as pd
+
+from ingestion.repository.repository import build_ingestion_repository
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "_manifest.json"
+
+
+class PartitionedIngestionRepository:
+    """
+    Partitions datées + manifeste d'un jeu de données ingéré par incréments.
+    """
+
+    def __init__(self, dataset_dir: Path, storage_format: str = "csv"):
+        if dataset_dir.is_file():
+            raise ValueError(
+                f"{dataset_dir} est un fichier (ingestion complète) : le "
+                "supprimer avant de passer en mode incrémental"
+            )
+        self.dataset_dir = dataset_dir
+        self.storage_format = storage_format
+        self.manifest_path = dataset_dir / MANIFEST_NAME
+
+    def manifest(self) -> Dict[str, Any]:
+        if not self.manifest_path.exists():
+            return {
+                "format": self.storage_format,
+                "watermark": None,
+                "sources": {},
+                "partitions": [],
+            }
+        with open(self.manifest_path, encoding="utf-8") as f:
+            manifest = json.load(f)
+        if manifest["format"] != self.storage_format:
+            raise ValueError(
+                f"Jeu de données {self.dataset_dir} au format {manifest['format']}, "
+                f"format configuré : {self.storage_format}"
+            )
+        return manifest
+
+    def watermark(self) -> Optional[pd.Timestamp]:
+        value = self.manifest()["watermark"]
+        return pd.Timestamp(value) if value else None
+
+    def source_md5s(self) -> Dict[str, str]:
+        """MD5 de chaque source au dernier passage."""
+        return {s: e["md5"] for s, e in self.manifest()["sources"].items()}
+
+    def write_partition(
+        self, chunks: Iterable[pd.DataFrame], run_date: Optional[date] = None
+    ) -> Dict[str, Any]:
+        """Écrit une nouvelle partition (hors manifeste) ; retourne sa description."""
+        manifest = self.manifest()
+        run_date = run_date or date.today()
+        number = len(manifest["partitions"])
+        relative = (
+            Path(f"date={run_date.isoformat()}")
+            / f"part-{number:05d}.{self.storage_format}"
+        )
+        path = self.dataset_dir / relative
+        path.parent.mkdir(parents=True, exist_ok=True)
+        md5 = build_ingestion_repository(path).save_chunks(chunks)
+        return {"path": relative.as_posix(), "md5": md5}
+
+    def commit(
+        self,
+        sources: Dict[str, str],
+        partition: Optional[Dict[str, Any]] = None,
+    ) -> Dict[str, Any]:
+        """
+        Enregistre le passage sur les sources {source: MD5} (et la partition
+        écrite, le cas échéant) ; le watermark avance au Timestamp maximal de
+        la partition.
+        """
+        manifest = self.manifest()
+        now = datetime.now().isoformat()
+        for source, source_md5 in sources.items():
+            manifest["sources"][source] = {"md5": source_md5, "ingested_at": now}
+        if partition is not None:
+            partition = {**partition, "created_at": now}
+            manifest["partitions"].append(partition)
+            if partition["max_timestamp"] is not None and (
+                manifest["watermark"] is None
+                or pd.Timestamp(partition["max_timestamp"])
+                > pd.Timestamp(manifest["watermark"])
+            ):
+                manifest["watermark"] = partition["max_timestamp"]
+        self._write_manifest(manifest)
+        return manifest
+
+    def partition_paths(self) -> List[Path]:
+        return [self.dataset_dir / p["path"] for p in self.manifest()["partitions"]]
+
+    def _write_manifest(self, manifest: Dict[str, Any]) -> None:
+        self.dataset_dir.mkdir(parents=True, exist_ok=True)
+        tmp_path = self.manifest_path.with_name(f".{MANIFEST_NAME}.tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, self.manifest_path)
+        logger.info(
+            f"Manifeste mis à jour : {self.manifest_path} "
+            f"({len(manifest['partitions'])} partitions, "
+            f"watermark={manifest['watermark']})"
+        )
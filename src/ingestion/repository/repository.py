@@ -2,11 +2,33 @@
 
 from abc import ABC, abstractmethod
 from pathlib import Path
+from typing import Iterable
+import hashlib
+import io
+import os
 import pandas as pd
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Schéma typé des colonnes connues de la source ; les autres colonnes gardent
+# le type inféré à la lecture
+STRING_COLUMNS = ["SKU", "Categorie"]
+TIMESTAMP_COLUMNS = ["Timestamp", "DateLancement"]
+FLOAT_COLUMNS = [
+    "Prix",
+    "PrixInitial",
+    "AgeProduitEnJours",
+    "QuantiteVendue",
+    "UtiliteProduit",
+    "ElasticitePrix",
+    "Remise",
+    "Qualite",
+    "PrixPlancher",
+    "PlancherPourcentage",
+    "ErreurAleatoire",
+]
+
 
 class IngestionRepository(ABC):
     """
@@ -17,6 +39,14 @@ class IngestionRepository(ABC):
     def save(self, df: pd.DataFrame) -> None:
         pass
 
+    @abstractmethod
+    def save_chunks(self, chunks: Iterable[pd.DataFrame]) -> str:
+        """
+        Persiste les blocs au fur et à mesure (un seul bloc en mémoire) et
+        retourne le MD5 du fichier écrit.
+        """
+        pass
+
 
 class CsvIngestionRepository(IngestionRepository):
     """
@@ -29,3 +59,126 @@ class CsvIngestionRepository(IngestionRepository):
     def save(self, df: pd.DataFrame) -> None:
         df.to_csv(self.target_path, index=False, encoding="utf-8")
         logger.info(f"Persistance CSV effectuée → {self.target_path}")
+
+    def save_chunks(self, chunks: Iterable[pd.DataFrame]) -> str:
+        # Écriture dans un fichier temporaire : la cible n'est remplacée
+        # qu'une fois tous les blocs validés et écrits
+        tmp_path = self.target_path.with_name(f".{self.target_path.name}.tmp")
+        hasher = hashlib.md5()
+        n_rows = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                for i, chunk in enumerate(chunks):
+                    data = chunk.to_csv(index=False, header=(i == 0)).encode("utf-8")
+                    hasher.update(data)
+                    f.write(data)
+                    n_rows += len(chunk)
+            os.replace(tmp_path, self.target_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        logger.info(
+            f"Persistance CSV par blocs effectuée → {self.target_path} ({n_rows} lignes)"
+        )
+        return hasher.hexdigest()
+
+
+class _HashingWriter(io.RawIOBase):
+    """Fichier en écriture qui calcule le MD5 des octets au fil de l'eau."""
+
+    def __init__(self, f):
+        self._f = f
+        self._position = 0
+        self.hasher = hashlib.md5()
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.hasher.update(data)
+        self._position += len(data)
+        return self._f.write(data)
+
+    def tell(self) -> int:
+        return self._position
+
+
+class ParquetIngestionRepository(IngestionRepository):
+    """
+    Implémentation Parquet de IngestionRepository : colonnes typées
+    (SKU en chaîne, Timestamp en horodatage, mesures en float64), que les
+    étapes suivantes lisent sans re-parser et colonne par colonne.
+    """
+
+    def __init__(self, target_path: Path):
+        self.target_path = target_path
+
+    @staticmethod
+    def to_table(df: pd.DataFrame):
+        import pyarrow as pa
+
+        df = df.copy()
+        for col in STRING_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype("string")
+        for col in TIMESTAMP_COLUMNS:
+            if col in df.columns:
+                df[col] = pd.to_datetime(df[col], errors="coerce")
+        for col in FLOAT_COLUMNS:
+            if col in df.columns:
+                df[col] = df[col].astype("float64")
+        table = pa.Table.from_pandas(df, preserve_index=False)
+        # Types explicites : pas de dépendance à l'inférence de pandas
+        known = {
+            **dict.fromkeys(STRING_COLUMNS, pa.string()),
+            **dict.fromkeys(TIMESTAMP_COLUMNS, pa.timestamp("ns")),
+            **dict.fromkeys(FLOAT_COLUMNS, pa.float64()),
+        }
+        schema = pa.schema(
+            [pa.field(f.name, known.get(f.name, f.type)) for f in table.schema],
+            metadata=table.schema.metadata,
+        )
+        return table.cast(schema)
+
+    def save(self, df: pd.DataFrame) -> None:
+        import pyarrow.parquet as pq
+
+        tmp_path = self.target_path.with_name(f".{self.target_path.name}.tmp")
+        pq.write_table(self.to_table(df), tmp_path)
+        os.replace(tmp_path, self.target_path)
+        logger.info(f"Persistance Parquet effectuée → {self.target_path}")
+
+    def save_chunks(self, chunks: Iterable[pd.DataFrame]) -> str:
+        import pyarrow.parquet as pq
+
+        # Un row group par bloc ; le schéma est fixé par le premier bloc
+        tmp_path = self.target_path.with_name(f".{self.target_path.name}.tmp")
+        writer = None
+        n_rows = 0
+        try:
+            with open(tmp_path, "wb") as f:
+                sink = _HashingWriter(f)
+                for chunk in chunks:
+                    table = self.to_table(chunk)
+                    if writer is None:
+                        writer = pq.ParquetWriter(sink, table.schema)
+                    writer.write_table(table.cast(writer.schema))
+                    n_rows += len(chunk)
+                if writer is not None:
+                    writer.close()
+            os.replace(tmp_path, self.target_path)
+        finally:
+            if tmp_path.exists():
+                tmp_path.unlink()
+        logger.info(
+            f"Persistance Parquet par blocs effectuée → {self.target_path} "
+            f"({n_rows} lignes)"
+        )
+        return sink.hasher.hexdigest()
+
+
+def build_ingestion_repository(target_path: Path) -> IngestionRepository:
+    """Repository correspondant à l'extension du fichier cible."""
+    if target_path.suffix == ".parquet":
+        return ParquetIngestionRepository(target_path)
+    return CsvIngestionRepository(target_path)
@@ -0,0 +1,412 @@
+# src/ingestion/utils/download.py
+"""
+Téléchargement des sources HTTP(S) de l'ingestion dans un cache local
+(data/raw/.sources), d'où elles sont hashées puis lues.
+
+- Une session requests partagée : pool de connexions, reprises urllib3 sur
+  les erreurs de connexion et les réponses 502/503/504.
+- Requêtes conditionnelles (If-None-Match / If-Modified-Since) à partir des
+  validateurs du dernier téléchargement : une source inchangée (304) n'est
+  pas retéléchargée.
+- Gros fichiers servis avec Accept-Ranges: bytes : plages d'octets
+  téléchargées en parallèle dans un fichier .part. Les plages terminées
+  sont notées dans un fichier d'état : un téléchargement interrompu reprend
+  où il s'était arrêté, If-Range garantissant que toutes les plages
+  viennent de la même version du fichier. Les autres fichiers sont lus en
+  flux continu, repris à l'octet près après une coupure.
+- Validation : taille finale = Content-Length, même ETag sur toutes les
+  réponses. Le MD5 de la copie, calculé seulement à la demande, est
+  conservé avec ses validateurs : une source inchangée n'est ni
+  retéléchargée ni relue.
+- Corps demandés sans compression (Accept-Encoding: identity) : tailles et
+  plages portent sur les octets écrits. Un serveur qui compresse malgré
+  tout est lu en un seul flux décompressé, sans reprise ni contrôle de
+  taille.
+"""
+
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+logger = logging.getLogger(__name__)
+
+# requests demande gzip par défaut et décompresse le flux : Content-Length,
+# plages et positions de reprise porteraient alors sur les octets compressés
+IDENTITY = {"Accept-Encoding": "identity"}
+
+# Erreurs réseau après lesquelles une requête est relancée (et reprise)
+TRANSIENT_ERRORS = (
+    requests.ConnectionError,
+    requests.Timeout,
+    requests.exceptions.ChunkedEncodingError,
+)
+
+
+class DownloadError(IOError):
+    """Téléchargement incomplet malgré les reprises."""
+
+    pass
+
+
+class SourceChangedError(DownloadError):
+    """Source modifiée en cours de téléchargement : le .part est abandonné."""
+
+    pass
+
+
+@dataclass(frozen=True)
+class Download:
+    """Copie locale d'une URL."""
+
+    path: Path
+    md5: Optional[str]  # None si non demandé (fetch(..., with_md5=False))
+    modified: bool  # False : copie en cache confirmée inchangée par le serveur
+
+
+def _file_md5(path: Path) -> str:
+    hasher = hashlib.md5()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            hasher.update(chunk)
+    return hasher.hexdigest()
+
+
+def _encoded(response: requests.Response) -> bool:
+    """Corps compressé par le serveur (Content-Encoding autre qu'identity)."""
+    encoding = response.headers.get("Content-Encoding", "").strip().lower()
+    return encoding not in ("", "identity")
+
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
+    if not path.exists():
+        return None
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except ValueError:
+        return None
+
+
+def _write_json(path: Path, content: Dict[str, Any]) -> None:
+    tmp_path = path.with_name(f"{path.name}.tmp")
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(content, f, indent=2)
+    os.replace(tmp_path, path)
+
+
+def _same_version(known: Optional[Dict[str, Any]], remote: Dict[str, Any]) -> bool:
+    """Même version du fichier distant : même taille et même validateur."""
+    if not known or known.get("size") != remote["size"]:
+        return False
+    if remote["etag"] and known.get("etag"):
+        return known["etag"] == remote["etag"]
+    return bool(remote["last_modified"]) and (
+        known.get("last_modified") == remote["last_modified"]
+    )
+
+
+class HttpDownloader:
+    """
+    Téléchargeur partagé entre les sources d'une ingestion (sûr entre
+    threads : une session, un fichier .part par URL).
+    """
+
+    def __init__(
+        self,
+        cache_dir: Path,
+        part_size: int = 8 << 20,
+        max_parallel: int = 4,
+        min_parallel_size: int = 32 << 20,
+        retries: int = 3,
+        timeout: float = 30.0,
+        pool_size: int = 16,
+        session: Optional[requests.Session] = None,
+    ):
+        self.cache_dir = cache_dir
+        self.part_size = part_size
+        self.max_parallel = max_parallel
+        self.min_parallel_size = min_parallel_size
+        self.retries = retries
+        self.timeout = timeout
+        self.session = session or self._build_session(pool_size)
+
+    def _build_session(self, pool_size: int) -> requests.Session:
+        retry = Retry(
+            total=self.retries,
+            backoff_factor=0.5,
+            status_forcelist=(502, 503, 504),
+            allowed_methods=("HEAD", "GET"),
+        )
+        adapter = HTTPAdapter(
+            pool_connections=pool_size, pool_maxsize=pool_size, max_retries=retry
+        )
+        session = requests.Session()
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def target_path(self, url: str) -> Path:
+        """Copie locale de l'URL dans le cache (nom stable d'un passage à l'autre)."""
+        name = hashlib.md5(url.encode("utf-8")).hexdigest()[:12]
+        return self.cache_dir / f"{name}{Path(urlsplit(url).path).suffix}"
+
+    def fetch(self, url: str, with_md5: bool = False) -> Download:
+        """
+        Copie locale à jour de `url` : celle du cache si le serveur la
+        déclare inchangée, sinon un nouveau téléchargement (repris s'il
+        avait été interrompu). Avec `with_md5`, le MD5 de la copie est
+        retourné (lu dans le cache s'il est connu, sinon calculé).
+        """
+        self.cache_dir.mkdir(parents=True, exist_ok=True)
+        target = self.target_path(url)
+        meta_path = target.with_name(f"{target.name}.meta.json")
+        cached = _read_json(meta_path) if target.exists() else None
+
+        headers = dict(IDENTITY)
+        if cached and cached.get("etag"):
+            headers["If-None-Match"] = cached["etag"]
+        if cached and cached.get("last_modified"):
+            headers["If-Modified-Since"] = cached["last_modified"]
+        head = self.session.head(
+            url, headers=headers, allow_redirects=True, timeout=self.timeout
+        )
+        if head.status_code == 304:
+            logger.info(f"Source inchangée (HTTP 304) : {url}")
+            return self._cached(target, meta_path, cached, with_md5)
+        if head.status_code in (405, 501):
+            # HEAD non supporté : version inconnue, simple GET en flux
+            head = None
+        else:
+            head.raise_for_status()
+
+        remote = self._remote_version(url, head)
+        if _same_version(cached, remote):
+            logger.info(f"Source inchangée (mêmes validateurs) : {url}")
+            return self._cached(target, meta_path, cached, with_md5)
+
+        part = target.with_name(f".{target.name}.part")
+        state_path = part.with_name(f"{part.name}.json")
+        state = _read_json(state_path)
+        if part.exists() and _same_version(state, remote):
+            logger.info(f"Reprise du téléchargement interrompu : {url}")
+        else:
+            state = {**remote, "done": []}
+            part.unlink(missing_ok=True)
+            _write_json(state_path, state)
+
+        start = time.perf_counter()
+        if (
+            remote["ranges"]
+            and self._if_range(remote)
+            and remote["size"] is not None
+            and remote["size"] >= self.min_parallel_size
+        ):
+            self._download_ranges(url, part, state, state_path)
+            expected = remote["size"]
+        else:
+            expected = self._download_stream(url, part, remote)
+
+        size = part.stat().st_size
+        if expected is not None and size != expected:
+            raise DownloadError(
+                f"Téléchargement incomplet de {url} : {size} octets sur {expected}"
+            )
+        md5 = _file_md5(part) if with_md5 else None
+        os.replace(part, target)
+        _write_json(
+            meta_path,
+            {
+                **{
+                    key: remote[key] for key in ("url", "etag", "last_modified", "size")
+                },
+                "md5": md5,
+            },
+        )
+        state_path.unlink(missing_ok=True)
+        logger.info(
+            f"CSV téléchargé depuis URL : {url} → {target} "
+            f"({size} octets en {time.perf_counter() - start:.2f} s)"
+        )
+        return Download(target, md5, modified=True)
+
+    def _cached(
+        self,
+        target: Path,
+        meta_path: Path,
+        cached: Dict[str, Any],
+        with_md5: bool,
+    ) -> Download:
+        md5 = cached.get("md5")
+        if with_md5 and md5 is None:
+            md5 = _file_md5(target)
+            _write_json(meta_path, {**cached, "md5": md5})
+        return Download(target, md5, modified=False)
+
+    def _remote_version(
+        self, url: str, head: Optional[requests.Response]
+    ) -> Dict[str, Any]:
+        if head is None:
+            return {
+                "url": url,
+                "etag": None,
+                "last_modified": None,
+                "size": None,
+                "ranges": False,
+            }
+        length = head.headers.get("Content-Length")
+        if _encoded(head):
+            # Content-Length compressé : taille décompressée inconnue
+            logger.info(f"{url} servi compressé malgré identity : un seul flux")
+            length = None
+        return {
+            "url": url,
+            "etag": head.headers.get("ETag"),
+            "last_modified": head.headers.get("Last-Modified"),
+            "size": int(length) if length is not None else None,
+            "ranges": head.headers.get("Accept-Ranges", "").lower() == "bytes"
+            and not _encoded(head),
+        }
+
+    @staticmethod
+    def _if_range(remote: Dict[str, Any]) -> Optional[str]:
+        """Validateur utilisable dans If-Range (un ETag faible ne l'est pas)."""
+        etag = remote["etag"]
+        if etag and not etag.startswith("W/"):
+            return etag
+        return remote["last_modified"]
+
+    def _check_etag(self, url: str, response: requests.Response, remote: Dict) -> None:
+        etag = response.headers.get("ETag")
+        if remote["etag"] and etag and etag != remote["etag"]:
+            raise SourceChangedError(
+                f"{url} a changé pendant le téléchargement "
+                f"(ETag {remote['etag']} -> {etag})"
+            )
+
+    def _download_stream(
+        self, url: str, part: Path, remote: Dict[str, Any]
+    ) -> Optional[int]:
+        """
+        GET en flux continu ; après une coupure, reprise depuis la taille du
+        .part. Retourne la taille attendue du fichier (None si inconnue).
+        """
+        validator = self._if_range(remote) if remote["ranges"] else None
+        expected = remote["size"]
+        for attempt in range(self.retries + 1):
+            offset = part.stat().st_size if part.exists() and validator else 0
+            if expected is not None and offset >= expected:
+                return expected
+            headers = dict(IDENTITY)
+            if offset:
+                headers.update({"Range": f"bytes={offset}-", "If-Range": validator})
+            try:
+                with self.session.get(
+                    url, headers=headers, stream=True, timeout=self.timeout
+                ) as response:
+                    response.raise_for_status()
+                    self._check_etag(url, response, remote)
+                    if response.status_code != 206:
+                        # Corps complet : plage refusée ou fichier modifié
+                        offset = 0
+                    if _encoded(response):
+                        # Décompressé par requests : ni reprise ni contrôle de taille
+                        validator = expected = None
+                        offset = 0
+                    with open(part, "r+b" if offset else "wb") as f:
+                        f.seek(offset)
+                        f.truncate()
+                        for block in response.iter_content(1 << 20):
+                            f.write(block)
+                if expected is None or part.stat().st_size >= expected:
+                    return expected
+                logger.warning(f"Flux interrompu ({url}), reprise")
+            except TRANSIENT_ERRORS as e:
+                if attempt == self.retries:
+                    raise
+                logger.warning(f"Erreur réseau ({url}) : {e}, reprise")
+            time.sleep(0.5 * 2**attempt)
+        raise DownloadError(
+            f"Téléchargement incomplet de {url} après {self.retries} reprises"
+        )
+
+    def _download_ranges(
+        self, url: str, part: Path, state: Dict[str, Any], state_path: Path
+    ) -> None:
+        """Plages de `part_size` octets en parallèle, écrites à leur position."""
+        size = state["size"]
+        validator = self._if_range(state)
+        if not part.exists():
+            with open(part, "wb") as f:
+                f.truncate(size)
+        done = set(state["done"])
+        todo = [start for start in range(0, size, self.part_size) if start not in done]
+        logger.info(
+            f"{url} : {len(todo)} plage(s) de {self.part_size} octets à télécharger "
+            f"({len(done)} déjà reçue(s))"
+        )
+        lock = threading.Lock()
+
+        def fetch_range(start: int) -> None:
+            end = min(start + self.part_size, size) - 1
+            headers = {
+                **IDENTITY,
+                "Range": f"bytes={start}-{end}",
+                "If-Range": validator,
+            }
+            for attempt in range(self.retries + 1):
+                try:
+                    with self.session.get(
+                        url, headers=headers, stream=True, timeout=self.timeout
+                    ) as response:
+                        response.raise_for_status()
+                        if response.status_code != 206:
+                            raise SourceChangedError(
+                                f"{url} a changé pendant le téléchargement "
+                                f"(HTTP {response.status_code} au lieu de 206)"
+                            )
+                        self._check_etag(url, response, state)
+                        if _encoded(response):
+                            raise DownloadError(
+                                f"Plage {start}-{end} de {url} servie compressée"
+                            )
+                        written = 0
+                        with open(part, "r+b") as f:
+                            f.seek(start)
+                            for block in response.iter_content(1 << 20):
+                                f.write(block)
+                                written += len(block)
+                    if written == end - start + 1:
+                        break
+                    logger.warning(f"Plage {start}-{end} incomplète ({url}), reprise")
+                except TRANSIENT_ERRORS as e:
+                    if attempt == self.retries:
+                        raise
+                    logger.warning(f"Erreur réseau sur la plage {start}-{end} : {e}")
+                time.sleep(0.5 * 2**attempt)
+            else:
+                raise DownloadError(f"Plage {start}-{end} de {url} incomplète")
+            with lock:
+                state["done"].append(start)
+                _write_json(state_path, state)
+
+        workers = max(1, min(self.max_parallel, len(todo)))
+        try:
+            with ThreadPoolExecutor(max_workers=workers) as pool:
+                list(pool.map(fetch_range, todo))
+        except SourceChangedError:
+            # Version différente : le .part ne peut pas être repris
+            part.unlink(missing_ok=True)
+            state_path.unlink(missing_ok=True)
+            raise
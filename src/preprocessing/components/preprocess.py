@@ -4,7 +4,8 @@ import numpy as np
 import pandas as pd
 
 from preprocessing.config.configuration import ConfigurationManager
-from preprocessing.repository.repository import CsvPreprocessingRepository
+from preprocessing.repository.repository import build_preprocessing_repository
+from preprocessing.utils.common import read_table
 
 # Logger
 logging.basicConfig(
@@ -60,14 +61,21 @@ def drop_unused_columns(df: pd.DataFrame) -> pd.DataFrame:
     return df.drop(columns=existing, errors="ignore")
 
 
+# Colonnes calculées par add_time_features (absentes des données brutes)
+TIME_FEATURES = ["Mois_sin", "Mois_cos", "Heure_sin", "Heure_cos"]
+
+
 def run_preprocessing(config_path: str, params_path: str):
     # 1) Chargement des configs et params
     cm = ConfigurationManager(config_path, params_path)
     cfg = cm.get_preprocessing_config()
     params = cm.get_params()
 
-    # 2) Lecture des données brutes
-    df = pd.read_csv(cfg.raw_data_path, encoding="utf-8")
+    # 2) Lecture des données brutes : seules les colonnes conservées (et
+    #    Timestamp, source des features temporelles) sont chargées
+    keep = params.columns_to_keep
+    needed = {c for c in keep if c not in TIME_FEATURES} | {"Timestamp"}
+    df = read_table(cfg.raw_data_path, keep=lambda c: c in needed)
     logger.info(f"Charged raw data: {cfg.raw_data_path} (shape={df.shape})")
 
     # 3) Transformations séquentielles
@@ -76,13 +84,12 @@ def run_preprocessing(config_path: str, params_path: str):
     df = drop_unused_columns(df)
 
     # 4) Sélection des colonnes finales
-    keep = params.columns_to_keep
     df_clean = df[keep].copy()
     logger.info(f"Columns kept: {keep}")
 
     # 5) Persistance via repository
     target = cfg.processed_dir / cfg.clean_file_name
-    repo = CsvPreprocessingRepository(target)
+    repo = build_preprocessing_repository(target)
     repo.save(df_clean)
     logger.info(f"Saved cleaned data to: {target}")
 
@@ -2,7 +2,11 @@ import logging
 from pathlib import Path
 from box import ConfigBox
 
-from preprocessing.utils.common import read_yaml, create_directories
+from preprocessing.utils.common import (
+    read_yaml,
+    create_directories,
+    with_storage_format,
+)
 from preprocessing.entity.config_entity import PreprocessingConfig
 
 logger = logging.getLogger(__name__)
@@ -28,14 +32,18 @@ class ConfigurationManager:
 
     def get_preprocessing_config(self) -> PreprocessingConfig:
         cfg = self.config.data_preprocessing
-        raw_data_rel = Path(cfg.raw_data_path)
+        # Entrée et sortie au format de stockage configuré (csv ou parquet)
+        storage_format = self.config.get("storage", {}).get("format", "csv")
+        raw_data_rel = with_storage_format(Path(cfg.raw_data_path), storage_format)
         raw_data_path = self._project_root / raw_data_rel
         processed_dir = self._project_root / Path(cfg.processed_dir)
         create_directories([processed_dir])
         return PreprocessingConfig(
             raw_data_path=raw_data_path,
             processed_dir=processed_dir,
-            clean_file_name=cfg.clean_file_name,
+            clean_file_name=with_storage_format(
+                Path(cfg.clean_file_name), storage_format
+            ).name,
         )
 
     def get_params(self) -> ConfigBox:
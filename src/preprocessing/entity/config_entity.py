@@ -8,9 +8,9 @@ class PreprocessingConfig:
     Configuration pour le module de prétraitement.
 
     Attributes:
-        raw_data_path (Path): Chemin vers le fichier ingéré (data/raw/ingested_data.csv).
+        raw_data_path (Path): Chemin vers le fichier ingéré (data/raw/ingested_data.csv ou .parquet).
         processed_dir (Path): Répertoire où sauvegarder les données prétraitées (data/processed).
-        clean_file_name (str): Nom du fichier prétraité (clean_data.csv).
+        clean_file_name (str): Nom du fichier prétraité (clean_data.csv ou .parquet).
     """
 
     raw_data_path: Path
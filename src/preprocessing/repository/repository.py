@@ -1,6 +1,7 @@
 import logging
 from abc import ABC, abstractmethod
 from pathlib import Path
+import os
 import pandas as pd
 
 logger = logging.getLogger(__name__)
@@ -35,3 +36,43 @@ class CsvPreprocessingRepository(PreprocessingRepository):
         self.target_path.parent.mkdir(parents=True, exist_ok=True)
         df.to_csv(self.target_path, index=False, encoding="utf-8")
         logger.info(f"Persistance CSV nettoyé → {self.target_path}")
+
+
+class ParquetPreprocessingRepository(PreprocessingRepository):
+    """
+    Implémentation Parquet du repository de prétraitement, avec un schéma
+    explicite : SKU en chaîne, Timestamp en horodatage, le reste en float64.
+    """
+
+    def __init__(self, target_path: Path):
+        self.target_path = target_path
+
+    @staticmethod
+    def schema(columns: list):
+        import pyarrow as pa
+
+        types = {"SKU": pa.string(), "Timestamp": pa.timestamp("ns")}
+        return pa.schema([pa.field(c, types.get(c, pa.float64())) for c in columns])
+
+    def save(self, df: pd.DataFrame) -> None:
+        """
+        Sauvegarde le DataFrame en Parquet, crée le dossier si nécessaire.
+        """
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+
+        self.target_path.parent.mkdir(parents=True, exist_ok=True)
+        table = pa.Table.from_pandas(
+            df, schema=self.schema(list(df.columns)), preserve_index=False
+        )
+        tmp_path = self.target_path.with_name(f".{self.target_path.name}.tmp")
+        pq.write_table(table, tmp_path)
+        os.replace(tmp_path, self.target_path)
+        logger.info(f"Persistance Parquet nettoyé → {self.target_path}")
+
+
+def build_preprocessing_repository(target_path: Path) -> PreprocessingRepository:
+    """Repository correspondant à l'extension du fichier cible."""
+    if target_path.suffix == ".parquet":
+        return ParquetPreprocessingRepository(target_path)
+    return CsvPreprocessingRepository(target_path)
@@ -1,7 +1,9 @@
 import logging
 from pathlib import Path
+from typing import Callable, Optional
 from box import ConfigBox
 import yaml
+import json
 import pandas as pd
 
 # Configuration minimale du logger pour ce module
@@ -58,3 +60,44 @@ def save_dataframe(df: pd.DataFrame, path: Path) -> None:
     create_directories([path.parent])
     df.to_csv(path, index=False, encoding="utf-8")
     logger.info(f"DataFrame sauvegardé dans : {path}")
+
+
+# Formats de stockage des données entre étapes (config.yaml : storage.format)
+STORAGE_FORMATS = ("csv", "parquet")
+
+
+def with_storage_format(path: Path, storage_format: str) -> Path:
+    """
+    Remplace l'extension du fichier par celle du format de stockage configuré
+    (ex: data/raw/ingested_data.csv -> data/raw/ingested_data.parquet).
+    """
+    if storage_format not in STORAGE_FORMATS:
+        raise ValueError(
+            f"Format de stockage inconnu : {storage_format} (attendu : {STORAGE_FORMATS})"
+        )
+    return path.with_suffix(f".{storage_format}")
+
+
+def read_table(
+    path: Path, keep: Optional[Callable[[str], bool]] = None
+) -> pd.DataFrame:
+    """
+    Lit un fichier CSV ou Parquet (selon son extension) en ne chargeant que
+    les colonnes retenues par `keep` (toutes si None). Un répertoire est un
+    jeu partitionné (ingestion incrémentale) : ses partitions, listées par
+    le manifeste, sont lues dans l'ordre et concaténées.
+    """
+    if path.is_dir():
+        with open(path / "_manifest.json", encoding="utf-8") as f:
+            partitions = json.load(f)["partitions"]
+        if not partitions:
+            raise ValueError(f"Jeu de données partitionné vide : {path}")
+        frames = [read_table(path / p["path"], keep) for p in partitions]
+        return pd.concat(frames, ignore_index=True)
+    if path.suffix == ".parquet":
+        import pyarrow.parquet as pq
+
+        names = pq.read_schema(path).names
+        columns = [c for c in names if keep(c)] if keep is not None else None
+        return pd.read_parquet(path, columns=columns)
+    return pd.read_csv(path, usecols=keep, encoding="utf-8")
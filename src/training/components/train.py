@@ -15,6 +15,7 @@ from dotenv import load_dotenv  # <— Ajout pour le .env
 
 from training.config.configuration import ConfigurationManager
 from training.repository.repository import CsvModelRepository
+from training.utils.common import read_table
 
 # Charger les variables du fichier .env
 load_dotenv()
@@ -44,7 +45,8 @@ def run_training(config_path: str, params_path: str):
     if not data_path.exists():
         logger.error(f"Processed data not found: {data_path}")
         return
-    df = pd.read_csv(data_path)
+    # SKU et Timestamp ne sont pas des features : non chargés
+    df = read_table(data_path, keep=lambda c: c not in ("SKU", "Timestamp"))
     logger.info(f"Loaded processed data: {data_path} (shape={df.shape})")
 
     # Verify target column
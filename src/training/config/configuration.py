@@ -2,7 +2,11 @@ import logging
 from pathlib import Path
 from box import ConfigBox
 
-from training.utils.common import read_yaml, create_directories
+from training.utils.common import (
+    read_yaml,
+    create_directories,
+    with_storage_format,
+)
 from training.entity.config_entity import TrainingConfig
 
 logger = logging.getLogger(__name__)
@@ -40,7 +44,10 @@ class ConfigurationManager:
         p = self.params.training
 
         # Chemin absolu vers les données traitées
-        processed_data_path = self._project_root / Path(cfg.processed_data_path)
+        storage_format = self.config.get("storage", {}).get("format", "csv")
+        processed_data_path = self._project_root / with_storage_format(
+            Path(cfg.processed_data_path), storage_format
+        )
         # Répertoire de sortie pour le modèle
         model_dir = self._project_root / Path(cfg.model_dir)
 
@@ -8,7 +8,7 @@ class TrainingConfig:
     Configuration pour le module d'entraînement.
 
     Attributes:
-        processed_data_path (Path): Chemin vers le CSV prétraité.
+        processed_data_path (Path): Chemin vers les données prétraitées (CSV ou Parquet).
         model_dir (Path): Répertoire où sauvegarder le modèle.
         model_file_name (str): Nom du fichier modèle.
         epochs (int): Nombre d'époques d'entraînement.
@@ -0,0 +1,84 @@
+# tests/test_admission.py
+"""Contrôle d'admission : aucune place perdue, quelle que soit l'issue de l'attente."""
+
+import asyncio
+from time import perf_counter
+
+import pytest
+
+from inference.service.admission import AdmissionController, RequestShed
+
+
+def _controller(**kwargs) -> AdmissionController:
+    params = dict(max_concurrency=1, max_queue=4, default_timeout_ms=5000.0)
+    params.update(kwargs)
+    return AdmissionController(**params)
+
+
+def _deadline(seconds: float = 5.0) -> float:
+    return perf_counter() + seconds
+
+
+def test_cancel_while_queued_releases_nothing_and_leaves_queue_clean():
+    async def scenario():
+        controller = _controller()
+        await controller.acquire("predict", _deadline())
+        queued = asyncio.ensure_future(controller.acquire("predict", _deadline()))
+        await asyncio.sleep(0)
+        assert controller.queue_depth == 1
+
+        queued.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await queued
+        assert controller.queue_depth == 0
+
+        controller.release()
+        assert controller.in_flight == 0
+        # La place libérée est de nouveau disponible immédiatement
+        await controller.acquire("predict", _deadline(0.05))
+        assert controller.in_flight == 1
+
+    asyncio.run(scenario())
+
+
+def test_cancel_after_slot_granted_hands_the_slot_back():
+    async def scenario():
+        controller = _controller()
+        await controller.acquire("predict", _deadline())
+        queued = asyncio.ensure_future(controller.acquire("predict", _deadline()))
+        await asyncio.sleep(0)
+
+        # Place transmise au waiter, puis annulation avant qu'il ne reprenne
+        controller.release()
+        queued.cancel()
+        try:
+            await queued
+        except asyncio.CancelledError:
+            pass
+        else:
+            # wait_for a pu rendre le résultat malgré l'annulation : la place
+            # appartient alors à l'appelant, qui la libère
+            controller.release()
+        assert controller.in_flight == 0
+        assert controller.queue_depth == 0
+
+    asyncio.run(scenario())
+
+
+def test_queue_full_and_deadline_are_shed():
+    async def scenario():
+        controller = _controller(max_queue=1)
+        await controller.acquire("predict", _deadline())
+        waiting = asyncio.ensure_future(controller.acquire("predict", _deadline(0.05)))
+        await asyncio.sleep(0)
+        with pytest.raises(RequestShed) as full:
+            await controller.acquire("predict", _deadline())
+        assert full.value.reason == "queue_full"
+        with pytest.raises(RequestShed) as late:
+            await waiting
+        assert late.value.reason == "deadline"
+        assert controller.queue_depth == 0
+        controller.release()
+        assert controller.in_flight == 0
+
+    asyncio.run(scenario())
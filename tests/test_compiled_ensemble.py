@@ -0,0 +1,138 @@
+# tests/test_compiled_ensemble.py
+"""Le moteur compilé doit reproduire XGBoost bit à bit, valeurs manquantes comprises."""
+
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+import pytest
+import yaml
+
+xgb = pytest.importorskip("xgboost")
+
+from inference.service.compiled_ensemble import (  # noqa: E402
+    CompiledEnsemble,
+    verify_equivalence,
+)
+from preprocessing.components.preprocess import (  # noqa: E402
+    add_time_features,
+    convert_types,
+    drop_unused_columns,
+)
+
+PARAMS_PATH = Path(__file__).resolve().parents[1] / "config" / "params.yaml"
+
+
+def _training_data(rng, n_rows=2000, n_features=6):
+    X = rng.normal(size=(n_rows, n_features)).astype(np.float32)
+    y = 3 * X[:, 0] - 2 * X[:, 1] ** 2 + X[:, 2] * X[:, 3] + rng.normal(size=n_rows)
+    # Manquants fréquents, corrélés à la cible : XGBoost apprend des
+    # directions par défaut à gauche comme à droite
+    X[rng.random(X.shape) < 0.2] = np.nan
+    y[np.isnan(X[:, 0])] += 5
+    return X, y.astype(np.float32)
+
+
+@pytest.fixture(scope="module")
+def booster():
+    rng = np.random.default_rng(0)
+    X, y = _training_data(rng)
+    model = xgb.XGBRegressor(n_estimators=60, max_depth=5, learning_rate=0.3)
+    model.fit(X, y)
+    return model.get_booster()
+
+
+def test_default_directions_cover_both_sides(booster):
+    compiled = CompiledEnsemble.from_booster(booster)
+    is_split = compiled.left != np.arange(len(compiled.left))
+    assert compiled.default_left[is_split].any()
+    assert not compiled.default_left[is_split].all()
+
+
+@pytest.mark.parametrize("missing_rate", [0.0, 0.3, 1.0])
+def test_predict_array_matches_inplace_predict(booster, missing_rate):
+    rng = np.random.default_rng(1)
+    X = rng.normal(scale=2.0, size=(3000, 6)).astype(np.float32)
+    X[rng.random(X.shape) < missing_rate] = np.nan
+
+    compiled = CompiledEnsemble.from_booster(booster)
+    expected = booster.inplace_predict(X)
+
+    np.testing.assert_array_equal(compiled.predict_array(X), expected)
+
+
+def test_single_row_matches_inplace_predict(booster):
+    rng = np.random.default_rng(2)
+    X = rng.normal(size=(50, 6)).astype(np.float32)
+    X[::3, 1] = np.nan
+    compiled = CompiledEnsemble.from_booster(booster)
+
+    for row in X:
+        np.testing.assert_array_equal(
+            compiled.predict_array(row), booster.inplace_predict(row[None, :])
+        )
+
+
+def test_save_load_roundtrip(booster, tmp_path):
+    rng = np.random.default_rng(3)
+    X = rng.normal(size=(200, 6)).astype(np.float32)
+    X[rng.random(X.shape) < 0.1] = np.nan
+    compiled = CompiledEnsemble.from_booster(booster)
+    path = tmp_path / "model.npz"
+    compiled.save(path)
+
+    np.testing.assert_array_equal(
+        CompiledEnsemble.load(path).predict_array(X), booster.inplace_predict(X)
+    )
+
+
+def _processed_frame(rng, n_rows=3000):
+    """
+    Données au format de data/processed : ventes brutes passées par les
+    transformations du prétraitement, colonnes de params.yaml dans l'ordre.
+    """
+    raw = pd.DataFrame(
+        {
+            "SKU": rng.integers(0, 200, n_rows).astype(str),
+            "Timestamp": pd.Timestamp("2024-01-01")
+            + pd.to_timedelta(rng.integers(0, 365 * 24, n_rows), unit="h"),
+            "PrixInitial": rng.uniform(5, 500, n_rows),
+            "AgeProduitEnJours": rng.integers(0, 1000, n_rows),
+            "QuantiteVendue": rng.poisson(20, n_rows),
+            "UtiliteProduit": rng.uniform(0, 1, n_rows),
+            "ElasticitePrix": rng.normal(-1.5, 0.5, n_rows),
+            "Remise": rng.uniform(0, 0.5, n_rows),
+            "Qualite": rng.uniform(0, 1, n_rows),
+            "Categorie": "A",
+        }
+    )
+    raw["Prix"] = raw["PrixInitial"] * (1 - raw["Remise"]) * (
+        0.8 + 0.4 * raw["Qualite"]
+    ) + rng.normal(0, 5, n_rows)
+    with open(PARAMS_PATH, encoding="utf-8") as f:
+        keep = yaml.safe_load(f)["preprocessing"]["columns_to_keep"]
+    frame = drop_unused_columns(add_time_features(convert_types(raw)))[keep]
+    # Capteurs manquants, comme dans les ventes réelles
+    for column in ("QuantiteVendue", "ElasticitePrix", "Remise", "Qualite"):
+        frame.loc[rng.random(n_rows) < 0.15, column] = np.nan
+    return frame
+
+
+def test_compiled_model_matches_xgbregressor_on_processed_features():
+    rng = np.random.default_rng(4)
+    frame = _processed_frame(rng)
+    # Mêmes colonnes que l'entraînement (training/components/train.py)
+    X = frame.drop(columns=["Prix", "SKU", "Timestamp"])
+    model = xgb.XGBRegressor(
+        objective="reg:squarederror", n_estimators=80, max_depth=6, random_state=0
+    )
+    model.fit(X, frame["Prix"].values)
+
+    compiled = CompiledEnsemble.from_model(model)
+    assert compiled.feature_names == list(X.columns)
+    # Données nouvelles, colonnes dans le désordre : sélection par nom
+    fresh = _processed_frame(np.random.default_rng(5)).iloc[:, ::-1]
+    np.testing.assert_allclose(
+        compiled.predict(fresh), model.predict(fresh[X.columns]), rtol=1e-6
+    )
+    assert verify_equivalence(model, compiled, fresh) == 0
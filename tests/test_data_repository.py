@@ -0,0 +1,60 @@
+# tests/test_data_repository.py
+import hashlib
+import json
+
+import yaml
+
+from inference.repository.data_repository import DvcDataRepository
+
+TARGET = "data/raw/ingested_data.csv"
+
+
+def _md5(content: bytes) -> str:
+    return hashlib.md5(content).hexdigest()
+
+
+def _partitioned_dataset(repo_root):
+    """Jeu partitionné minimal, tel qu'écrit par l'ingestion incrémentale."""
+    dataset = repo_root / TARGET
+    (dataset / "date=2024-01-01").mkdir(parents=True)
+    part = b"SKU,Prix,Timestamp\nA,1.0,2024-01-01\n"
+    (dataset / "date=2024-01-01" / "part-00000.csv").write_bytes(part)
+    manifest = json.dumps({"partitions": [{"path": "date=2024-01-01/part-00000.csv"}]})
+    (dataset / "_manifest.json").write_text(manifest, encoding="utf-8")
+    return dataset
+
+
+def _write_lock(repo_root, md5):
+    stages = {"data_ingestion": {"wdir": "src"}}
+    (repo_root / "dvc.yaml").write_text(yaml.safe_dump({"stages": stages}))
+    out = {"path": f"../{TARGET}", "hash": "md5", "md5": md5, "nfiles": 2}
+    lock = {"schema": "2.0", "stages": {"data_ingestion": {"outs": [out]}}}
+    (repo_root / "dvc.lock").write_text(yaml.safe_dump(lock))
+
+
+def test_partitioned_target_is_compared_with_the_dvc_dir_hash(tmp_path):
+    dataset = _partitioned_dataset(tmp_path)
+    # Objet .dir de DVC 3 : fichiers triés par chemin relatif
+    listing = json.dumps(
+        [
+            {
+                "md5": _md5((dataset / relpath).read_bytes()),
+                "relpath": relpath,
+            }
+            for relpath in ("_manifest.json", "date=2024-01-01/part-00000.csv")
+        ],
+        sort_keys=True,
+    )
+    _write_lock(tmp_path, f"{_md5(listing.encode('utf-8'))}.dir")
+    repo = DvcDataRepository(TARGET, dataset, repo_root=tmp_path)
+    pulls = []
+    repo.pull = lambda: pulls.append(repo.expected_hash)
+
+    assert not repo.sync()
+    assert not repo.sync()
+    assert pulls == []
+
+    # Nouvelle version attendue par dvc.lock : pull
+    _write_lock(tmp_path, f"{'0' * 32}.dir")
+    assert repo.sync()
+    assert pulls == [f"{'0' * 32}.dir"]
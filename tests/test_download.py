@@ -0,0 +1,159 @@
+# tests/test_download.py
+import gzip
+import hashlib
+import http.server
+import io
+import threading
+
+import pandas as pd
+import pytest
+
+from ingestion.utils.download import HttpDownloader
+
+ETAG = '"v1"'
+
+
+class _SourceHandler(http.server.BaseHTTPRequestHandler):
+    """
+    Sert `server.payload` sur toute URL, avec ETag, 304, plages et gzip :
+    "negotiate" compresse si le client l'accepte (comme un CDN), "always"
+    compresse même quand identity est demandé.
+    """
+
+    protocol_version = "HTTP/1.1"
+
+    def log_message(self, *args):
+        pass
+
+    def do_HEAD(self):
+        self._respond(body=False)
+
+    def do_GET(self):
+        self._respond(body=True)
+
+    def _respond(self, body):
+        server = self.server
+        server.requests.append((self.command, dict(self.headers)))
+        if self.headers.get("If-None-Match") == ETAG:
+            self.send_response(304)
+            self.send_header("ETag", ETAG)
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+
+        payload, status, headers = server.payload, 200, {}
+        accepted = self.headers.get("Accept-Encoding", "")
+        if server.gzip == "always" or (
+            server.gzip == "negotiate" and "gzip" in accepted
+        ):
+            payload = gzip.compress(payload, mtime=0)
+            headers["Content-Encoding"] = "gzip"
+        else:
+            headers["Accept-Ranges"] = "bytes"
+            requested = self.headers.get("Range")
+            if requested and self.headers.get("If-Range", ETAG) == ETAG:
+                start, _, end = requested.split("=")[1].partition("-")
+                end = int(end) if end else len(payload) - 1
+                headers["Content-Range"] = f"bytes {start}-{end}/{len(payload)}"
+                payload, status = payload[int(start) : end + 1], 206
+
+        self.send_response(status)
+        self.send_header("ETag", ETAG)
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.end_headers()
+        if not body:
+            return
+        if server.drop_after:
+            # Coupure : la moitié du corps annoncé, puis fermeture
+            self.wfile.write(payload[: server.drop_after])
+            server.drop_after = 0
+            self.close_connection = True
+            return
+        self.wfile.write(payload)
+
+
+@pytest.fixture
+def source_server():
+    server = http.server.ThreadingHTTPServer(("127.0.0.1", 0), _SourceHandler)
+    buffer = io.StringIO()
+    pd.DataFrame(
+        {
+            "SKU": [f"SKU-{i % 50}" for i in range(2000)],
+            "Prix": [float(i % 97) for i in range(2000)],
+            "Timestamp": ["2024-01-01 00:00:00"] * 2000,
+        }
+    ).to_csv(buffer, index=False)
+    server.payload = buffer.getvalue().encode("utf-8")
+    server.gzip, server.drop_after, server.requests = None, 0, []
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server, f"http://127.0.0.1:{server.server_port}/source.csv"
+    server.shutdown()
+    server.server_close()
+
+
+def _gets(server):
+    return [headers for method, headers in server.requests if method == "GET"]
+
+
+def test_compressing_server_is_asked_for_identity(tmp_path, source_server):
+    server, url = source_server
+    server.gzip = "negotiate"
+
+    download = HttpDownloader(tmp_path / "cache").fetch(url)
+
+    assert download.path.read_bytes() == server.payload
+    assert len(pd.read_csv(download.path)) == 2000
+    assert all(h["Accept-Encoding"] == "identity" for _, h in server.requests)
+
+
+def test_forced_gzip_is_decoded_without_size_check(tmp_path, source_server):
+    server, url = source_server
+    server.gzip = "always"
+    downloader = HttpDownloader(tmp_path / "cache", min_parallel_size=1)
+
+    download = downloader.fetch(url, with_md5=True)
+
+    assert download.path.read_bytes() == server.payload
+    assert all("Range" not in h for h in _gets(server))
+    assert not downloader.fetch(url).modified
+
+
+def test_parallel_ranges_rebuild_the_source(tmp_path, source_server):
+    server, url = source_server
+    downloader = HttpDownloader(tmp_path / "cache", part_size=4096, min_parallel_size=1)
+
+    download = downloader.fetch(url)
+
+    assert download.path.read_bytes() == server.payload
+    assert len(_gets(server)) > 1
+    assert all(h["Accept-Encoding"] == "identity" for h in _gets(server))
+
+
+def test_dropped_stream_is_resumed(tmp_path, source_server):
+    server, url = source_server
+    # Plus grand qu'un bloc de iter_content : une partie arrive avant la coupure
+    server.payload = server.payload * 64
+    server.drop_after = len(server.payload) // 2
+
+    download = HttpDownloader(tmp_path / "cache").fetch(url)
+
+    assert download.path.read_bytes() == server.payload
+    resumed = _gets(server)[-1]
+    assert int(resumed["Range"][len("bytes=") : -1]) > 0
+    assert resumed["Accept-Encoding"] == "identity"
+
+
+def test_md5_is_computed_only_on_demand(tmp_path, source_server):
+    server, url = source_server
+    downloader = HttpDownloader(tmp_path / "cache")
+
+    assert downloader.fetch(url).md5 is None
+    server.requests.clear()
+    cached = downloader.fetch(url, with_md5=True)
+
+    # Copie en cache confirmée par un 304 : hashée sans nouveau GET
+    assert not cached.modified and not _gets(server)
+    assert cached.md5 == hashlib.md5(server.payload).hexdigest()
@@ -0,0 +1,52 @@
+# tests/test_feature_artifact.py
+import numpy as np
+import pandas as pd
+import pytest
+
+from inference.entity.feature_index import NUMERIC_FEATURES, FeatureIndex
+from inference.repository.feature_artifact import (
+    FeatureArtifactDataRepository,
+    save_feature_artifact,
+)
+
+
+@pytest.fixture
+def observations():
+    rng = np.random.default_rng(0)
+    frame = pd.DataFrame(
+        rng.normal(size=(40, len(NUMERIC_FEATURES))), columns=NUMERIC_FEATURES
+    )
+    frame["SKU"] = [f"SKU-{i % 4}" for i in range(40)]
+    frame["Timestamp"] = pd.date_range("2024-01-01", periods=40, freq="h")
+    return frame
+
+
+def test_every_new_index_is_notified(tmp_path, observations):
+    path = tmp_path / "features.npz"
+    save_feature_artifact(FeatureIndex.from_frame(observations), path, "abc")
+    repo = FeatureArtifactDataRepository(path)
+    notified = []
+    repo.add_listener(notified.append)
+    assert repo.load_index().n_last == 3
+    assert repo.content_hash() == "abc"
+
+    # Même CSV source, autre n_last : nouvel index, nouveau hash servi
+    rebuilt = FeatureIndex.from_frame(observations, n_last=5)
+    save_feature_artifact(rebuilt, path, "abc")
+    assert repo.refresh()
+    assert [index.n_last for index in notified] == [3, 5]
+    assert repo.load_index() is notified[-1]
+    np.testing.assert_array_equal(repo.load_index().features, rebuilt.features)
+    assert repo.content_hash() == "abc:n_last=5"
+
+    # Artefact inchangé : rien à notifier
+    assert not repo.refresh()
+    assert len(notified) == 2
+
+
+def test_load_refuses_to_pass_aggregates_for_observations(tmp_path, observations):
+    path = tmp_path / "features.npz"
+    save_feature_artifact(FeatureIndex.from_frame(observations), path, "abc")
+
+    with pytest.raises(NotImplementedError):
+        FeatureArtifactDataRepository(path).load()
@@ -0,0 +1,190 @@
+# tests/test_ingestion.py
+"""Ingestion : mode de lecture, sources multiples (fichiers locaux et HTTP)."""
+
+import json
+
+import pandas as pd
+import pytest
+import yaml
+
+from ingestion.components.data_ingestion import (
+    SOURCE_REPORT_NAME,
+    calculate_md5,
+    expand_sources,
+    run_incremental_ingestion,
+    run_ingestion,
+    run_multi_source_ingestion,
+)
+
+
+def _write_config(tmp_path, source, **ingestion):
+    config = {
+        "storage": {"format": ingestion.pop("storage_format", "csv")},
+        "data_ingestion": {
+            "source_URL": source,
+            "raw_data_dir": str(tmp_path / "raw"),
+            "ingested_file_name": "ingested_data.csv",
+            **ingestion,
+        },
+    }
+    config_path = tmp_path / f"config-{len(list(tmp_path.glob('config-*')))}.yaml"
+    config_path.write_text(yaml.safe_dump(config), encoding="utf-8")
+    params_path = tmp_path / "params.yaml"
+    params_path.write_text(yaml.safe_dump({"ingestion": {}}), encoding="utf-8")
+    return str(config_path), str(params_path)
+
+
+@pytest.fixture
+def integer_price_source(tmp_path):
+    source = tmp_path / "source.csv"
+    pd.DataFrame(
+        {
+            "SKU": [f"SKU{i % 7}" for i in range(250)],
+            "Prix": [i % 13 for i in range(250)],
+            "Timestamp": pd.date_range("2024-01-01", periods=250, freq="h").astype(str),
+        }
+    ).to_csv(source, index=False)
+    return source
+
+
+def test_full_and_streaming_modes_write_identical_files(tmp_path, integer_price_source):
+    ingested = tmp_path / "raw" / "ingested_data.csv"
+    md5s = []
+    for chunk_size in (0, 40):
+        run_ingestion(
+            *_write_config(tmp_path, str(integer_price_source), chunk_size=chunk_size)
+        )
+        md5s.append(calculate_md5(ingested))
+
+    assert md5s[0] == md5s[1]
+    assert pd.read_csv(ingested)["Prix"].dtype == "float64"
+
+
+# --- Ingestion multi-sources -------------------------------------------------
+
+
+def _sales(store: int, day: str, n: int = 60) -> pd.DataFrame:
+    return pd.DataFrame(
+        {
+            "SKU": [f"S{store}-{i % 9}" for i in range(n)],
+            "Prix": [round(1 + (i * 7 % 50) / 10, 2) for i in range(n)],
+            "Timestamp": pd.date_range(day, periods=n, freq="min").astype(str),
+        }
+    )
+
+
+@pytest.fixture
+def store_files(tmp_path):
+    """Un fichier par magasin et par jour, créés dans le désordre."""
+    frames = {}
+    for store in (2, 1):
+        for day in ("2024-01-02", "2024-01-01"):
+            path = tmp_path / "sales" / f"store{store}" / f"{day}.csv"
+            path.parent.mkdir(parents=True, exist_ok=True)
+            frames[path.as_posix()] = _sales(store, day)
+            frames[path.as_posix()].to_csv(path, index=False)
+    return frames
+
+
+def test_expand_sources_sorts_matches_and_skips_directories(tmp_path, store_files):
+    # Jeu incrémental au nom en .csv : un dossier, pas une source
+    (tmp_path / "sales" / "store1" / "ingested_data.csv").mkdir()
+
+    sources = expand_sources((tmp_path / "sales" / "*" / "*.csv").as_posix())
+
+    assert sources == sorted(store_files)
+    with pytest.raises(FileNotFoundError):
+        expand_sources((tmp_path / "nothing" / "*.csv").as_posix())
+
+
+@pytest.mark.parametrize("chunk_size", [0, 25])
+def test_multi_source_merge_is_ordered_and_independent_of_workers(
+    tmp_path, store_files, chunk_size
+):
+    sources = sorted(store_files)
+    expected = pd.concat([store_files[s] for s in sources], ignore_index=True)
+    md5s = []
+    for workers in (1, 8):
+        ingested = tmp_path / f"out-{workers}" / "ingested_data.csv"
+        md5s.append(run_multi_source_ingestion(sources, ingested, chunk_size, workers))
+        merged = pd.read_csv(ingested)
+        pd.testing.assert_frame_equal(
+            merged, expected.astype({"Prix": "float64"}), check_dtype=False
+        )
+    assert md5s[0] == md5s[1]
+
+
+def test_http_and_local_sources_are_merged_in_list_order(
+    tmp_path, store_files, http_root
+):
+    base_url, www = http_root
+    remote = _sales(3, "2024-01-03")
+    remote.to_csv(www / "store3.csv", index=False)
+    local = sorted(store_files)[0]
+    ingested = tmp_path / "out" / "ingested_data.csv"
+
+    run_multi_source_ingestion([f"{base_url}/store3.csv", local], ingested)
+
+    merged = pd.read_csv(ingested)
+    assert merged["SKU"].tolist() == (
+        remote["SKU"].tolist() + store_files[local]["SKU"].tolist()
+    )
+
+
+def test_failed_sources_are_isolated_and_reported(tmp_path, store_files, http_root):
+    base_url, _ = http_root
+    bad = tmp_path / "bad.csv"
+    bad.write_text("SKU,Prix,Timestamp\nA,abc,2024-01-01\n", encoding="utf-8")
+    good = sorted(store_files)
+    sources = good + [bad.as_posix(), (tmp_path / "missing.csv").as_posix()]
+    sources.append(f"{base_url}/missing.csv")
+    ingested = tmp_path / "out" / "ingested_data.csv"
+    report_path = ingested.parent / SOURCE_REPORT_NAME
+
+    with pytest.raises(ValueError, match="3 source"):
+        run_multi_source_ingestion(sources, ingested, on_source_error="fail")
+    assert not ingested.exists()
+
+    run_multi_source_ingestion(sources, ingested, max_workers=4, on_source_error="skip")
+    report = json.loads(report_path.read_text(encoding="utf-8"))
+    assert [r["status"] for r in report] == ["ok"] * len(good) + ["failed"] * 3
+    assert "numérique" in report[len(good)]["error"]
+    assert len(pd.read_csv(ingested)) == sum(len(store_files[s]) for s in good)
+
+
+def test_incremental_multi_source_skips_unchanged_sources(tmp_path, store_files):
+    pattern = (tmp_path / "sales" / "*" / "*.csv").as_posix()
+    dataset = tmp_path / "raw" / "ingested_data.csv"
+
+    first = run_incremental_ingestion(pattern, dataset, "csv", max_workers=4)
+    assert first["rows"] == sum(len(f) for f in store_files.values())
+    assert run_incremental_ingestion(pattern, dataset, "csv", max_workers=4) is None
+
+    new_day = _sales(1, "2024-01-03", n=30)
+    new_day.to_csv(tmp_path / "sales" / "store1" / "2024-01-03.csv", index=False)
+    second = run_incremental_ingestion(pattern, dataset, "csv", 10, max_workers=4)
+    assert second["rows"] == 30
+    assert list(second["sources"]) == [
+        (tmp_path / "sales" / "store1" / "2024-01-03.csv").as_posix()
+    ]
+
+
+def test_sources_are_hashed_only_in_incremental_mode(
+    tmp_path, store_files, monkeypatch
+):
+    from ingestion.components import data_ingestion
+
+    hashed = []
+    monkeypatch.setattr(
+        data_ingestion,
+        "calculate_md5",
+        lambda path: hashed.append(path) or calculate_md5(path),
+    )
+    sources = sorted(store_files)
+
+    run_multi_source_ingestion(sources, tmp_path / "full.csv")
+    run_multi_source_ingestion(sources, tmp_path / "stream.csv", chunk_size=25)
+    assert hashed == []
+
+    run_incremental_ingestion(sources, tmp_path / "raw" / "inc.csv", "csv")
+    assert len(hashed) == len(sources)
@@ -0,0 +1,33 @@
+# tests/test_metrics.py
+"""Rendu texte Prometheus : aucune perte de précision sur les grandes valeurs."""
+
+from inference.utils.metrics import MetricsRegistry
+
+
+def _sample(text: str, name: str) -> str:
+    line = next(l for l in text.splitlines() if l.startswith(name + " "))
+    return line.split(" ", 1)[1]
+
+
+def test_counter_above_one_million_renders_exactly():
+    registry = MetricsRegistry()
+    counter = registry.counter("requests_total", "Requêtes.")
+    counter.inc(amount=1_234_568)
+    assert _sample(registry.render(), "requests_total") == "1234568"
+    counter.inc()
+    assert _sample(registry.render(), "requests_total") == "1234569"
+
+
+def test_histogram_sum_and_gauge_keep_full_precision():
+    registry = MetricsRegistry()
+    histogram = registry.histogram("latency_seconds", "Latence.", buckets=(0.5, 1.0))
+    histogram.observe(1_000_000.125)
+    histogram.observe(0.25)
+    registry.gauge("queue_depth", "File.", lambda: 2_500_001)
+    registry.gauge("ratio", "Ratio.", lambda: float("nan"))
+    text = registry.render()
+
+    assert _sample(text, "latency_seconds_sum") == "1000000.375"
+    assert 'latency_seconds_bucket{le="0.5"} 1' in text
+    assert _sample(text, "queue_depth") == "2500001"
+    assert _sample(text, "ratio") == "NaN"
@@ -0,0 +1,90 @@
+# tests/test_model_repository.py
+"""MlflowModelRepository contre un registry MLflow local (store fichier)."""
+
+import pandas as pd
+import pytest
+
+mlflow = pytest.importorskip("mlflow")
+
+from mlflow.tracking import MlflowClient  # noqa: E402
+
+from inference.repository.model_repository import MlflowModelRepository  # noqa: E402
+
+MODEL_NAME = "pricing"
+
+
+class _ConstantModel(mlflow.pyfunc.PythonModel):
+    def __init__(self, price):
+        self.price = price
+
+    def predict(self, context, model_input, params=None):
+        return [self.price] * len(model_input)
+
+
+@pytest.fixture
+def registry(tmp_path, monkeypatch):
+    """Deux versions enregistrées ; l'alias @production pointe sur la 1."""
+    # Store fichier : en maintenance depuis MLflow 3, encore accepté sur demande
+    monkeypatch.setenv("MLFLOW_ALLOW_FILE_STORE", "true")
+    uri = (tmp_path / "mlruns").as_uri()
+    mlflow.set_tracking_uri(uri)
+    mlflow.set_registry_uri(uri)
+    for price in (1.0, 2.0):
+        with mlflow.start_run():
+            mlflow.pyfunc.log_model(
+                name="model",
+                python_model=_ConstantModel(price),
+                registered_model_name=MODEL_NAME,
+            )
+    client = MlflowClient(tracking_uri=uri, registry_uri=uri)
+    client.set_registered_model_alias(MODEL_NAME, "production", "1")
+    # Registry injoignable : échec immédiat, sans les reprises par défaut
+    monkeypatch.setenv("MLFLOW_HTTP_REQUEST_MAX_RETRIES", "0")
+    monkeypatch.setenv("MLFLOW_HTTP_REQUEST_TIMEOUT", "2")
+    yield uri, client
+    mlflow.set_tracking_uri(None)
+
+
+def _price(model):
+    return model.predict(pd.DataFrame({"x": [0.0]}))[0]
+
+
+@pytest.mark.parametrize("cached", [False, True])
+def test_stage_is_resolved_to_the_promoted_version(tmp_path, registry, cached):
+    uri, client = registry
+    repo = MlflowModelRepository(
+        uri, MODEL_NAME, cache_dir=tmp_path / "cache" if cached else None
+    )
+
+    assert _price(repo.load()) == 1.0
+    assert repo.version == "1"
+
+    client.set_registered_model_alias(MODEL_NAME, "production", "2")
+    assert _price(repo.load()) == 2.0
+    assert repo.version == "2"
+
+
+def test_unreachable_registry_falls_back_to_the_newest_cached_version(
+    tmp_path, registry
+):
+    uri, client = registry
+    cache_dir = tmp_path / "cache"
+    for version in ("1", "2"):
+        client.set_registered_model_alias(MODEL_NAME, "production", version)
+        MlflowModelRepository(uri, MODEL_NAME, cache_dir=cache_dir).load()
+
+    offline = MlflowModelRepository(
+        "http://127.0.0.1:9", MODEL_NAME, cache_dir=cache_dir
+    )
+    assert _price(offline.load()) == 2.0
+    assert offline.version == "2"
+
+
+def test_unknown_model_is_not_masked_by_the_cache(tmp_path, registry):
+    uri, _ = registry
+    cache_dir = tmp_path / "cache"
+    MlflowModelRepository(uri, MODEL_NAME, cache_dir=cache_dir).load()
+
+    with pytest.raises(Exception) as excinfo:
+        MlflowModelRepository(uri, "unknown", cache_dir=cache_dir).load()
+    assert not isinstance(excinfo.value, RuntimeError)
@@ -0,0 +1,53 @@
+# tests/test_payloads.py
+"""Négociation du format de réponse de /predict/batch."""
+
+import pytest
+
+from inference.utils import payloads
+
+
+@pytest.mark.parametrize(
+    "accept, expected",
+    [
+        (None, payloads.JSON),
+        ("", payloads.JSON),
+        ("*/*", payloads.JSON),
+        ("application/msgpack", payloads.MSGPACK),
+        (
+            "application/x-msgpack;q=0.5, application/vnd.apache.arrow.stream",
+            payloads.ARROW,
+        ),
+        ("text/html, */*;q=0.1", payloads.JSON),
+        ("text/html, application/json;q=0.9", payloads.JSON),
+    ],
+)
+def test_negotiate_picks_supported_type(accept, expected):
+    assert payloads.negotiate(accept, payloads.JSON) == expected
+
+
+@pytest.mark.parametrize(
+    "accept", ["text/html", "text/html, application/xml", "application/json;q=0"]
+)
+def test_negotiate_returns_none_when_nothing_acceptable(accept):
+    assert payloads.negotiate(accept, payloads.JSON) is None
+
+
+def test_media_type_rejects_unknown_content_type():
+    assert payloads.media_type("text/csv") is None
+    assert payloads.media_type("application/json; charset=utf-8") == payloads.JSON
+
+
+@pytest.fixture
+def without_msgpack(monkeypatch):
+    monkeypatch.setattr(payloads, "_installed", lambda module: module != "msgpack")
+
+
+def test_formats_without_their_module_are_not_served(without_msgpack):
+    assert payloads.supported_types() == [payloads.JSON, payloads.ARROW]
+    # Requête : 415 ; Accept : type ignoré, 406 s'il était le seul
+    assert payloads.media_type("application/msgpack") is None
+    assert payloads.negotiate("application/msgpack", payloads.JSON) is None
+    assert (
+        payloads.negotiate("application/msgpack, application/json;q=0.5", payloads.JSON)
+        == payloads.JSON
+    )
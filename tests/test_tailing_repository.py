@@ -0,0 +1,42 @@
+# tests/test_tailing_repository.py
+import numpy as np
+import pandas as pd
+
+from inference.entity.feature_index import NUMERIC_FEATURES, FeatureIndex
+from inference.repository.tailing_repository import TailingCsvDataRepository
+
+
+def _observations(skus, start):
+    rng = np.random.default_rng(len(skus) + start)
+    frame = pd.DataFrame(
+        rng.normal(size=(len(skus), len(NUMERIC_FEATURES))), columns=NUMERIC_FEATURES
+    )
+    frame.insert(0, "SKU", skus)
+    frame.insert(
+        1,
+        "Timestamp",
+        pd.date_range("2024-01-01", periods=len(skus), freq="h")
+        + pd.Timedelta(hours=start),
+    )
+    return frame
+
+
+def test_delta_keeps_skus_sorted_like_a_full_rebuild(tmp_path):
+    path = tmp_path / "sales.csv"
+    _observations(["B", "D", "F"] * 4, start=0).to_csv(path, index=False)
+    repo = TailingCsvDataRepository(path)
+    repo.load_index()
+
+    # Nouveaux SKU avant, entre et après les SKU connus
+    delta = _observations(["A", "D", "C", "G", "E"] * 2, start=100)
+    delta.to_csv(path, mode="a", header=False, index=False)
+    assert repo.refresh()
+    assert repo.incremental_updates == 1
+
+    index = repo.load_index()
+    expected = FeatureIndex.from_frame(pd.read_csv(path))
+    assert index.skus.tolist() == sorted(index.skus.tolist())
+    assert index.skus.tolist() == expected.skus.tolist()
+    np.testing.assert_array_equal(index.features, expected.features)
+    np.testing.assert_array_equal(index.counts, expected.counts)
+    assert index.positions == expected.positions